@@ -0,0 +1,109 @@
+"""
+JWT authentication that resolves the user from a cached snapshot instead of
+loading the User row on every request, and refresh tokens revoked through
+the cache-backed blacklist (authentication/token_blacklist.py).
+"""
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.token_blacklist import blacklist_jti, is_jti_blacklisted
+from users.cache import get_user_snapshot
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Same checks as simplejwt's JWTAuthentication, but `request.user` comes
+    from users.cache.get_user_snapshot(). Role, staff and active checks need
+    no query; fields outside the snapshot load lazily on first access.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Revocation compares the password hash, which is not in the snapshot
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_user_snapshot(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the same Bearer JWT scheme"""
+    target_class = 'authentication.jwt.CachedJWTAuthentication'
+
+
+class BlacklistableRefreshToken(RefreshToken):
+    """
+    Refresh token checked against the cache blacklist. Replaces simplejwt's
+    BlacklistMixin, which needs the token_blacklist app and its tables.
+    """
+
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self):
+        if is_jti_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Revoke this token until it expires.
+
+        Returns:
+            bool: False if the token had already been blacklisted
+        """
+        return blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+
+    def outstand(self):
+        # No outstanding-token list: only revoked tokens are stored
+        return None
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh with blacklist-on-rotation and the user check served from
+    the cached user snapshot.
+    """
+    token_class = BlacklistableRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            user = get_user_snapshot(user_id)
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(
+                    self.error_messages['no_active_account'],
+                    'no_active_account',
+                )
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not refresh.blacklist():
+                # Another request already rotated this token
+                raise InvalidToken(_("Token is blacklisted"))
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
@@ -18,6 +18,7 @@ class OTP(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)  # Failed verifications (capped like the Redis store)
     
     class Meta:
         ordering = ['-created_at']
@@ -34,17 +35,20 @@ class OTP(models.Model):
         return ''.join(random.choices(string.digits, k=6))
     
     @staticmethod
-    def create_otp(user, expiry_minutes=10):
+    def create_otp(user, expiry_minutes=10, invalidate_previous=True):
         """
         Create a new OTP for a user
         Args:
             user: User instance
             expiry_minutes: OTP expiry time in minutes (default 10)
+            invalidate_previous: Mark earlier unused OTPs as used (skip for
+                                 users created in this request)
         Returns:
             OTP instance
         """
         # Invalidate all previous unused OTPs for this user
-        OTP.objects.filter(user=user, is_used=False).update(is_used=True)
+        if invalidate_previous:
+            OTP.objects.filter(user=user, is_used=False).update(is_used=True)
         
         # Create new OTP
         code = OTP.generate_code()
@@ -72,3 +76,48 @@ class OTP(models.Model):
             self.save()
             return True
         return False
+
+
+class OTPAuditLog(models.Model):
+    """
+    Audit trail of OTP activity (codes themselves live in Redis, see
+    authentication/otp_store.py). Written asynchronously when
+    OTP_AUDIT_ENABLED is set.
+    """
+    EVENT_CHOICES = [
+        ('issued', 'Issued'),
+        ('verified', 'Verified'),
+        ('failed', 'Failed'),
+        ('locked', 'Locked'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='otp_audit_logs'
+    )
+    purpose = models.CharField(max_length=30)
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"OTP {self.event} ({self.purpose}) for user {self.user_id}"
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh-token blacklist entries written while the cache was unavailable
+    (see authentication/token_blacklist.py). Kept until the token expires.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Revoked token {self.jti}"
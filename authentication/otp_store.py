@@ -0,0 +1,191 @@
+"""
+Redis-backed OTP store.
+
+One OTP per (purpose, user) is kept in a Redis hash with a native TTL:
+
+    otp:{purpose}:{user_id} -> {code: <hmac>, attempts: <n>}
+
+- issuing a code overwrites the previous one (no UPDATE over old rows)
+- verification runs a Lua script that checks the code, counts failed
+  attempts and deletes the key on success or once OTP_MAX_ATTEMPTS is
+  reached, atomically, in one round trip
+- codes are stored as an HMAC of the code, never in clear text
+- expiry is the key's TTL, so nothing needs cleaning up
+
+When Redis isn't available (local memory cache in development, or an
+outage) codes fall back to the OTP table, with the same OTP_MAX_ATTEMPTS
+cap on failed verifications. Issuing a code in Redis invalidates codes
+left in the table by an earlier outage.
+
+An audit trail (OTPAuditLog) is written by a Celery task when
+OTP_AUDIT_ENABLED is set, so the request path never writes to Postgres.
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+import string
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from authentication.models import OTP
+from authentication.tasks import record_otp_event
+from it360acad_backend.redis_client import get_redis, redis_key
+from it360acad_backend.task_publisher import publish_task, FALLBACK_SPOOL
+
+logger = logging.getLogger('authentication')
+
+OTP_KEY = 'otp:{purpose}:{user_id}'
+OTP_LENGTH = 6
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Verification results
+OTP_VALID = 'valid'
+OTP_INVALID = 'invalid'
+OTP_LOCKED = 'locked'
+
+# KEYS[1]: otp key; ARGV[1]: code hmac, ARGV[2]: max attempts
+# Returns 1 (valid, consumed), 0 (wrong code), -1 (missing/expired), -2 (locked, consumed)
+VERIFY_SCRIPT = """
+local stored = redis.call('HMGET', KEYS[1], 'code', 'attempts')
+if not stored[1] then
+  return -1
+end
+if stored[1] == ARGV[1] then
+  redis.call('DEL', KEYS[1])
+  return 1
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if attempts >= tonumber(ARGV[2]) then
+  redis.call('DEL', KEYS[1])
+  return -2
+end
+return 0
+"""
+
+_verify_script = None
+
+
+def _max_attempts():
+    return getattr(settings, 'OTP_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+
+
+def _key(purpose, user_id):
+    return redis_key(OTP_KEY.format(purpose=purpose, user_id=user_id))
+
+
+def _digest(code):
+    return hmac.new(settings.SECRET_KEY.encode(), code.encode(), hashlib.sha256).hexdigest()
+
+
+def _get_verify_script(r):
+    global _verify_script
+    if _verify_script is None:
+        _verify_script = r.register_script(VERIFY_SCRIPT)
+    return _verify_script
+
+
+def generate_code():
+    """Generate a random numeric OTP code"""
+    return ''.join(secrets.choice(string.digits) for _ in range(OTP_LENGTH))
+
+
+def _audit(user_id, purpose, event):
+    if not getattr(settings, 'OTP_AUDIT_ENABLED', False):
+        return
+    publish_task(record_otp_event, args=[user_id, purpose, event], fallback=FALLBACK_SPOOL)
+
+
+def issue_otp(user, purpose, expiry_minutes=10):
+    """
+    Issue a new OTP for a user, replacing any earlier code for the same purpose.
+
+    Args:
+        user: User instance
+        purpose: 'registration' or 'password_reset'
+        expiry_minutes: Time to live in minutes
+
+    Returns:
+        str: The OTP code to send to the user
+    """
+    r = get_redis()
+    if r is not None:
+        code = generate_code()
+        try:
+            key = _key(purpose, user.id)
+            pipe = r.pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.hset(key, mapping={'code': _digest(code), 'attempts': 0})
+            pipe.expire(key, expiry_minutes * 60)
+            pipe.execute()
+            # A code written to the table during an outage must not outlive this one
+            OTP.objects.filter(user=user, is_used=False, expires_at__gte=timezone.now()).update(is_used=True)
+            _audit(user.id, purpose, 'issued')
+            return code
+        except Exception as e:
+            logger.error(f"Error storing OTP in Redis, falling back to database: {str(e)}")
+
+    code = OTP.create_otp(user, expiry_minutes=expiry_minutes).code
+    _audit(user.id, purpose, 'issued')
+    return code
+
+
+def verify_otp(user, purpose, code):
+    """
+    Check an OTP and consume it if it matches.
+
+    Returns:
+        str: OTP_VALID, OTP_INVALID (wrong, expired or never issued) or
+             OTP_LOCKED (too many failed attempts; a new code is needed)
+    """
+    r = get_redis()
+    if r is not None:
+        try:
+            outcome = _get_verify_script(r)(
+                keys=[_key(purpose, user.id)],
+                args=[_digest(code), _max_attempts()],
+            )
+        except Exception as e:
+            logger.error(f"Error verifying OTP in Redis, falling back to database: {str(e)}")
+            outcome = -1
+
+        if outcome == 1:
+            _audit(user.id, purpose, 'verified')
+            return OTP_VALID
+        if outcome == -2:
+            _audit(user.id, purpose, 'locked')
+            return OTP_LOCKED
+        if outcome == 0:
+            _audit(user.id, purpose, 'failed')
+            return OTP_INVALID
+        # Missing in Redis: the code may have been issued while Redis was unavailable
+
+    result = _verify_db_otp(user, code)
+    _audit(user.id, purpose, {OTP_VALID: 'verified', OTP_LOCKED: 'locked'}.get(result, 'failed'))
+    return result
+
+
+def _verify_db_otp(user, code):
+    """Check a code against the user's latest live OTP row, counting failed attempts"""
+    with transaction.atomic():
+        otp = (
+            OTP.objects.select_for_update()
+            .filter(user=user, is_used=False, expires_at__gte=timezone.now())
+            .order_by('-created_at')
+            .first()
+        )
+        if otp is None:
+            return OTP_INVALID
+        if hmac.compare_digest(otp.code, code):
+            OTP.objects.filter(pk=otp.pk).update(is_used=True)
+            return OTP_VALID
+        if otp.attempts + 1 >= _max_attempts():
+            # Same as the Redis store: the code is consumed and a new one is needed
+            OTP.objects.filter(pk=otp.pk).update(is_used=True, attempts=F('attempts') + 1)
+            return OTP_LOCKED
+        OTP.objects.filter(pk=otp.pk).update(attempts=F('attempts') + 1)
+        return OTP_INVALID
+
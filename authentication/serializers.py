@@ -1,4 +1,7 @@
+from django.db import transaction
 from users.models import User
+from users.purge import deactivate_user, get_protected_relations
+from users.tasks import queue_user_purge
 from rest_framework import serializers
 
 # Login Serializer
@@ -149,14 +152,19 @@ class DeleteAccountSerializer(serializers.Serializer):
         raise serializers.ValidationError({'email': 'User with this email does not exist'})
     
     deleted_email = user_to_delete.email
-    
-    # Optional: Soft delete instead of hard delete
-    # user_to_delete.is_active = False
-    # user_to_delete.deleted_at = timezone.now()
-    # user_to_delete.save()
-    
-    # Hard delete
-    user_to_delete.delete()
+
+    protected = get_protected_relations(User.objects.filter(pk=user_to_delete.pk))
+    if protected:
+      raise serializers.ValidationError(
+        f"This account still owns {', '.join(protected)}. Reassign them before deleting the account."
+      )
+
+    # Soft delete: the account is blocked immediately and its data is
+    # purged in the background (see users/purge.py)
+    user_id = user_to_delete.id
+    with transaction.atomic():
+      deactivate_user(user_to_delete)
+      queue_user_purge(user_id)
     
     return {
         'message': 'Account deleted successfully',
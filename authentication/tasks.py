@@ -0,0 +1,85 @@
+"""
+Celery tasks for authentication app
+
+OTP audit logging, retention of OTP, OTP audit and revoked-token rows, and
+restoring tokens revoked during a cache outage.
+"""
+from celery import shared_task
+from django.db.models import Q
+from django.utils import timezone
+from authentication import token_blacklist
+from authentication.models import OTP, OTPAuditLog, RevokedToken
+from it360acad_backend.retention import delete_expired, retention_cutoff
+import logging
+
+logger = logging.getLogger('authentication')
+
+
+@shared_task(ignore_result=True)
+def record_otp_event(user_id, purpose, event):
+    """
+    Write one OTP audit event (enabled with OTP_AUDIT_ENABLED).
+
+    Args:
+        user_id: ID of the user the OTP belongs to
+        purpose: OTP purpose ('registration', 'password_reset')
+        event: 'issued', 'verified', 'failed' or 'locked'
+    """
+    try:
+        OTPAuditLog.objects.create(user_id=user_id, purpose=purpose, event=event)
+    except Exception as e:
+        logger.error(f"Error recording OTP audit event for user {user_id}: {str(e)}")
+
+
+@shared_task
+def cleanup_expired_otps():
+    """
+    Delete used and expired rows from the OTP table (only written when
+    Redis was unavailable) and old OTP audit events, in time-boxed batches
+    (RETENTION_POLICIES['otps'] and ['otp_audit_log']).
+
+    Returns:
+        list: Retention report per table
+    """
+    reports = []
+    try:
+        stale = OTP.objects.filter(Q(is_used=True) | Q(expires_at__lt=timezone.now()))
+        reports.append(delete_expired('otps', stale))
+        expired_events = OTPAuditLog.objects.filter(created_at__lt=retention_cutoff('otp_audit_log'))
+        reports.append(delete_expired('otp_audit_log', expired_events))
+    except Exception as e:
+        logger.error(f"Error cleaning up OTP rows: {str(e)}")
+    return reports
+
+
+@shared_task
+def restore_revoked_tokens():
+    """
+    Move tokens revoked while the cache was unavailable from the
+    RevokedToken table back into the cache blacklist.
+
+    Returns:
+        int: Tokens restored
+    """
+    try:
+        return token_blacklist.restore_revoked_tokens()
+    except Exception as e:
+        logger.error(f"Error restoring revoked tokens: {str(e)}")
+        return 0
+
+
+@shared_task
+def cleanup_revoked_tokens():
+    """
+    Delete revoked-token rows (only written when the cache was unavailable)
+    whose tokens have expired (RETENTION_POLICIES['revoked_tokens']).
+
+    Returns:
+        dict: Retention report (rows deleted, batches, seconds, complete)
+    """
+    try:
+        expired = RevokedToken.objects.filter(expires_at__lt=timezone.now())
+        return delete_expired('revoked_tokens', expired)
+    except Exception as e:
+        logger.error(f"Error cleaning up revoked tokens: {str(e)}")
+        return {'policy': 'revoked_tokens', 'deleted': 0, 'error': str(e)}
@@ -0,0 +1,84 @@
+"""
+Refresh-token blacklist kept in the cache (Redis in production).
+
+Each revoked token is one key, `jwt:blacklist:{jti}`, that expires when
+the token itself would have expired. Checks are a single GET and the
+blacklist never holds more than one refresh-token lifetime of entries,
+unlike simplejwt's token_blacklist tables.
+
+When the cache is unavailable, revocations fall back to the RevokedToken
+table, so logout and refresh rotation keep working during a Redis outage.
+Only a failed cache read is checked against that table; a cache miss means
+the token is valid, so refreshes never query the database. Once the cache
+is back, authentication.tasks.restore_revoked_tokens copies the rows into
+it (restore_revoked_tokens()) and removes them.
+"""
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from authentication.models import RevokedToken
+
+logger = logging.getLogger('authentication')
+
+BLACKLIST_KEY = 'jwt:blacklist:{jti}'
+
+
+def blacklist_jti(jti, exp):
+    """
+    Blacklist a token id until the token's expiry.
+
+    Args:
+        jti: Token id claim
+        exp: Token expiry (epoch seconds)
+
+    Returns:
+        bool: True if the token was newly blacklisted, False if it already
+              was (e.g. a concurrent refresh with the same token won)
+    """
+    remaining = int(exp - time.time())
+    if remaining <= 0:
+        # Expired tokens are rejected by signature validation anyway
+        return True
+    try:
+        return cache.add(BLACKLIST_KEY.format(jti=jti), 1, timeout=remaining)
+    except Exception as e:
+        logger.error(f"Error blacklisting token {jti} in cache, falling back to database: {str(e)}")
+
+    _, created = RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={'expires_at': datetime.fromtimestamp(exp, tz=dt_timezone.utc)},
+    )
+    return created
+
+
+def is_jti_blacklisted(jti):
+    """Check whether a token id has been blacklisted"""
+    try:
+        return cache.get(BLACKLIST_KEY.format(jti=jti)) is not None
+    except Exception as e:
+        logger.error(f"Error checking token blacklist for {jti}, falling back to database: {str(e)}")
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+
+def restore_revoked_tokens():
+    """
+    Copy tokens revoked during a cache outage into the cache and delete
+    their rows. Rows stay in place while the cache is still unavailable.
+
+    Returns:
+        int: Tokens restored
+    """
+    now = timezone.now()
+    rows = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('id', 'jti', 'expires_at'))
+    restored = []
+    for row_id, jti, expires_at in rows:
+        cache.add(BLACKLIST_KEY.format(jti=jti), 1, timeout=max(int((expires_at - now).total_seconds()), 1))
+        restored.append(row_id)
+    if restored:
+        RevokedToken.objects.filter(id__in=restored).delete()
+        logger.info(f"Restored {len(restored)} revoked token(s) to the cache")
+    return len(restored)
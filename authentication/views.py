@@ -1,4 +1,5 @@
 from django.contrib.auth import authenticate
+from django.db import transaction
 from rest_framework.generics import CreateAPIView, RetrieveAPIView
 from rest_framework import status
 from rest_framework.response import Response
@@ -8,12 +9,17 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from users.models import User
+from users.cache import lookup_user_id_by_email
+from users.email_filter import might_have_email
 from users.serializers import UserSerializer
 from authentication.serializers import ForgetPasswordSerializer, ResetPasswordSerializer, LoginSerializer, OTPVerificationSerializer, DeleteAccountSerializer, ResendOTPSerializer
-from authentication.models import OTP
+from authentication.jwt import BlacklistableRefreshToken, CachedTokenRefreshSerializer
+from authentication.otp_store import issue_otp, verify_otp, OTP_VALID, OTP_LOCKED
 from django.core.mail import send_mail
 from django.conf import settings
 from notification.tasks import send_otp_email
+from outbox.relay import enqueue_task
+from it360acad_backend.throttling import TokenBucketThrottle
 
 @extend_schema(
   tags=['Authentication'],
@@ -24,42 +30,31 @@ class UserRegisterView(CreateAPIView):
   queryset = User.objects.all() # QuerySet to get all users
   serializer_class = UserSerializer # Serializer to serialize the user data
   permission_classes = [AllowAny] # Permission classes to allow any user to register
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_register'
 
 
   def create(self, request, *args, **kwargs):
     serializer = self.serializer_class(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    # Create user (is_verified=False and is_active=True are set in serializer)
-    user = serializer.save()
+    # User, profiles and preferences commit together with the OTP email's
+    # outbox row, so the email is only sent if the registration commits
+    with transaction.atomic():
+      # Create user (is_verified=False and is_active=True are set in serializer)
+      user = serializer.save()
+      # Generate OTP (stored in Redis; an orphaned code just expires)
+      code = issue_otp(user, 'registration', expiry_minutes=10)
+      enqueue_task(send_otp_email, user.email, code, 'verification')
 
-    # Generate and send OTP
-    otp = OTP.create_otp(user, expiry_minutes=10)
-
-    # Initialize response data
     response_data = {
-      'message': 'User registered successfully. Please check your email for OTP.',
-      'user': {
-        'id': user.id,
-        'email': user.email,
-      },
+      'message': 'User registered successfully. OTP has been queued for sending. Please check your email shortly.',
+      'email_sent': True,
+    }
+    response_data['user'] = {
+      'id': user.id,
+      'email': user.email,
     }
-
-    # Send OTP via email asynchronously using Celery
-    try:
-      # Queue the email task in background
-      send_otp_email.delay(user.email, otp.code, 'verification')
-      response_data['email_sent'] = True
-      response_data['message'] = 'User registered successfully. OTP has been queued for sending. Please check your email shortly.'
-    except Exception as e:
-      # Log the error but don't fail the request
-      print(f"Failed to queue email task for {user.email}: {str(e)}")
-      # For development, include OTP in response if email queuing fails
-      # Remove this in production once email is working
-      response_data['otp'] = otp.code
-      response_data['email_sent'] = False
-      response_data['email_error'] = str(e)
-      response_data['message'] = 'User registered successfully. Email queuing failed - OTP included in response.'
     return Response(response_data, status=status.HTTP_201_CREATED)
 
 
@@ -72,6 +67,8 @@ class UserRegisterView(CreateAPIView):
 )
 class UserLoginView(APIView):
   permission_classes = [AllowAny]
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_login'
   serializer_class = LoginSerializer
 
   def post(self, request):
@@ -111,6 +108,8 @@ class UserLoginView(APIView):
 )
 class OTPVerificationView(APIView):
   permission_classes = [AllowAny]
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_otp_verify'
   serializer_class = OTPVerificationSerializer
 
   def post(self, request):
@@ -128,31 +127,18 @@ class OTPVerificationView(APIView):
         status=status.HTTP_404_NOT_FOUND
       )
 
-    # Find the most recent unused OTP for this user
-    otp = OTP.objects.filter(
-      user=user,
-      code=code,
-      is_used=False
-    ).order_by('-created_at').first()
-
-    if not otp:
+    # Check and consume the OTP
+    result = verify_otp(user, 'registration', code)
+    if result == OTP_LOCKED:
       return Response(
-        {'error': 'Invalid or expired OTP code'},
-        status=status.HTTP_400_BAD_REQUEST
-      )
-
-    # Check if OTP is valid (not expired)
-    if not otp.is_valid():
-      return Response(
-        {'error': 'OTP code has expired. Please request a new one.'},
-        status=status.HTTP_400_BAD_REQUEST
+        {'error': 'Too many failed attempts. Please request a new OTP.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS
       )
 
-    # Verify the OTP
-    if otp.verify():
+    if result == OTP_VALID:
       # Mark user as verified
       user.is_verified = True
-      user.save()
+      user.save(update_fields=['is_verified'])
 
       # Generate tokens
       refresh = RefreshToken.for_user(user)
@@ -167,7 +153,7 @@ class OTPVerificationView(APIView):
       }, status=status.HTTP_200_OK)
     else:
       return Response(
-        {'error': 'Failed to verify OTP'},
+        {'error': 'Invalid or expired OTP code'},
         status=status.HTTP_400_BAD_REQUEST
       )
 
@@ -181,6 +167,8 @@ class OTPVerificationView(APIView):
 )
 class UserForgetPasswordView(APIView):
   permission_classes = [AllowAny]
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_otp_send'
   serializer_class = ForgetPasswordSerializer
 
   def post(self, request):
@@ -198,7 +186,7 @@ class UserForgetPasswordView(APIView):
       )
 
     # Generate and send OTP for password reset
-    otp = OTP.create_otp(user, expiry_minutes=15)  # 15 minutes expiry for password reset
+    code = issue_otp(user, 'password_reset', expiry_minutes=15)  # 15 minutes expiry for password reset
 
     # Initialize response data
     response_data = {
@@ -206,21 +194,10 @@ class UserForgetPasswordView(APIView):
       'email': user.email,
     }
 
-    # Send OTP via email asynchronously using Celery
-    try:
-      # Queue the email task in background
-      send_otp_email.delay(user.email, otp.code, 'password_reset')
-      response_data['email_sent'] = True
-      response_data['message'] = 'Password reset OTP has been queued for sending. Please check your email shortly.'
-    except Exception as e:
-      # Log the error but don't fail the request
-      print(f"Failed to queue email task for {user.email}: {str(e)}")
-      # For development, include OTP in response if email queuing fails
-      # Remove this in production once email is working
-      response_data['otp'] = otp.code
-      response_data['email_sent'] = False
-      response_data['email_error'] = str(e)
-      response_data['message'] = 'Password reset OTP generated. Email queuing failed - OTP included in response.'
+    # Send OTP via email asynchronously (published by the outbox relay)
+    enqueue_task(send_otp_email, user.email, code, 'password_reset')
+    response_data['email_sent'] = True
+    response_data['message'] = 'Password reset OTP has been queued for sending. Please check your email shortly.'
 
     return Response(response_data, status=status.HTTP_200_OK)
 
@@ -234,6 +211,8 @@ class UserForgetPasswordView(APIView):
 )
 class UserResetPasswordView(APIView):
   permission_classes = [AllowAny]
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_otp_verify'
   serializer_class = ResetPasswordSerializer
 
   def post(self, request):
@@ -252,28 +231,15 @@ class UserResetPasswordView(APIView):
         status=status.HTTP_404_NOT_FOUND
       )
 
-    # Find the most recent unused OTP for this user
-    otp = OTP.objects.filter(
-      user=user,
-      code=code,
-      is_used=False
-    ).order_by('-created_at').first()
-
-    if not otp:
-      return Response(
-        {'error': 'Invalid or expired OTP code'},
-        status=status.HTTP_400_BAD_REQUEST
-      )
-
-    # Check if OTP is valid (not expired)
-    if not otp.is_valid():
+    # Check and consume the OTP
+    result = verify_otp(user, 'password_reset', code)
+    if result == OTP_LOCKED:
       return Response(
-        {'error': 'OTP code has expired. Please request a new one.'},
-        status=status.HTTP_400_BAD_REQUEST
+        {'error': 'Too many failed attempts. Please request a new OTP.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS
       )
 
-    # Verify the OTP
-    if otp.verify():
+    if result == OTP_VALID:
       # Reset the password
       user.set_password(new_password)
       user.save()
@@ -287,7 +253,7 @@ class UserResetPasswordView(APIView):
       )
     else:
       return Response(
-        {'error': 'Failed to verify OTP'},
+        {'error': 'Invalid or expired OTP code'},
         status=status.HTTP_400_BAD_REQUEST
       )
 
@@ -306,7 +272,7 @@ class UserLogoutView(APIView):
     refresh_token = request.data.get('refresh')
     if refresh_token:
       try:
-        token = RefreshToken(refresh_token)
+        token = BlacklistableRefreshToken(refresh_token)
         token.blacklist()
         return Response(
           {'message': 'Logged out successfully'},
@@ -324,7 +290,6 @@ class UserLogoutView(APIView):
       )
 
 
-# TODOS: add rate limiting to the email exists view for security when scalling to production
 #  Email Exist View
 @extend_schema(
   tags=['Authentication'],
@@ -342,6 +307,8 @@ class UserLogoutView(APIView):
 )
 class UserEmailExistsView(APIView):
   permission_classes = [AllowAny]
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_email_exists'
   serializer_class = None
 
   def get(self, request):
@@ -365,7 +332,8 @@ class UserEmailExistsView(APIView):
         status=status.HTTP_400_BAD_REQUEST
       )
 
-    if User.objects.filter(email=email).exists(): # check if the email exists in the database
+    # The Bloom filter rules out most unregistered emails without a lookup
+    if might_have_email(email) and lookup_user_id_by_email(email) is not None: # check the email index, falling back to the database
       return Response({'message': 'Email Already Exist', 'exists': True}, status=status.HTTP_200_OK) # return True
     else: # if the email does not exist in the database
       return Response({'message': 'Email Does Not Exist', 'exists': False}, status=status.HTTP_200_OK) # return False
@@ -380,6 +348,8 @@ class UserEmailExistsView(APIView):
 )
 class UserResendOtpView(APIView):
   permission_classes = [AllowAny]
+  throttle_classes = [TokenBucketThrottle]
+  throttle_scope = 'auth_otp_send'
   serializer_class = ResendOTPSerializer
 
   def post(self, request):
@@ -406,7 +376,7 @@ class UserResendOtpView(APIView):
       message = 'Registration OTP has been resent to your email. Please check your inbox.'
 
     # Generate and send new OTP
-    otp = OTP.create_otp(user, expiry_minutes=expiry_minutes)
+    code = issue_otp(user, otp_type, expiry_minutes=expiry_minutes)
 
     # Initialize response data
     response_data = {
@@ -418,26 +388,15 @@ class UserResendOtpView(APIView):
     # Determine email subject and body based on OTP type
     if otp_type == 'password_reset':
       email_subject = 'Password Reset OTP - IT360 Academy'
-      email_body = f'Your IT360 Academy Password Reset OTP is: {otp.code}\n\nThis code will expire in 15 minutes.\n\nIf you did not request a password reset, please ignore this email.'
+      email_body = f'Your IT360 Academy Password Reset OTP is: {code}\n\nThis code will expire in 15 minutes.\n\nIf you did not request a password reset, please ignore this email.'
     else:
       email_subject = 'OTP Verification - IT360 Academy'
-      email_body = f'Your IT360 Academy Registration OTP is: {otp.code}\n\nThis code will expire in 10 minutes.\n\nIf you did not request this code, please ignore this email.'
+      email_body = f'Your IT360 Academy Registration OTP is: {code}\n\nThis code will expire in 10 minutes.\n\nIf you did not request this code, please ignore this email.'
 
-    # Send OTP via email asynchronously using Celery
-    try:
-      # Queue the email task in background
-      send_otp_email.delay(user.email, otp.code, otp_type)
-      response_data['email_sent'] = True
-      response_data['message'] = f'{otp_type.replace("_", " ").title()} OTP has been queued for sending. Please check your email shortly.'
-    except Exception as e:
-      # Log the error but don't fail the request
-      print(f"Failed to queue email task for {user.email}: {str(e)}")
-      # For development, include OTP in response if email queuing fails
-      # Remove this in production once email is working
-      response_data['otp'] = otp.code
-      response_data['email_sent'] = False
-      response_data['email_error'] = str(e)
-      response_data['message'] = f'{otp_type.replace("_", " ").title()} OTP generated. Email queuing failed - OTP included in response.'
+    # Send OTP via email asynchronously (published by the outbox relay)
+    enqueue_task(send_otp_email, user.email, code, otp_type)
+    response_data['email_sent'] = True
+    response_data['message'] = f'{otp_type.replace("_", " ").title()} OTP has been queued for sending. Please check your email shortly.'
 
     return Response(response_data, status=status.HTTP_200_OK)
 
@@ -487,4 +446,4 @@ class UserProfileView(RetrieveAPIView):
   description="Refresh JWT access token using refresh token.",
 )
 class CustomTokenRefreshView(TokenRefreshView):
-  pass
+  serializer_class = CachedTokenRefreshSerializer
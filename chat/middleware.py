@@ -2,26 +2,27 @@
 Custom JWT authentication middleware for WebSocket connections
 """
 from urllib.parse import parse_qs
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-
-User = get_user_model()
+from users.cache import get_user_snapshot
 
 
 @database_sync_to_async
 def get_user_from_token(token_string):
-    """Get user from JWT token"""
+    """Get user from JWT token (cached snapshot; the database is only hit on a miss)"""
     try:
         access_token = AccessToken(token_string)
         user_id = access_token['user_id']
-        user = User.objects.get(id=user_id)
-        return user
-    except (TokenError, InvalidToken, User.DoesNotExist):
+    except (TokenError, InvalidToken, KeyError):
+        return AnonymousUser()
+
+    user = get_user_snapshot(user_id)
+    if user is None or not user.is_active:
         return AnonymousUser()
+    return user
 
 
 class JWTAuthMiddleware(BaseMiddleware):
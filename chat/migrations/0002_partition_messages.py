@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 10:12
+
+from django.db import migrations
+
+from it360acad_backend.partitions import convert_to_partitioned
+
+
+def partition_messages(apps, schema_editor):
+    convert_to_partitioned(schema_editor, 'chat_message', 'timestamp')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        # PostgreSQL only; the model state is unchanged. Not reversible in
+        # place: rolling back leaves the (compatible) partitioned table.
+        migrations.RunPython(partition_messages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+"""
+Celery tasks for chat app
+
+Retention of old chat messages.
+"""
+from celery import shared_task
+from chat.models import Message
+from it360acad_backend.retention import delete_expired, retention_cutoff, get_policy
+from it360acad_backend.partitions import maintain_partitions
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def cleanup_old_chat_messages():
+    """
+    Delete chat messages older than the retention period
+    (RETENTION_POLICIES['chat_messages']).
+
+    When the table is partitioned, upcoming monthly partitions are created
+    and whole months past partition_days are dropped, with no row-level
+    deletes. Otherwise rows are deleted in time-boxed batches.
+
+    Returns:
+        dict: Partition report (created, dropped, seconds) or retention
+              report (rows deleted, batches, seconds, complete)
+    """
+    try:
+        partitions = maintain_partitions('chat_message', get_policy('chat_messages').get('partition_days'))
+        if partitions is not None:
+            return partitions
+        expired = Message.objects.filter(timestamp__lt=retention_cutoff('chat_messages'))
+        return delete_expired('chat_messages', expired)
+    except Exception as e:
+        logger.error(f"Error cleaning up old chat messages: {str(e)}")
+        return {'policy': 'chat_messages', 'deleted': 0, 'error': str(e)}
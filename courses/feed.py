@@ -0,0 +1,124 @@
+"""
+Personalized course feed for students.
+
+Each student's feed is a ranked list of published course ids stored in
+Redis. Scores combine the student's category interests (Student.categories),
+the categories of courses they are already enrolled in, and course
+popularity. Feeds are rebuilt in the background (see courses/tasks.py) and
+served with one cache read plus one id__in fetch.
+"""
+import heapq
+import logging
+import math
+from django.core.cache import cache
+
+from courses.models.course import Course
+from courses.models.enrollment import CourseEnrollment
+from outbox.relay import enqueue_task
+
+logger = logging.getLogger('courses')
+
+# Cache keys
+CACHE_KEY_STUDENT_FEED = 'courses:feed:{user_id}'
+FEED_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours; rebuilt on interest/enrollment changes
+FEED_SIZE = 50
+
+# Scoring weights
+INTEREST_WEIGHT = 3.0    # Course category is one the student picked
+HISTORY_WEIGHT = 1.5     # Course category matches one the student is enrolled in
+POPULARITY_WEIGHT = 1.0  # log-scaled enrollment count, normalised to 0..1
+
+
+def load_catalog():
+    """
+    Load the scoring inputs for all published courses.
+
+    Returns:
+        list: Dicts with id, category_id and enrollment_count
+    """
+    return list(
+        Course.objects.filter(is_published=True).values('id', 'category_id', 'enrollment_count')
+    )
+
+
+def score_courses(catalog, interest_category_ids, enrolled_course_ids, enrolled_category_ids, size=FEED_SIZE):
+    """
+    Rank catalog courses for a single student.
+
+    Courses the student is already enrolled in are excluded.
+
+    Returns:
+        list: Up to `size` course ids, best first
+    """
+    max_enrollments = max((course['enrollment_count'] for course in catalog), default=0)
+    popularity_scale = math.log1p(max_enrollments) or 1.0
+
+    scored = []
+    for course in catalog:
+        if course['id'] in enrolled_course_ids:
+            continue
+        score = POPULARITY_WEIGHT * math.log1p(max(course['enrollment_count'], 0)) / popularity_scale
+        if course['category_id'] in interest_category_ids:
+            score += INTEREST_WEIGHT
+        if course['category_id'] in enrolled_category_ids:
+            score += HISTORY_WEIGHT
+        # Tie-break on id so newer courses win among equals
+        scored.append((score, course['id']))
+
+    return [course_id for _, course_id in heapq.nlargest(size, scored)]
+
+
+def build_student_feed(student, catalog=None):
+    """
+    Compute and cache the feed for one student.
+
+    Args:
+        student: Student instance
+        catalog: Optional preloaded result of load_catalog() (reused by bulk rebuilds)
+
+    Returns:
+        list: Ranked course ids
+    """
+    if catalog is None:
+        catalog = load_catalog()
+
+    interest_category_ids = {category.id for category in student.categories.all()}
+    enrollments = CourseEnrollment.objects.filter(user_id=student.user_id).values_list('course_id', 'course__category_id')
+    enrolled_course_ids = set()
+    enrolled_category_ids = set()
+    for course_id, category_id in enrollments:
+        enrolled_course_ids.add(course_id)
+        enrolled_category_ids.add(category_id)
+
+    course_ids = score_courses(catalog, interest_category_ids, enrolled_course_ids, enrolled_category_ids)
+    set_cached_feed(student.user_id, course_ids)
+    return course_ids
+
+
+def get_cached_feed(user_id):
+    """
+    Get the cached feed for a user.
+
+    Returns:
+        list: Ranked course ids, or None if not cached
+    """
+    try:
+        return cache.get(CACHE_KEY_STUDENT_FEED.format(user_id=user_id))
+    except Exception as e:
+        logger.error(f"Error getting cached feed for user {user_id}: {str(e)}")
+        return None
+
+
+def set_cached_feed(user_id, course_ids, timeout=FEED_CACHE_TIMEOUT):
+    """Cache the ranked course ids for a user"""
+    try:
+        cache.set(CACHE_KEY_STUDENT_FEED.format(user_id=user_id), course_ids, timeout)
+        logger.debug(f"Cached feed for user {user_id} ({len(course_ids)} courses)")
+    except Exception as e:
+        logger.error(f"Error caching feed for user {user_id}: {str(e)}")
+
+
+def schedule_feed_rebuild(user_id):
+    """Queue a background rebuild of one student's feed (through the outbox, in the caller's transaction)"""
+    from courses.tasks import rebuild_student_feed
+    enqueue_task(rebuild_student_feed, user_id)
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 08:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_quizattempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, help_text='Client-generated id used to deduplicate offline replays', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='quizattempt',
+            constraint=models.UniqueConstraint(fields=('user', 'client_id'), name='unique_quiz_attempt_client_id'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 08:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_quizattempt_client_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePopularity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('popular_score', models.FloatField(default=0.0)),
+                ('trending_score', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='popularity', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Popularity',
+                'verbose_name_plural': 'Course Popularity',
+            },
+        ),
+    ]
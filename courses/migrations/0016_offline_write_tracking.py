@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0015_coursepopularity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursebookmark',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, help_text='Client-generated id of the last offline write', null=True),
+        ),
+        migrations.AddField(
+            model_name='coursebookmark',
+            name='recorded_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the last offline write was made on the device', null=True),
+        ),
+        migrations.AddField(
+            model_name='coursereview',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, help_text='Client-generated id of the last offline write', null=True),
+        ),
+        migrations.AddField(
+            model_name='coursereview',
+            name='recorded_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the last offline write was made on the device', null=True),
+        ),
+    ]
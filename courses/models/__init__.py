@@ -7,5 +7,6 @@ from .enrollment import CourseEnrollment
 from .certificate import Certificate
 from .bookmark import CourseBookmark
 from .review import CourseReview
+from .popularity import CoursePopularity
 
-__all__ = ['Category', 'Course', 'Lesson', 'Quiz', 'QuizAttempt', 'CourseEnrollment', 'Certificate', 'CourseBookmark', 'CourseReview']
+__all__ = ['Category', 'Course', 'Lesson', 'Quiz', 'QuizAttempt', 'CourseEnrollment', 'Certificate', 'CourseBookmark', 'CourseReview', 'CoursePopularity']
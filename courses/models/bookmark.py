@@ -7,6 +7,10 @@ class CourseBookmark(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='bookmarked_by')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Last write replayed from an offline device; cleared by online writes
+    client_id = models.UUIDField(null=True, blank=True, editable=False, help_text="Client-generated id of the last offline write")
+    recorded_at = models.DateTimeField(null=True, blank=True, editable=False, help_text="When the last offline write was made on the device")
+
     class Meta:
         verbose_name = 'Course Bookmark'
         verbose_name_plural = 'Course Bookmarks'
@@ -0,0 +1,21 @@
+from django.db import models
+from courses.models.course import Course
+
+
+class CoursePopularity(models.Model):
+    """
+    Postgres snapshot of the Redis popularity rankings.
+    Redis is the source of truth while it is up; this table is only read
+    to rebuild the sorted sets after Redis loses its data.
+    """
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name='popularity')
+    popular_score = models.FloatField(default=0.0)
+    trending_score = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Course Popularity'
+        verbose_name_plural = 'Course Popularity'
+
+    def __str__(self):
+        return f"Popularity: {self.course_id} ({self.popular_score})"
@@ -16,10 +16,16 @@ class QuizAttempt(models.Model):
     
     is_passed = models.BooleanField(default=False)
 
+    # Client-generated id for attempts replayed from offline devices (idempotency key)
+    client_id = models.UUIDField(null=True, blank=True, editable=False, help_text="Client-generated id used to deduplicate offline replays")
+
     class Meta:
         verbose_name = 'Quiz Attempt'
         verbose_name_plural = 'Quiz Attempts'
         ordering = ['-started_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='unique_quiz_attempt_client_id'),
+        ]
 
     def __str__(self):
         return f"Attempt by {self.user.email} on {self.quiz.title}"
@@ -0,0 +1,254 @@
+"""
+Real-time course popularity rankings kept in Redis sorted sets.
+
+Events (enrollment, bookmark, review) increment:
+- an all-time sorted set (`courses:popular`)
+- an hourly bucket sorted set (`courses:trending:{hour}`) that expires after the window
+
+A periodic task folds the live buckets into `courses:trending` with
+exponential decay by bucket age. Reads are a ZREVRANGE plus an HMGET of
+cached course summaries, so the endpoints never touch Postgres on a hit.
+Scores are snapshotted to CoursePopularity so they survive a Redis flush.
+"""
+import json
+import logging
+import time
+
+from it360acad_backend.redis_client import get_redis, redis_key
+
+logger = logging.getLogger('courses')
+
+# Redis keys
+POPULAR_KEY = 'courses:popular'
+TRENDING_KEY = 'courses:trending'
+TRENDING_BUCKET_KEY = 'courses:trending:{bucket}'
+SUMMARY_KEY = 'courses:summary'
+
+# Trending window
+BUCKET_SECONDS = 60 * 60          # 1 hour buckets
+TRENDING_WINDOW_BUCKETS = 48      # Look back 48 hours
+TRENDING_HALF_LIFE_BUCKETS = 12   # An event loses half its weight every 12 hours
+
+# Event weights
+EVENT_WEIGHTS = {
+    'enrollment': 5.0,
+    'unenrollment': -5.0,
+    'review': 2.0,
+    'bookmark': 1.0,
+    'unbookmark': -1.0,
+}
+
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 50
+
+
+def _current_bucket(now=None):
+    return int((now or time.time()) // BUCKET_SECONDS)
+
+
+def record_course_events(events):
+    """
+    Apply popularity events in one Redis round trip.
+
+    Args:
+        events: Iterable of (course_id, event_name) tuples
+    """
+    r = get_redis()
+    if r is None:
+        return
+
+    bucket_key = redis_key(TRENDING_BUCKET_KEY.format(bucket=_current_bucket()))
+    try:
+        pipe = r.pipeline(transaction=False)
+        for course_id, event in events:
+            weight = EVENT_WEIGHTS[event]
+            pipe.zincrby(redis_key(POPULAR_KEY), weight, course_id)
+            pipe.zincrby(bucket_key, weight, course_id)
+        pipe.expire(bucket_key, BUCKET_SECONDS * (TRENDING_WINDOW_BUCKETS + 1))
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error recording course popularity events: {str(e)}")
+
+
+def record_course_event(course_id, event):
+    """Apply a single popularity event"""
+    record_course_events([(course_id, event)])
+
+
+def refresh_trending():
+    """
+    Rebuild `courses:trending` from the hourly buckets with exponential decay.
+
+    Returns:
+        int: Number of courses in the trending set
+    """
+    r = get_redis()
+    if r is None:
+        return 0
+
+    current = _current_bucket()
+    weights = {
+        redis_key(TRENDING_BUCKET_KEY.format(bucket=current - age)): 0.5 ** (age / TRENDING_HALF_LIFE_BUCKETS)
+        for age in range(TRENDING_WINDOW_BUCKETS)
+    }
+    return r.zunionstore(redis_key(TRENDING_KEY), weights)
+
+
+def get_top_courses(ranking='popular', k=DEFAULT_TOP_K):
+    """
+    Get the top-K courses for a ranking.
+
+    Args:
+        ranking: 'popular' or 'trending'
+        k: Number of courses to return
+
+    Returns:
+        list: Course summary dicts with a `popularity_score`, best first,
+              or None if Redis is unavailable
+    """
+    r = get_redis()
+    if r is None:
+        return None
+
+    key = redis_key(TRENDING_KEY if ranking == 'trending' else POPULAR_KEY)
+    try:
+        # Over-fetch so unpublished courses can be skipped without a second round trip
+        ranked = r.zrevrange(key, 0, k * 2 - 1, withscores=True)
+        if not ranked:
+            return []
+        course_ids = [int(member) for member, _ in ranked]
+        summaries = get_course_summaries(course_ids, r=r)
+    except Exception as e:
+        logger.error(f"Error reading {ranking} course ranking: {str(e)}")
+        return None
+
+    results = []
+    for course_id, (_, score) in zip(course_ids, ranked):
+        summary = summaries.get(course_id)
+        if not summary or not summary.get('is_published') or score <= 0:
+            continue
+        results.append({**summary, 'popularity_score': round(score, 3)})
+        if len(results) == k:
+            break
+    return results
+
+
+def get_course_summaries(course_ids, r=None):
+    """
+    Get cached course list representations, filling misses from the database.
+
+    Returns:
+        dict: course_id -> serialized course (CourseListSerializer shape)
+    """
+    r = r or get_redis()
+    cached = r.hmget(redis_key(SUMMARY_KEY), course_ids)
+    summaries = {
+        course_id: json.loads(raw)
+        for course_id, raw in zip(course_ids, cached) if raw is not None
+    }
+
+    missing = [course_id for course_id in course_ids if course_id not in summaries]
+    if missing:
+        from courses.models.course import Course
+        from courses.serializer.course import CourseListSerializer
+        fresh = {
+            course.id: CourseListSerializer(course).data
+            for course in Course.objects.filter(id__in=missing)
+        }
+        if fresh:
+            r.hset(redis_key(SUMMARY_KEY), mapping={course_id: json.dumps(data) for course_id, data in fresh.items()})
+        summaries.update(fresh)
+    return summaries
+
+
+def invalidate_course_summary(course_id):
+    """Drop a course's cached summary (call when the course changes)"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.hdel(redis_key(SUMMARY_KEY), course_id)
+    except Exception as e:
+        logger.error(f"Error invalidating course summary {course_id}: {str(e)}")
+
+
+def remove_course(course_id):
+    """Remove a deleted course from all rankings"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.zrem(redis_key(POPULAR_KEY), course_id)
+        pipe.zrem(redis_key(TRENDING_KEY), course_id)
+        pipe.hdel(redis_key(SUMMARY_KEY), course_id)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error removing course {course_id} from rankings: {str(e)}")
+
+
+def persist_scores():
+    """
+    Snapshot the Redis rankings to CoursePopularity.
+
+    Returns:
+        int: Number of rows written
+    """
+    from courses.models.course import Course
+    from courses.models.popularity import CoursePopularity
+
+    r = get_redis()
+    if r is None:
+        return 0
+
+    popular = {int(member): score for member, score in r.zrange(redis_key(POPULAR_KEY), 0, -1, withscores=True)}
+    trending = {int(member): score for member, score in r.zrange(redis_key(TRENDING_KEY), 0, -1, withscores=True)}
+    course_ids = set(Course.objects.filter(id__in=set(popular) | set(trending)).values_list('id', flat=True))
+
+    rows = [
+        CoursePopularity(
+            course_id=course_id,
+            popular_score=popular.get(course_id, 0.0),
+            trending_score=trending.get(course_id, 0.0),
+        )
+        for course_id in course_ids
+    ]
+    CoursePopularity.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['course'],
+        update_fields=['popular_score', 'trending_score', 'updated_at'],
+    )
+    return len(rows)
+
+
+def restore_scores_if_missing():
+    """
+    Reload the sorted sets from the Postgres snapshot when Redis has lost them.
+
+    Returns:
+        bool: True if a restore happened
+    """
+    from courses.models.popularity import CoursePopularity
+
+    r = get_redis()
+    if r is None or r.exists(redis_key(POPULAR_KEY)):
+        return False
+
+    snapshot = list(CoursePopularity.objects.values_list('course_id', 'popular_score', 'trending_score'))
+    if not snapshot:
+        return False
+
+    pipe = r.pipeline(transaction=True)
+    pipe.zadd(redis_key(POPULAR_KEY), {course_id: popular for course_id, popular, _ in snapshot})
+    trending = {course_id: score for course_id, _, score in snapshot if score > 0}
+    if trending:
+        # Seed the current bucket so the next refresh keeps the restored trend
+        bucket_key = redis_key(TRENDING_BUCKET_KEY.format(bucket=_current_bucket()))
+        pipe.zadd(redis_key(TRENDING_KEY), trending)
+        pipe.zunionstore(bucket_key, {bucket_key: 1, redis_key(TRENDING_KEY): 1})
+        pipe.expire(bucket_key, BUCKET_SECONDS * (TRENDING_WINDOW_BUCKETS + 1))
+    pipe.execute()
+    logger.warning(f"Restored popularity rankings for {len(snapshot)} courses from Postgres")
+    return True
@@ -10,6 +10,7 @@ from .enrollment import (
     StudentEnrollmentCreateSerializer
 )
 from .certificate import CertificateSerializer
+from .activity import ActivityBatchSerializer
 
 __all__ = [
     'CategorySerializer',
@@ -22,5 +23,6 @@ __all__ = [
     'StudentEnrollmentCreateSerializer',
     'CertificateSerializer',
     'CourseBookmarkSerializer',
-    'CourseReviewSerializer'
+    'CourseReviewSerializer',
+    'ActivityBatchSerializer',
 ]
@@ -0,0 +1,394 @@
+"""
+Serializers for offline learner activity sync.
+
+Mobile clients queue quiz attempts, bookmarks and reviews while offline and
+replay them through a single batch request. Each operation carries a
+client-generated id so replays are idempotent, and the time it was made on
+the device (recorded_at):
+
+- quiz attempts are deduplicated on their client_id
+- reviews and bookmarks keep the client_id and recorded_at of their last
+  offline write; a replay of that write, or an operation recorded before
+  the stored write (online writes count from updated_at / created_at), is
+  reported as superseded instead of overwriting newer data
+- bookmark removals leave a tombstone in the cache for
+  BOOKMARK_REMOVAL_TTL, so a stale bookmark replayed after an unbookmark
+  doesn't bring the bookmark back
+
+recorded_at comes from the device clock, so ordering against online
+writes is only as good as that clock.
+"""
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from courses.models.course import Course
+from courses.models.quiz import Quiz
+from courses.models.quiz_attempt import QuizAttempt
+from courses.models.bookmark import CourseBookmark
+from courses.models.review import CourseReview
+from courses.models.enrollment import CourseEnrollment
+from courses import popularity
+
+logger = logging.getLogger('courses')
+
+MAX_BATCH_OPERATIONS = 200
+BOOKMARK_REMOVAL_KEY = 'courses:bookmark_removed:{user_id}:{course_id}'
+BOOKMARK_REMOVAL_TTL = timedelta(days=30)
+
+OPERATION_TYPES = [
+    ('quiz_attempt', 'Quiz Attempt'),
+    ('bookmark', 'Bookmark'),
+    ('unbookmark', 'Remove Bookmark'),
+    ('review', 'Review'),
+]
+
+
+class QuizAttemptOperationSerializer(serializers.Serializer):
+    """Payload for a completed quiz attempt recorded offline"""
+    quiz = serializers.IntegerField(min_value=1)
+    score = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, max_value=100)
+    time_spent_minutes = serializers.IntegerField(min_value=0, required=False, default=0)
+    completed_at = serializers.DateTimeField(required=False, allow_null=True, default=None)
+
+
+class BookmarkOperationSerializer(serializers.Serializer):
+    """Payload for adding or removing a bookmark"""
+    course = serializers.IntegerField(min_value=1)
+
+
+class ReviewOperationSerializer(serializers.Serializer):
+    """Payload for creating or updating a course review"""
+    course = serializers.IntegerField(min_value=1)
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+OPERATION_SERIALIZERS = {
+    'quiz_attempt': QuizAttemptOperationSerializer,
+    'bookmark': BookmarkOperationSerializer,
+    'unbookmark': BookmarkOperationSerializer,
+    'review': ReviewOperationSerializer,
+}
+
+
+class ActivityOperationSerializer(serializers.Serializer):
+    """A single queued operation"""
+    client_id = serializers.UUIDField(help_text="Client-generated id, reused when the operation is replayed")
+    type = serializers.ChoiceField(choices=OPERATION_TYPES)
+    data = serializers.DictField(help_text="Operation payload (same fields as the single-item endpoint)")
+    recorded_at = serializers.DateTimeField(
+        required=False, allow_null=True, default=None,
+        help_text="When the operation was made on the device (default: when it is received)",
+    )
+
+
+class ActivityResultSerializer(serializers.Serializer):
+    """Outcome of a single operation"""
+    client_id = serializers.UUIDField()
+    type = serializers.ChoiceField(choices=OPERATION_TYPES)
+    status = serializers.ChoiceField(choices=[
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+        ('duplicate', 'Duplicate'),
+        ('superseded', 'Superseded'),
+        ('error', 'Error'),
+    ])
+    id = serializers.IntegerField(allow_null=True)
+    errors = serializers.JSONField(required=False)
+
+
+class ActivityBatchResponseSerializer(serializers.Serializer):
+    """Response body for a batch submission"""
+    results = ActivityResultSerializer(many=True)
+    summary = serializers.DictField(child=serializers.IntegerField())
+
+
+class ActivityBatchSerializer(serializers.Serializer):
+    """
+    Validate and apply a mixed list of learner operations.
+
+    Envelope errors (missing client_id, unknown type) reject the whole batch.
+    Payload errors are reported per item and the remaining operations are
+    applied together in one transaction using bulk inserts and upserts.
+    """
+    operations = ActivityOperationSerializer(many=True)
+
+    def validate_operations(self, value):
+        if not value:
+            raise serializers.ValidationError("At least one operation is required.")
+        if len(value) > MAX_BATCH_OPERATIONS:
+            raise serializers.ValidationError(f"A batch can contain at most {MAX_BATCH_OPERATIONS} operations.")
+        return value
+
+    def apply(self, user):
+        """
+        Apply all valid operations for a student.
+
+        Returns:
+            list: One result dict per submitted operation, in submission order
+        """
+        operations = self.validated_data['operations']
+        results = [None] * len(operations)
+        grouped = {op_type: [] for op_type, _ in OPERATION_TYPES}
+        seen_client_ids = set()
+        received_at = timezone.now()
+
+        for index, operation in enumerate(operations):
+            operation['recorded_at'] = operation['recorded_at'] or received_at
+            client_id = operation['client_id']
+            if client_id in seen_client_ids:
+                results[index] = _result(operation, 'duplicate')
+                continue
+            seen_client_ids.add(client_id)
+
+            payload = OPERATION_SERIALIZERS[operation['type']](data=operation['data'])
+            if not payload.is_valid():
+                results[index] = _result(operation, 'error', errors=payload.errors)
+                continue
+            grouped[operation['type']].append((index, operation, payload.validated_data))
+
+        enrolled_course_ids = set(
+            CourseEnrollment.objects.filter(user=user, status='active').values_list('course_id', flat=True)
+        )
+
+        with transaction.atomic():
+            self._apply_quiz_attempts(user, grouped['quiz_attempt'], enrolled_course_ids, results)
+            self._apply_bookmarks(user, grouped['bookmark'] + grouped['unbookmark'], results)
+            self._apply_reviews(user, grouped['review'], enrolled_course_ids, results)
+
+        return results
+
+    def _apply_quiz_attempts(self, user, items, enrolled_course_ids, results):
+        if not items:
+            return
+
+        quizzes = {
+            quiz['id']: quiz
+            for quiz in Quiz.objects.filter(id__in={data['quiz'] for _, _, data in items})
+            .values('id', 'passing_score', 'lesson__course_id')
+        }
+        client_ids = [operation['client_id'] for _, operation, _ in items]
+        existing = dict(
+            QuizAttempt.objects.filter(user=user, client_id__in=client_ids).values_list('client_id', 'id')
+        )
+
+        now = timezone.now()
+        pending = []
+        for index, operation, data in items:
+            client_id = operation['client_id']
+            quiz = quizzes.get(data['quiz'])
+            if client_id in existing:
+                results[index] = _result(operation, 'duplicate', object_id=existing[client_id])
+            elif quiz is None:
+                results[index] = _result(operation, 'error', errors={'quiz': ['Quiz not found.']})
+            elif quiz['lesson__course_id'] not in enrolled_course_ids:
+                results[index] = _result(operation, 'error', errors={'quiz': ['You must be enrolled in this course.']})
+            else:
+                pending.append((index, operation, QuizAttempt(
+                    user=user,
+                    quiz_id=quiz['id'],
+                    client_id=client_id,
+                    score=data['score'],
+                    time_spent_minutes=data['time_spent_minutes'],
+                    completed_at=data['completed_at'] or now,
+                    is_passed=data['score'] >= quiz['passing_score'],
+                )))
+
+        if not pending:
+            return
+
+        # ignore_conflicts keeps a concurrent replay of the same batch from aborting the transaction
+        QuizAttempt.objects.bulk_create([attempt for _, _, attempt in pending], ignore_conflicts=True)
+        created_ids = dict(
+            QuizAttempt.objects.filter(user=user, client_id__in=[op['client_id'] for _, op, _ in pending])
+            .values_list('client_id', 'id')
+        )
+        for index, operation, _ in pending:
+            results[index] = _result(operation, 'created', object_id=created_ids.get(operation['client_id']))
+
+    def _apply_bookmarks(self, user, items, results):
+        if not items:
+            return
+
+        # Bookmark and unbookmark of the same course collapse to the last one recorded
+        latest = {}
+        for index, operation, data in sorted(items, key=lambda item: (item[1]['recorded_at'], item[0])):
+            previous = latest.get(data['course'])
+            if previous:
+                results[previous[0]] = _result(previous[1], 'superseded')
+            latest[data['course']] = (index, operation)
+
+        course_ids = set(latest)
+        known_courses = set(Course.objects.filter(id__in=course_ids).values_list('id', flat=True))
+        existing = {
+            row['course_id']: row
+            for row in CourseBookmark.objects.select_for_update().filter(user=user, course_id__in=course_ids)
+            .values('id', 'course_id', 'client_id', 'recorded_at', 'created_at')
+        }
+        removed_at = _bookmark_removals(user.id, course_ids - set(existing))
+
+        to_add, to_remove = [], {}
+        for course_id, (index, operation) in latest.items():
+            row = existing.get(course_id)
+            if course_id not in known_courses:
+                results[index] = _result(operation, 'error', errors={'course': ['Course not found.']})
+            elif row and row['client_id'] == operation['client_id']:
+                results[index] = _result(operation, 'duplicate', object_id=row['id'])
+            elif operation['type'] == 'unbookmark':
+                if row is None:
+                    results[index] = _result(operation, 'duplicate')
+                elif operation['recorded_at'] <= (row['recorded_at'] or row['created_at']):
+                    # Bookmarked again after this removal was recorded
+                    results[index] = _result(operation, 'superseded', object_id=row['id'])
+                else:
+                    to_remove[course_id] = operation['recorded_at']
+                    results[index] = _result(operation, 'deleted', object_id=row['id'])
+            elif row:
+                results[index] = _result(operation, 'duplicate', object_id=row['id'])
+            elif course_id in removed_at and operation['recorded_at'] <= removed_at[course_id]:
+                # Removed after this bookmark was recorded
+                results[index] = _result(operation, 'superseded')
+            else:
+                to_add.append(course_id)
+
+        if to_remove:
+            CourseBookmark.objects.filter(user=user, course_id__in=to_remove).delete()
+            transaction.on_commit(lambda: record_bookmark_removals(user.id, to_remove))
+
+        if to_add:
+            CourseBookmark.objects.bulk_create(
+                [
+                    CourseBookmark(
+                        user=user,
+                        course_id=course_id,
+                        client_id=latest[course_id][1]['client_id'],
+                        recorded_at=latest[course_id][1]['recorded_at'],
+                    )
+                    for course_id in to_add
+                ],
+                ignore_conflicts=True,
+            )
+            created_ids = dict(
+                CourseBookmark.objects.filter(user=user, course_id__in=to_add).values_list('course_id', 'id')
+            )
+            for course_id in to_add:
+                index, operation = latest[course_id]
+                results[index] = _result(operation, 'created', object_id=created_ids.get(course_id))
+            # bulk_create skips post_save, so feed the popularity ranking directly
+            events = [(course_id, 'bookmark') for course_id in to_add]
+            transaction.on_commit(lambda: popularity.record_course_events(events))
+
+    def _apply_reviews(self, user, items, enrolled_course_ids, results):
+        if not items:
+            return
+
+        latest = {}
+        for index, operation, data in sorted(items, key=lambda item: (item[1]['recorded_at'], item[0])):
+            previous = latest.get(data['course'])
+            if previous:
+                results[previous[0]] = _result(previous[1], 'superseded')
+            latest[data['course']] = (index, operation, data)
+
+        existing = {
+            row['course_id']: row
+            for row in CourseReview.objects.select_for_update().filter(user=user, course_id__in=set(latest))
+            .values('id', 'course_id', 'client_id', 'recorded_at', 'updated_at')
+        }
+
+        reviews = []
+        for course_id, (index, operation, data) in latest.items():
+            row = existing.get(course_id)
+            if course_id not in enrolled_course_ids:
+                results[index] = _result(operation, 'error', errors={'course': ['You must be enrolled in this course to leave a review.']})
+            elif row and row['client_id'] == operation['client_id']:
+                results[index] = _result(operation, 'duplicate', object_id=row['id'])
+            elif row and operation['recorded_at'] <= (row['recorded_at'] or row['updated_at']):
+                # The stored review was written after this one was recorded
+                results[index] = _result(operation, 'superseded', object_id=row['id'])
+            else:
+                reviews.append(CourseReview(
+                    user=user,
+                    course_id=course_id,
+                    rating=data['rating'],
+                    comment=data['comment'],
+                    client_id=operation['client_id'],
+                    recorded_at=operation['recorded_at'],
+                ))
+
+        if not reviews:
+            return
+
+        CourseReview.objects.bulk_create(
+            reviews,
+            update_conflicts=True,
+            unique_fields=['user', 'course'],
+            update_fields=['rating', 'comment', 'client_id', 'recorded_at', 'updated_at'],
+        )
+        saved_ids = dict(
+            CourseReview.objects.filter(user=user, course_id__in=[review.course_id for review in reviews])
+            .values_list('course_id', 'id')
+        )
+        for review in reviews:
+            index, operation, _ = latest[review.course_id]
+            status = 'updated' if review.course_id in existing else 'created'
+            results[index] = _result(operation, status, object_id=saved_ids.get(review.course_id))
+
+        events = [(review.course_id, 'review') for review in reviews if review.course_id not in existing]
+        if events:
+            transaction.on_commit(lambda: popularity.record_course_events(events))
+
+
+def _bookmark_removal_key(user_id, course_id):
+    return BOOKMARK_REMOVAL_KEY.format(user_id=user_id, course_id=course_id)
+
+
+def _bookmark_removals(user_id, course_ids):
+    """When each course was last unbookmarked, for courses with a tombstone"""
+    if not course_ids:
+        return {}
+    try:
+        stored = cache.get_many([_bookmark_removal_key(user_id, course_id) for course_id in course_ids])
+    except Exception as e:
+        logger.error(f"Error reading bookmark removals for user {user_id}: {str(e)}")
+        return {}
+    return {
+        course_id: stored[_bookmark_removal_key(user_id, course_id)]
+        for course_id in course_ids
+        if _bookmark_removal_key(user_id, course_id) in stored
+    }
+
+
+def record_bookmark_removals(user_id, removed):
+    """
+    Remember when bookmarks were removed, so older bookmark operations
+    replayed from offline devices don't restore them.
+
+    Args:
+        user_id: ID of the student
+        removed: Dict of course id -> when the bookmark was removed
+    """
+    try:
+        cache.set_many(
+            {_bookmark_removal_key(user_id, course_id): removed_at for course_id, removed_at in removed.items()},
+            timeout=int(BOOKMARK_REMOVAL_TTL.total_seconds()),
+        )
+    except Exception as e:
+        logger.error(f"Error recording bookmark removals for user {user_id}: {str(e)}")
+
+
+def _result(operation, status, object_id=None, errors=None):
+    result = {
+        'client_id': str(operation['client_id']),
+        'type': operation['type'],
+        'status': status,
+        'id': object_id,
+    }
+    if errors:
+        result['errors'] = errors
+    return result
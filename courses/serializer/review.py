@@ -24,3 +24,9 @@ class CourseReviewSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        # An online edit is newer than any offline write; offline sync
+        # compares against updated_at from here on
+        validated_data.update(client_id=None, recorded_at=None)
+        return super().update(instance, validated_data)
+
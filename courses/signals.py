@@ -0,0 +1,79 @@
+"""
+Signals for courses app to keep precomputed student feeds and
+popularity rankings fresh
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from users.models import Student
+from courses.models.course import Course
+from courses.models.enrollment import CourseEnrollment
+from courses.models.bookmark import CourseBookmark
+from courses.models.review import CourseReview
+from courses.feed import schedule_feed_rebuild
+from courses import popularity
+
+
+def _record_popularity_on_commit(course_id, event):
+    transaction.on_commit(lambda: popularity.record_course_event(course_id, event))
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def rebuild_feed_on_enrollment(sender, instance, created, **kwargs):
+    """
+    Rebuild the student's feed when they enroll in a course.
+    Status and progress updates don't change the feed, so only creation counts.
+    """
+    if created:
+        schedule_feed_rebuild(instance.user_id)
+        _record_popularity_on_commit(instance.course_id, 'enrollment')
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def rebuild_feed_on_enrollment_delete(sender, instance, **kwargs):
+    """Rebuild the student's feed when an enrollment is removed"""
+    schedule_feed_rebuild(instance.user_id)
+    _record_popularity_on_commit(instance.course_id, 'unenrollment')
+
+
+@receiver(m2m_changed, sender=Student.categories.through)
+def rebuild_feed_on_interests_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Rebuild feeds when a student's category interests change"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        schedule_feed_rebuild(instance.user_id)
+    elif pk_set:
+        # Changed from the category side: pk_set holds Student ids
+        for user_id in Student.objects.filter(pk__in=pk_set).values_list('user_id', flat=True):
+            schedule_feed_rebuild(user_id)
+
+
+@receiver(post_save, sender=CourseBookmark)
+def record_bookmark_popularity(sender, instance, created, **kwargs):
+    if created:
+        _record_popularity_on_commit(instance.course_id, 'bookmark')
+
+
+@receiver(post_delete, sender=CourseBookmark)
+def record_unbookmark_popularity(sender, instance, **kwargs):
+    _record_popularity_on_commit(instance.course_id, 'unbookmark')
+
+
+@receiver(post_save, sender=CourseReview)
+def record_review_popularity(sender, instance, created, **kwargs):
+    if created:
+        _record_popularity_on_commit(instance.course_id, 'review')
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course_summary_on_save(sender, instance, **kwargs):
+    """Cached course summaries back the ranking endpoints"""
+    transaction.on_commit(lambda: popularity.invalidate_course_summary(instance.id))
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_rankings(sender, instance, **kwargs):
+    course_id = instance.id
+    transaction.on_commit(lambda: popularity.remove_course(course_id))
@@ -0,0 +1,90 @@
+"""
+Celery tasks for courses app
+
+Background jobs that precompute read-heavy data (personalized feeds,
+popularity rankings).
+"""
+from celery import shared_task
+from users.models import Student
+from courses.feed import build_student_feed, load_catalog
+from courses import popularity
+import logging
+
+logger = logging.getLogger('courses')
+
+FEED_REBUILD_BATCH_SIZE = 500
+
+
+@shared_task
+def rebuild_student_feed(user_id):
+    """
+    Rebuild the personalized course feed for one student.
+
+    Triggered when the student's interests or enrollments change.
+
+    Args:
+        user_id: ID of the student's User
+
+    Returns:
+        int: Number of courses in the feed
+    """
+    try:
+        student = Student.objects.get(user_id=user_id)
+    except Student.DoesNotExist:
+        logger.warning(f"Feed rebuild skipped: no student profile for user {user_id}")
+        return 0
+
+    course_ids = build_student_feed(student)
+    logger.info(f"Rebuilt feed for user {user_id} ({len(course_ids)} courses)")
+    return len(course_ids)
+
+
+@shared_task
+def rebuild_all_student_feeds():
+    """
+    Rebuild feeds for every student.
+
+    Run periodically (e.g. nightly) so popularity changes and newly published
+    courses reach students whose interests have not changed. The catalog is
+    loaded once and shared across all students.
+
+    Returns:
+        int: Number of feeds rebuilt
+    """
+    catalog = load_catalog()
+    rebuilt = 0
+    students = Student.objects.prefetch_related('categories').order_by('pk')
+    for student in students.iterator(chunk_size=FEED_REBUILD_BATCH_SIZE):
+        build_student_feed(student, catalog=catalog)
+        rebuilt += 1
+
+    logger.info(f"Rebuilt feeds for {rebuilt} students")
+    return rebuilt
+
+
+@shared_task
+def refresh_trending_courses():
+    """
+    Fold the hourly popularity buckets into the decayed trending ranking.
+    Restores the rankings from Postgres first if Redis has lost them.
+
+    Returns:
+        int: Number of courses in the trending ranking
+    """
+    popularity.restore_scores_if_missing()
+    count = popularity.refresh_trending()
+    logger.info(f"Refreshed trending ranking ({count} courses)")
+    return count
+
+
+@shared_task
+def persist_course_popularity():
+    """
+    Snapshot Redis popularity scores to Postgres for recovery.
+
+    Returns:
+        int: Number of courses persisted
+    """
+    count = popularity.persist_scores()
+    logger.info(f"Persisted popularity scores for {count} courses")
+    return count
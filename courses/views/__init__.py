@@ -7,6 +7,7 @@ from .enrollment import CourseEnrollmentViewSet
 from .certificate import CertificateViewSet
 from .bookmark import CourseBookmarkViewSet
 from .review import CourseReviewViewSet
+from .activity import ActivityViewSet
 
 __all__ = [
     'CategoryViewSet',
@@ -17,5 +18,6 @@ __all__ = [
     'CourseEnrollmentViewSet',
     'CertificateViewSet',
     'CourseBookmarkViewSet',
-    'CourseReviewViewSet'
+    'CourseReviewViewSet',
+    'ActivityViewSet',
 ]
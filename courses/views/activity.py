@@ -0,0 +1,54 @@
+from collections import Counter
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+import logging
+
+from courses.serializer.activity import ActivityBatchSerializer, ActivityBatchResponseSerializer
+
+logger = logging.getLogger('courses')
+
+
+class ActivityViewSet(viewsets.ViewSet):
+    """
+    Offline sync for learner activity.
+    Students replay queued quiz attempts, bookmarks and reviews in one request.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ActivityBatchSerializer
+
+    @extend_schema(
+        request=ActivityBatchSerializer,
+        responses={200: ActivityBatchResponseSerializer},
+        tags=['Activity'],
+        summary="Batch Submit Learner Activity",
+        description="Apply a mixed list of quiz attempts, bookmarks and reviews queued offline. "
+                    "Operations are applied in one transaction and are idempotent on their client_id. "
+                    "Each operation gets its own result, so one invalid item does not reject the batch.",
+    )
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        if getattr(request.user, 'role', '') != 'student':
+            return Response(
+                {'error': 'Only students can submit learner activity.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = ActivityBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.apply(request.user)
+        summary = dict(Counter(result['status'] for result in results))
+
+        logger.info(
+            "Activity batch applied",
+            extra={
+                'user_id': request.user.id,
+                'operations': len(results),
+                'summary': summary,
+                'action': 'activity_batch',
+            }
+        )
+
+        return Response({'results': results, 'summary': summary}, status=status.HTTP_200_OK)
@@ -1,8 +1,11 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from courses.models.bookmark import CourseBookmark
+from courses.serializer.activity import record_bookmark_removals
 from courses.serializer.bookmark import CourseBookmarkSerializer
 
 @extend_schema_view(
@@ -53,3 +56,8 @@ class CourseBookmarkViewSet(viewsets.ModelViewSet):
             )
         return super().create(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        removed = {instance.course_id: timezone.now()}
+        super().perform_destroy(instance)
+        # Keeps older bookmarks replayed by offline sync from restoring it
+        transaction.on_commit(lambda: record_bookmark_removals(instance.user_id, removed))
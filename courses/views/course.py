@@ -1,7 +1,12 @@
 
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from courses.models import Course
 from courses.serializer.course import CourseSerializer, CourseListSerializer
+from courses.feed import get_cached_feed, build_student_feed
+from courses import popularity
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 
 
@@ -10,14 +15,14 @@ class CourseViewSet(viewsets.ModelViewSet):
   serializer_class = CourseSerializer
 
   def get_permissions(self):
-    if self.action in ['list', 'retrieve']:
+    if self.action in ['list', 'retrieve', 'trending', 'popular']:
       return [AllowAny()]
     elif self.action in ['create', 'update', 'destroy']:
       return [IsAdminUser()]
     return [IsAuthenticated()]
 
   def get_serializer_class(self):
-    if self.action == 'list':
+    if self.action in ['list', 'feed']:
       return CourseListSerializer
     return CourseSerializer
 
@@ -29,4 +34,68 @@ class CourseViewSet(viewsets.ModelViewSet):
     serializer.save(updated_by=self.request.user)
 
   def perform_destroy(self, instance):
-    instance.delete()
\ No newline at end of file
+    instance.delete()
+
+  @extend_schema(
+    tags=['Courses'],
+    summary="Personalized Course Feed",
+    description="Published courses ranked for the current student from their category interests, "
+                "enrollment history and course popularity. Precomputed in the background.",
+    responses={200: CourseListSerializer(many=True)},
+  )
+  @action(detail=False, methods=['get'])
+  def feed(self, request):
+    """Get the current student's precomputed course feed"""
+    if request.user.role != 'student':
+      return Response(
+        {'error': 'This endpoint is for students only.'},
+        status=status.HTTP_403_FORBIDDEN
+      )
+
+    course_ids = get_cached_feed(request.user.id)
+    if course_ids is None:
+      # Cold start (new student or evicted key) - build inline once
+      student = getattr(request.user, 'student_profile', None)
+      course_ids = build_student_feed(student) if student else []
+
+    courses_by_id = Course.objects.filter(id__in=course_ids, is_published=True).in_bulk()
+    courses = [courses_by_id[course_id] for course_id in course_ids if course_id in courses_by_id]
+    serializer = self.get_serializer(courses, many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+  @extend_schema(
+    tags=['Courses'],
+    summary="Trending Courses",
+    description="Courses ranked by recent enrollments, bookmarks and reviews, with older activity decaying "
+                "(12 hour half-life over a 48 hour window). Served from Redis.",
+    parameters=[OpenApiParameter('limit', int, OpenApiParameter.QUERY, description='Number of courses (max 50)')],
+    responses={200: CourseListSerializer(many=True)},
+  )
+  @action(detail=False, methods=['get'])
+  def trending(self, request):
+    return self._ranked_courses(request, 'trending')
+
+  @extend_schema(
+    tags=['Courses'],
+    summary="Most Popular Courses",
+    description="Courses ranked by all-time enrollments, bookmarks and reviews. Served from Redis.",
+    parameters=[OpenApiParameter('limit', int, OpenApiParameter.QUERY, description='Number of courses (max 50)')],
+    responses={200: CourseListSerializer(many=True)},
+  )
+  @action(detail=False, methods=['get'])
+  def popular(self, request):
+    return self._ranked_courses(request, 'popular')
+
+  def _ranked_courses(self, request, ranking):
+    try:
+      limit = int(request.query_params.get('limit', popularity.DEFAULT_TOP_K))
+    except ValueError:
+      return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, popularity.MAX_TOP_K))
+
+    courses = popularity.get_top_courses(ranking, limit)
+    if courses is None:
+      # Redis unavailable - fall back to the denormalised enrollment count
+      queryset = Course.objects.filter(is_published=True).order_by('-enrollment_count')[:limit]
+      courses = CourseListSerializer(queryset, many=True).data
+    return Response(courses, status=status.HTTP_200_OK)
@@ -10,12 +10,13 @@ django_asgi_app = get_asgi_application()
 
 # Import routing and middleware after Django is initialized
 import chat.routing
+import notification.routing
 from chat.middleware import JWTAuthMiddlewareStack
 
 # Setup WebSocket routing with JWT authentication
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": JWTAuthMiddlewareStack(
-        URLRouter(chat.routing.websocket_urlpatterns)
+        URLRouter(chat.routing.websocket_urlpatterns + notification.routing.websocket_urlpatterns)
     ),
 })
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Cache fully rendered JSON responses.
+
+Cached views store the final response body (gzip-compressed when large)
+instead of serializer data, so a hit is returned as a plain HttpResponse
+without parsing or re-rendering. Non-JSON requests (the browsable API) go
+through the normal DRF rendering path.
+"""
+import gzip
+import json
+from typing import NamedTuple, Optional
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 5
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class RenderedJSON(NamedTuple):
+    """A rendered JSON body, stored gzip-compressed when `encoding` is 'gzip'"""
+    body: bytes
+    encoding: Optional[str] = None
+
+    @classmethod
+    def from_data(cls, data):
+        body = JSONRenderer().render(data)
+        if len(body) >= COMPRESS_MIN_BYTES:
+            return cls(gzip.compress(body, compresslevel=COMPRESS_LEVEL), 'gzip')
+        return cls(body)
+
+    def raw_body(self):
+        return gzip.decompress(self.body) if self.encoding == 'gzip' else self.body
+
+    def data(self):
+        """Parse back into Python objects (for programmatic callers, not views)"""
+        return json.loads(self.raw_body())
+
+    def to_response(self, request, status=200):
+        """Serve the stored bytes, passing compressed bodies through to clients that accept gzip"""
+        if self.encoding == 'gzip' and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = HttpResponse(self.body, content_type=JSON_CONTENT_TYPE, status=status)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(self.raw_body(), content_type=JSON_CONTENT_TYPE, status=status)
+        if self.encoding == 'gzip':
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Serve a view's JSON response from a rendered-bytes cache.
+
+    Usage:
+        def get(self, request, *args, **kwargs):
+            return self.cached_json_response(
+                request,
+                lambda build: some_cache.get_or_set(key, build, timeout),
+                lambda: self.list(request, *args, **kwargs).data,
+            )
+
+    `fetch` receives a builder that returns a RenderedJSON and must return
+    the cached (or freshly built) RenderedJSON.
+    """
+
+    def cached_json_response(self, request, fetch, build_data):
+        if request.accepted_renderer.format != 'json':
+            return Response(build_data())
+        rendered = fetch(lambda: RenderedJSON.from_data(build_data()))
+        if not isinstance(rendered, RenderedJSON):
+            # Entry cached as plain data by an older release
+            rendered = RenderedJSON.from_data(rendered)
+        return rendered.to_response(request)
@@ -27,6 +27,9 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # This allows tasks to be defined in any app's tasks.py file
 app.autodiscover_tasks()
 
+# Publish-time stamps and per-lane queue-wait measurement
+import it360acad_backend.task_lanes  # noqa: E402,F401
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
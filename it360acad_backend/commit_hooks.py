@@ -0,0 +1,63 @@
+"""
+Coalesced transaction.on_commit hooks.
+
+Signals fire once per saved row, but their side effects (cache
+invalidation, task publishing) only need to run once per transaction.
+on_commit_batched() collects items under a name and calls the flush
+function once, after the outermost transaction commits, with every item
+collected in it. Outside a transaction the flush runs immediately, like
+transaction.on_commit().
+
+Flush functions should be safe to run with extra items: items added inside
+a savepoint that is later rolled back are still flushed if the batch was
+started before that savepoint.
+"""
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger('api')
+
+BATCHES_ATTR = '_it360acad_commit_batches'
+
+
+def on_commit_batched(name, flush, *items, using=None):
+    """
+    Queue items for a batched on-commit call.
+
+    Args:
+        name: Batch name; items with the same name share one flush call
+        flush: Callable receiving the list of items
+        *items: Items to add to the batch
+        using: Database alias (default: 'default')
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        _flush(name, flush, list(items))
+        return
+
+    batches = connection.__dict__.setdefault(BATCHES_ATTR, {})
+    batch = batches.get(name)
+    # A rollback discards the registered callback but not our batch; start over
+    if batch is not None and not any(func is batch['run'] for _, func, *_ in connection.run_on_commit):
+        batch = None
+
+    if batch is None:
+        batch = {'items': []}
+
+        def run():
+            batches.pop(name, None)
+            _flush(name, flush, batch['items'])
+
+        batch['run'] = run
+        batches[name] = batch
+        transaction.on_commit(run, using=using)
+
+    batch['items'].extend(items)
+
+
+def _flush(name, flush, items):
+    try:
+        flush(items)
+    except Exception as e:
+        logger.error(f"Error running on-commit batch {name}: {str(e)}")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from it360acad_backend.task_lanes import get_lane_latency, DEFAULT_WINDOW
+
+
+class Command(BaseCommand):
+    help = 'Show queue-wait latency per Celery lane (time from publish to a worker starting the task)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=DEFAULT_WINDOW,
+            help=f'Only count tasks started in the last N seconds (default: {DEFAULT_WINDOW})'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_lane_latency(window=options['window'])
+
+        self.stdout.write(f"{'lane':<13} {'samples':>8} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+        for lane, lane_stats in stats.items():
+            p50, p95, worst = (
+                f"{lane_stats[field]:.1f}" if lane_stats[field] is not None else '-'
+                for field in ('p50_ms', 'p95_ms', 'max_ms')
+            )
+            self.stdout.write(f"{lane:<13} {lane_stats['samples']:>8} {p50:>10} {p95:>10} {worst:>10}")
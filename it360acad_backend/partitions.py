@@ -0,0 +1,240 @@
+"""
+Monthly range partitioning for append-heavy tables (PostgreSQL only).
+
+Partitioned tables (see PARTITIONED_TABLES) are split by month on their
+timestamp column into `{table}_p{YYYYMM}` partitions, plus a
+`{table}_default` partition that catches rows no monthly partition covers.
+
+- Indexes are declared on the parent, so every partition gets its own copy
+  and lookups for recent rows only touch the recent partitions' indexes.
+- The primary key is (id, timestamp column), because PostgreSQL requires
+  the partition key in unique constraints. Ids still come from one sequence,
+  so they stay unique, and Django keeps using `id` as the primary key.
+- maintain_partitions() creates partitions PARTITION_PREMAKE_MONTHS ahead
+  and drops months that are wholly past retention. A dropped month is a
+  metadata operation (DROP TABLE), not a row-level DELETE.
+
+Tables are converted by migrations (convert_to_partitioned). On other
+databases (SQLite in tests) everything here is a no-op, and retention falls
+back to row-level deletes.
+"""
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger('api')
+
+# table -> timestamp column it is partitioned on
+PARTITIONED_TABLES = {
+    'notification_notification': 'created_at',
+    'chat_message': 'timestamp',
+}
+
+PARTITION_PREMAKE_MONTHS = 3
+PARTITION_NAME_RE = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    """Month start as a UTC timestamp literal"""
+    return f"'{datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()}'"
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def _supported(connection):
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(table, connection=None):
+    """Whether `table` is a partitioned table (always False off PostgreSQL)"""
+    connection = connection or default_connection
+    if not _supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table, connection=None):
+    """
+    Monthly partitions of a table.
+
+    Returns:
+        dict: partition name -> first day of its month
+    """
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME_RE.search(name)
+        if match and name == partition_name(table, date(int(match[1]), int(match[2]), 1)):
+            partitions[name] = date(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+def create_partition(table, column, month, connection=None):
+    """
+    Create and attach the partition for one month.
+
+    Rows already in the default partition for that month are moved into it
+    (ATTACH would fail otherwise).
+    """
+    connection = connection or default_connection
+    qn = connection.ops.quote_name
+    name = partition_name(table, month)
+    lower, upper = _bound(month), _bound(_add_months(month, 1))
+    in_range = f'{qn(column)} >= {lower} AND {qn(column)} < {upper}'
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(f'INSERT INTO {qn(name)} SELECT * FROM {qn(table + "_default")} WHERE {in_range}')
+        if cursor.rowcount:
+            logger.warning(f"Moved {cursor.rowcount} row(s) from {table}_default into {name}")
+            cursor.execute(f'DELETE FROM {qn(table + "_default")} WHERE {in_range}')
+        cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM ({lower}) TO ({upper})')
+    return name
+
+
+def maintain_partitions(table, retention_days=None, months_ahead=PARTITION_PREMAKE_MONTHS, connection=None):
+    """
+    Create upcoming monthly partitions and drop expired ones.
+
+    Args:
+        table: Partitioned table (key of PARTITIONED_TABLES)
+        retention_days: Drop months that ended more than this many days ago
+                        (None keeps everything)
+        months_ahead: Months after the current one to create in advance
+
+    Returns:
+        dict: created and dropped partition names and seconds spent, or
+              None if the table isn't partitioned
+    """
+    connection = connection or default_connection
+    if not is_partitioned(table, connection):
+        return None
+
+    started = time.monotonic()
+    column = PARTITIONED_TABLES[table]
+    existing = list_partitions(table, connection)
+    existing_months = set(existing.values())
+    report = {'table': table, 'created': [], 'dropped': [], 'seconds': 0.0}
+
+    current = _month_start(timezone.now())
+    for offset in range(months_ahead + 1):
+        month = _add_months(current, offset)
+        if month not in existing_months:
+            report['created'].append(create_partition(table, column, month, connection))
+
+    if retention_days is not None:
+        cutoff = (timezone.now() - timedelta(days=retention_days)).date()
+        qn = connection.ops.quote_name
+        for name, month in sorted(existing.items(), key=lambda item: item[1]):
+            # Only months whose rows are all past retention
+            if _add_months(month, 1) <= cutoff:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE {qn(name)}')
+                report['dropped'].append(name)
+
+    report['seconds'] = round(time.monotonic() - started, 2)
+    if report['created'] or report['dropped']:
+        logger.info(
+            f"Partitions for {table}: created {report['created'] or 'none'}, "
+            f"dropped {report['dropped'] or 'none'} in {report['seconds']}s"
+        )
+    return report
+
+
+def convert_to_partitioned(schema_editor, table, column, months_ahead=PARTITION_PREMAKE_MONTHS):
+    """
+    Rebuild an existing table as a monthly range-partitioned table (for
+    migrations). Copies the rows, then recreates the primary key as
+    (id, column), the foreign keys, the indexes and the id sequence.
+    """
+    connection = schema_editor.connection
+    if not _supported(connection) or is_partitioned(table, connection):
+        return
+    qn = connection.ops.quote_name
+    legacy = f'{table}_legacy'
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.tablename = %s AND i.schemaname = current_schema()
+            AND i.indexname NOT IN (
+                SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+            )
+            """,
+            [table, table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT MIN({qn(column)}), MAX(id) FROM {qn(table)}')
+        first, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+        cursor.execute(f'ALTER TABLE {qn(legacy)} RENAME CONSTRAINT {qn(table + "_pkey")} TO {qn(legacy + "_pkey")}')
+        for index_name, _ in indexes:
+            cursor.execute(f'DROP INDEX {qn(index_name)}')
+
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ({qn(column)})'
+        )
+        cursor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+    current = _month_start(timezone.now())
+    month = _month_start(first) if first else current
+    while month <= _add_months(current, months_ahead):
+        create_partition(table, column, month, connection)
+        month = _add_months(month, 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}')
+        cursor.execute(f'DROP TABLE {qn(legacy)}')
+
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + "_pkey")} PRIMARY KEY (id, {qn(column)})')
+        for constraint_name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(constraint_name)} {definition}')
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+        sequence = f'{table}_id_seq'
+        cursor.execute(f'CREATE SEQUENCE {qn(sequence)} AS bigint OWNED BY {qn(table)}.id')
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f"SELECT setval('{sequence}', %s, %s)", [max_id or 1, max_id is not None])
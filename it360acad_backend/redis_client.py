@@ -0,0 +1,38 @@
+"""
+Raw Redis access for features that need more than get/set
+(sorted sets, Lua scripts, pub/sub, counters).
+
+Uses the same connection pool as the Django cache (django-redis, database 1),
+so no extra connections are opened to Upstash.
+"""
+import logging
+from django.conf import settings
+
+logger = logging.getLogger('api')
+
+
+def get_redis():
+    """
+    Get the raw redis-py client behind the default cache.
+
+    Returns:
+        redis.Redis: Client, or None if the cache backend isn't Redis
+                     (e.g. local memory cache in development)
+    """
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+    except Exception as e:
+        logger.error(f"Error getting Redis connection: {str(e)}")
+        return None
+
+
+def redis_key(key):
+    """
+    Apply the cache KEY_PREFIX to a raw Redis key so raw keys live in the
+    same namespace as the Django cache keys.
+    """
+    prefix = settings.CACHES.get('default', {}).get('KEY_PREFIX', '')
+    return f"{prefix}:{key}" if prefix else key
@@ -0,0 +1,98 @@
+"""
+Time-boxed, batched deletion for retention jobs.
+
+Retention tasks (notification.tasks.cleanup_old_notifications,
+authentication.tasks.cleanup_expired_otps, ...) build the queryset of
+expired rows and hand it to delete_expired(), which:
+
+- walks the rows in primary-key order, DELETE-ing at most `batch_size`
+  per transaction (short locks, small WAL bursts)
+- sleeps `pause` seconds between batches to let replication and other
+  writers catch up
+- stops once `time_budget` seconds have passed; the next run continues
+  where this one left off
+
+Policies are configured per table in settings.RETENTION_POLICIES:
+
+    RETENTION_POLICIES = {
+        'notifications': {'days': 90, 'batch_size': 1000, 'time_budget': 60},
+    }
+
+Keys left out fall back to DEFAULT_POLICY.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger('api')
+
+DEFAULT_POLICY = {
+    'days': 90,
+    'batch_size': 1000,
+    'time_budget': 60,  # seconds per run
+    'pause': 0.1,       # seconds between batches
+}
+
+
+def get_policy(name):
+    """Settings for a retention policy, with defaults filled in"""
+    return {**DEFAULT_POLICY, **getattr(settings, 'RETENTION_POLICIES', {}).get(name, {})}
+
+
+def retention_cutoff(name, days=None):
+    """Rows older than this are expired under the policy"""
+    return timezone.now() - timedelta(days=days if days is not None else get_policy(name)['days'])
+
+
+def delete_expired(name, queryset):
+    """
+    Delete a retention policy's expired rows within its time budget.
+
+    Args:
+        name: Policy name (key of settings.RETENTION_POLICIES)
+        queryset: Expired rows
+
+    Returns:
+        dict: policy, rows deleted, batches, seconds spent, and whether
+              every expired row was removed (complete)
+    """
+    policy = get_policy(name)
+    model = queryset.model
+    started = time.monotonic()
+    deadline = started + policy['time_budget']
+    report = {'policy': name, 'deleted': 0, 'batches': 0, 'seconds': 0.0, 'complete': False}
+
+    last_pk = None
+    while True:
+        batch_queryset = queryset.order_by('pk')
+        if last_pk is not None:
+            batch_queryset = batch_queryset.filter(pk__gt=last_pk)
+        batch = list(batch_queryset.values_list('pk', flat=True)[:policy['batch_size']])
+        if not batch:
+            report['complete'] = True
+            break
+
+        with transaction.atomic():
+            _, per_model = model._default_manager.filter(pk__in=batch).delete()
+        report['deleted'] += per_model.get(model._meta.label, 0)
+        report['batches'] += 1
+        last_pk = batch[-1]
+
+        if len(batch) < policy['batch_size']:
+            report['complete'] = True
+            break
+        if time.monotonic() + policy['pause'] >= deadline:
+            break
+        time.sleep(policy['pause'])
+
+    report['seconds'] = round(time.monotonic() - started, 2)
+    log = logger.info if report['complete'] else logger.warning
+    log(
+        f"Retention {name}: deleted {report['deleted']} row(s) in {report['batches']} batch(es), "
+        f"{report['seconds']}s{'' if report['complete'] else ' (time budget reached, continuing next run)'}"
+    )
+    return report
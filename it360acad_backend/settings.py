@@ -73,6 +73,8 @@ INSTALLED_APPS = [
     'channels',
     'chat',
     'payments',
+    'outbox',
+    'it360acad_backend',  # Backend-wide management commands (celeryLaneLatency)
 ]
 
 
@@ -136,11 +138,25 @@ else:
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Proxies in front of the app (Render's load balancer is one hop). Rate
+    # limits then key on the address that proxy saw, not on the whole
+    # client-supplied X-Forwarded-For header; 0 uses REMOTE_ADDR
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '1')),
+}
+
+# Token-bucket rate limits per view scope (see it360acad_backend/throttling.py)
+# 'N/period' allows bursts of N, refilled at N per period
+RATE_LIMITS = {
+    'auth_login': {'ip': '30/min', 'identifier': '10/min'},
+    'auth_register': {'ip': '10/hour'},
+    'auth_otp_send': {'ip': '20/hour', 'identifier': '5/hour'},
+    'auth_otp_verify': {'ip': '30/min', 'identifier': '10/min'},
+    'auth_email_exists': {'ip': '60/min'},
 }
 
 # drf-spectacular settings
@@ -166,6 +182,7 @@ SPECTACULAR_SETTINGS = {
 
 # JWT Settings
 from datetime import timedelta
+from celery.schedules import crontab
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -183,6 +200,29 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# OTP settings (codes are stored in Redis, see authentication/otp_store.py)
+OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', '5'))
+OTP_AUDIT_ENABLED = os.getenv('OTP_AUDIT_ENABLED', 'False').lower() == 'true'
+
+# Retention per table (see it360acad_backend/retention.py): rows older than
+# `days` are deleted `batch_size` at a time, for at most `time_budget` seconds
+# per run, sleeping `pause` seconds between batches. On partitioned tables
+# (it360acad_backend/partitions.py) whole months past `partition_days` are
+# dropped instead.
+RETENTION_POLICIES = {
+    # read notifications after 90 days; every notification once its month is a year old
+    'notifications': {'days': 90, 'partition_days': 365, 'batch_size': 1000, 'time_budget': 120},
+    'otps': {'batch_size': 1000, 'time_budget': 60},  # used or expired, no grace period
+    'otp_audit_log': {'days': 180, 'batch_size': 5000, 'time_budget': 60},
+    'revoked_tokens': {'batch_size': 1000, 'time_budget': 60},  # expired tokens, no grace period
+    'pending_payments': {'days': 30, 'batch_size': 500, 'time_budget': 60},
+    'chat_messages': {'days': 365, 'partition_days': 365, 'batch_size': 1000, 'time_budget': 120},
+    'outbox': {'days': 7, 'batch_size': 5000, 'time_budget': 60},  # published messages only
+}
+
+# Expected number of registered emails for the email Bloom filter (users/email_filter.py)
+EMAIL_FILTER_CAPACITY = int(os.getenv('EMAIL_FILTER_CAPACITY', '1000000'))
+
 #  Middleware
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -378,12 +418,130 @@ CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
 CELERY_WORKER_SEND_TASK_EVENTS = True
 CELERY_TASK_SEND_SENT_EVENT = True
 
-# Task routing (optional - for future use with multiple queues)
-# Disable task routing to use default queue for all tasks
-# CELERY_TASK_ROUTES = {
-#     'notification.tasks.*': {'queue': 'notifications'},
-#     # Add more routes as needed for other apps
-# }
+# Periodic tasks, published by the beat process start.sh starts (start_celery_beat.sh)
+# Retention tasks run at fixed times (crontab) rather than every 24 hours
+# from beat's start: the schedule file lives in /tmp on Render, so an
+# interval restarts on every deploy and may never come due
+CELERY_BEAT_SCHEDULE = {
+    'refresh-trending-courses': {
+        'task': 'courses.tasks.refresh_trending_courses',
+        'schedule': 5 * 60,  # Every 5 minutes
+    },
+    'persist-course-popularity': {
+        'task': 'courses.tasks.persist_course_popularity',
+        'schedule': 15 * 60,  # Every 15 minutes
+    },
+    'rebuild-all-student-feeds': {
+        'task': 'courses.tasks.rebuild_all_student_feeds',
+        'schedule': 24 * 60 * 60,  # Daily
+    },
+    'purge-deactivated-users': {
+        'task': 'users.tasks.purge_deactivated_users',
+        'schedule': 60 * 60,  # Hourly
+    },
+    'cleanup-expired-otps': {
+        'task': 'authentication.tasks.cleanup_expired_otps',
+        'schedule': crontab(hour=2, minute=0),  # Daily, 02:00 UTC
+    },
+    'restore-revoked-tokens': {
+        'task': 'authentication.tasks.restore_revoked_tokens',
+        'schedule': 60,  # Every minute, empty outside cache outages
+    },
+    'cleanup-revoked-tokens': {
+        'task': 'authentication.tasks.cleanup_revoked_tokens',
+        'schedule': crontab(hour=2, minute=10),  # Daily, 02:10 UTC
+    },
+    'cleanup-old-notifications': {
+        'task': 'notification.tasks.cleanup_old_notifications',
+        'schedule': crontab(hour=2, minute=20),  # Daily, 02:20 UTC
+    },
+    'cleanup-abandoned-payments': {
+        'task': 'payments.tasks.cleanup_abandoned_payments',
+        'schedule': crontab(hour=2, minute=40),  # Daily, 02:40 UTC
+    },
+    'cleanup-old-chat-messages': {
+        'task': 'chat.tasks.cleanup_old_chat_messages',
+        'schedule': crontab(hour=2, minute=50),  # Daily, 02:50 UTC
+    },
+    'reconcile-unread-notification-counts': {
+        'task': 'notification.tasks.reconcile_unread_notification_counts',
+        'schedule': 30 * 60,  # Every 30 minutes
+    },
+    'relay-outbox-messages': {
+        'task': 'outbox.tasks.relay_outbox_messages',
+        'schedule': 60,  # Every minute, in case the relay process is down
+    },
+    'cleanup-outbox-messages': {
+        'task': 'outbox.tasks.cleanup_outbox_messages',
+        'schedule': crontab(hour=3, minute=10),  # Daily, 03:10 UTC
+    },
+}
+
+# Transactional outbox (outbox/relay.py): tasks are written to the database
+# with the business change and published by the runOutboxRelay process
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '0.5'))  # seconds, while the outbox is empty
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '10'))
+# Failed rows of these tasks don't keep their arguments (OTP codes)
+OUTBOX_REDACTED_TASKS = ['notification.tasks.send_otp_email']
+
+# Broker-outage handling (it360acad_backend/task_publisher.py): after
+# failure_threshold failed publishes, publishing pauses for reset_timeout
+# seconds instead of every publish waiting for the connection timeout
+CELERY_BROKER_CONNECTION_TIMEOUT = float(os.getenv('CELERY_BROKER_CONNECTION_TIMEOUT', '3'))
+CELERY_PUBLISH_BREAKER = {'failure_threshold': 3, 'reset_timeout': 30}
+# Tasks run in-process (bounded thread pool) while the broker is down
+CELERY_LOCAL_FALLBACK_TASKS = [
+    'notification.tasks.send_otp_email',
+    'notification.tasks.send_custom_email',
+]
+CELERY_LOCAL_FALLBACK_WORKERS = 2
+CELERY_LOCAL_FALLBACK_QUEUE = 50
+# Other tasks published from requests are spooled here and replayed by the outbox relay
+TASK_SPOOL_DIR = os.getenv('TASK_SPOOL_DIR', str(BASE_DIR / 'logs' / 'task_spool'))
+TASK_SPOOL_MAX_BYTES = 50 * 1024 * 1024
+
+# Task routing: priority lanes, one worker per lane (see it360acad_backend/task_lanes.py
+# and start_celery_lane.sh). Unrouted tasks go to 'default', consumed by the maintenance worker.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    # interactive: a user is waiting for these
+    'notification.tasks.send_otp_email': {'queue': 'interactive'},
+    'notification.tasks.send_custom_email': {'queue': 'interactive'},
+    'notification.tasks.send_notification_email': {'queue': 'interactive'},
+    'courses.tasks.rebuild_student_feed': {'queue': 'interactive'},
+    # bulk: batch emails and announcement fan-out
+    'notification.tasks.send_bulk_notification_emails': {'queue': 'bulk'},
+    'notification.tasks.send_notification_email_batch': {'queue': 'bulk'},
+    'notification.tasks.send_announcement': {'queue': 'bulk'},
+    'users.tasks.import_users_task': {'queue': 'bulk'},
+    # maintenance: periodic and housekeeping tasks
+    'notification.tasks.cleanup_old_notifications': {'queue': 'maintenance'},
+    'notification.tasks.reconcile_unread_notification_counts': {'queue': 'maintenance'},
+    'authentication.tasks.*': {'queue': 'maintenance'},
+    'chat.tasks.*': {'queue': 'maintenance'},
+    'courses.tasks.*': {'queue': 'maintenance'},
+    'users.tasks.*': {'queue': 'maintenance'},
+    'outbox.tasks.*': {'queue': 'maintenance'},
+    'payments.tasks.cleanup_abandoned_payments': {'queue': 'maintenance'},
+    # payments: reserved for payment processing tasks. Payments are verified
+    # in the request and the webhook today, so nothing is routed here and
+    # start.sh doesn't start the lane; route such tasks here and add
+    # 'payments' to CELERY_LANES when they exist
+}
+
+# Set per worker by start_celery_lane.sh: lanes whose tasks are safe to
+# re-run acknowledge after completion, so a crashed worker's task is redelivered
+CELERY_TASK_ACKS_LATE = os.getenv('CELERY_TASK_ACKS_LATE', 'False').lower() == 'true'
+
+# Queue-wait targets per lane in seconds; longer waits are logged
+CELERY_LANE_LATENCY_SLO = {
+    'interactive': 5,
+    'payments': 30,
+    'bulk': 10 * 60,
+    'maintenance': 60 * 60,
+    'default': 60 * 60,
+}
 
 # Django Cache Configuration (using Redis/Upstash)
 # Use the same Redis connection as Celery, but with a different database number
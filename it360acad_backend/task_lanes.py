@@ -0,0 +1,106 @@
+"""
+Celery priority lanes and queue-wait measurement.
+
+Tasks are routed (settings.CELERY_TASK_ROUTES) to one of these queues,
+each consumed by its own worker (start_celery_lane.sh <lane>):
+
+- interactive: emails a user is waiting for (OTP codes, single notifications)
+- bulk: batch notification emails and announcement fan-out
+- payments: reserved for payment processing; no task is routed to it yet,
+  so the lane isn't started by default
+- maintenance: periodic cleanup, rebuilds and reconciliation (also
+  consumes the default queue)
+
+A bulk fan-out can then fill its own lane without delaying an OTP email.
+
+Every published task is stamped with its publish time; when a worker
+starts it, the time spent waiting in the queue is recorded in Redis
+(`celery:latency:{lane}`, the last LATENCY_SAMPLES waits per lane) and
+waits over the lane's CELERY_LANE_LATENCY_SLO are logged. See
+get_lane_latency() and the celeryLaneLatency command.
+"""
+import logging
+import time
+
+from celery.signals import before_task_publish, task_prerun
+from django.conf import settings
+
+from it360acad_backend.redis_client import get_redis, redis_key
+
+logger = logging.getLogger('api')
+
+LANES = ('interactive', 'bulk', 'payments', 'maintenance', 'default')
+LATENCY_KEY = 'celery:latency:{lane}'
+LATENCY_SAMPLES = 1000
+PUBLISHED_AT_HEADER = 'published_at'
+DEFAULT_WINDOW = 15 * 60  # seconds
+
+
+@before_task_publish.connect
+def stamp_publish_time(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def record_queue_wait(sender=None, task=None, **kwargs):
+    request = getattr(task, 'request', None)
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None) if request is not None else None
+    if not published_at:
+        # Eager or direct calls weren't published
+        return
+    delivery_info = getattr(request, 'delivery_info', None) or {}
+    lane = delivery_info.get('routing_key') or settings.CELERY_TASK_DEFAULT_QUEUE
+    record_wait(lane, time.time() - float(published_at), task.name)
+
+
+def record_wait(lane, wait, task_name=''):
+    """Store one queue-wait sample for a lane"""
+    slo = getattr(settings, 'CELERY_LANE_LATENCY_SLO', {}).get(lane)
+    if slo is not None and wait > slo:
+        logger.warning(f"Task {task_name} waited {wait:.1f}s in the {lane} queue (target {slo}s)")
+
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        key = redis_key(LATENCY_KEY.format(lane=lane))
+        pipe = r.pipeline(transaction=False)
+        pipe.lpush(key, f'{time.time():.3f}:{wait:.4f}')
+        pipe.ltrim(key, 0, LATENCY_SAMPLES - 1)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error recording queue wait for {lane}: {str(e)}")
+
+
+def _percentile(values, fraction):
+    index = min(len(values) - 1, max(0, round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def get_lane_latency(window=DEFAULT_WINDOW):
+    """
+    Queue-wait stats per lane over the last `window` seconds.
+
+    Returns:
+        dict: lane -> {samples, p50_ms, p95_ms, max_ms} (None values
+              without samples)
+    """
+    r = get_redis()
+    stats = {}
+    since = time.time() - window
+    for lane in LANES:
+        raw = r.lrange(redis_key(LATENCY_KEY.format(lane=lane)), 0, -1) if r is not None else []
+        waits = []
+        for sample in raw:
+            at, wait = (sample.decode() if isinstance(sample, bytes) else sample).split(':')
+            if float(at) >= since:
+                waits.append(float(wait) * 1000)
+        waits.sort()
+        stats[lane] = {
+            'samples': len(waits),
+            'p50_ms': round(_percentile(waits, 0.5), 1) if waits else None,
+            'p95_ms': round(_percentile(waits, 0.95), 1) if waits else None,
+            'max_ms': round(waits[-1], 1) if waits else None,
+        }
+    return stats
@@ -0,0 +1,329 @@
+"""
+Task publishing with a circuit breaker.
+
+A publish to an unreachable broker (a Redis/Upstash incident) blocks for
+the connection timeout and then fails. send_task() wraps publishing in a
+per-process circuit breaker so only the first few publishes pay that:
+
+- closed: tasks are published normally (without kombu's publish retries);
+  failure_threshold consecutive failures open the breaker
+- open: publishes fail immediately with BrokerUnavailable
+- after reset_timeout seconds one trial publish is let through
+  (half-open); success closes the breaker, failure opens it again
+
+publish_task() never raises. While the breaker is open, or when a
+publish fails, the task goes to a fallback instead:
+
+- FALLBACK_LOCAL: run in a bounded in-process thread pool; only for tasks
+  listed in CELERY_LOCAL_FALLBACK_TASKS (short, self-contained ones such
+  as OTP emails). When the pool is full, or the local run fails, the task
+  is spooled.
+- FALLBACK_SPOOL: append to a local spool file (TASK_SPOOL_DIR), published
+  again by replay_spool() once the broker is back. The outbox relay
+  replays the spool on every pass.
+
+Configured in settings.CELERY_PUBLISH_BREAKER:
+
+    CELERY_PUBLISH_BREAKER = {'failure_threshold': 3, 'reset_timeout': 30}
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from celery.utils.imports import symbol_by_name
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api')
+
+FALLBACK_LOCAL = 'local'
+FALLBACK_SPOOL = 'spool'
+
+DEFAULT_BREAKER = {
+    'failure_threshold': 3,
+    'reset_timeout': 30,  # seconds before a trial publish
+}
+DEFAULT_LOCAL_WORKERS = 2
+DEFAULT_LOCAL_QUEUE = 50  # tasks waiting for a local worker
+DEFAULT_SPOOL_MAX_BYTES = 50 * 1024 * 1024
+SPOOL_SUFFIX = '.jsonl'
+REPLAY_SUFFIX = '.replaying'
+
+
+class BrokerUnavailable(Exception):
+    """The publish circuit breaker is open"""
+
+
+_lock = threading.Lock()
+_breaker = {'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'trial': False}
+_executor = None
+_local_slots = None
+
+
+def _breaker_settings():
+    return {**DEFAULT_BREAKER, **getattr(settings, 'CELERY_PUBLISH_BREAKER', {})}
+
+
+def breaker_state():
+    """'closed', 'open' or 'half_open'"""
+    with _lock:
+        if _breaker['state'] == 'open' and time.monotonic() - _breaker['opened_at'] >= _breaker_settings()['reset_timeout']:
+            return 'half_open'
+        return _breaker['state']
+
+
+def _allow_publish():
+    with _lock:
+        if _breaker['state'] == 'closed':
+            return True
+        if time.monotonic() - _breaker['opened_at'] < _breaker_settings()['reset_timeout'] or _breaker['trial']:
+            return False
+        # Half-open: one trial publish at a time
+        _breaker['trial'] = True
+        return True
+
+
+def _record_success():
+    with _lock:
+        if _breaker['state'] == 'open':
+            logger.info("Broker reachable again, task publishing resumed")
+        _breaker.update(state='closed', failures=0, trial=False)
+
+
+def _record_failure(error):
+    with _lock:
+        _breaker['failures'] += 1
+        _breaker['trial'] = False
+        if _breaker['state'] == 'open' or _breaker['failures'] >= _breaker_settings()['failure_threshold']:
+            if _breaker['state'] != 'open':
+                logger.error(f"Task publishing disabled for {_breaker_settings()['reset_timeout']}s after {_breaker['failures']} failure(s): {str(error)}")
+            _breaker.update(state='open', opened_at=time.monotonic())
+
+
+def _task_name(task):
+    return task if isinstance(task, str) else task.name
+
+
+def send_task(task, args=None, kwargs=None, task_id=None, producer=None):
+    """
+    Publish a task through the circuit breaker.
+
+    Raises:
+        BrokerUnavailable: The breaker is open
+        Exception: The publish failed (counted by the breaker)
+
+    Returns:
+        str: Task id
+    """
+    from it360acad_backend.celery import app
+
+    if not _allow_publish():
+        raise BrokerUnavailable('Broker unavailable, publishing paused')
+    try:
+        result = app.send_task(
+            _task_name(task), args=args or [], kwargs=kwargs or {},
+            task_id=task_id, producer=producer, retry=False,
+        )
+    except Exception as e:
+        _record_failure(e)
+        raise
+    _record_success()
+    return result.id
+
+
+def publish_task(task, args=None, kwargs=None, fallback=FALLBACK_SPOOL):
+    """
+    Publish a task, falling back to local execution or the spool while the
+    broker is unavailable. Never raises.
+
+    Args:
+        task: Celery task or task name
+        args, kwargs: Task arguments (JSON serializable)
+        fallback: FALLBACK_LOCAL, FALLBACK_SPOOL or None (drop)
+
+    Returns:
+        str: Task id, or None if the task could not be published or
+             handed to a fallback
+    """
+    name = _task_name(task)
+    task_id = str(uuid.uuid4())
+    try:
+        return send_task(name, args, kwargs, task_id=task_id)
+    except Exception as e:
+        if not isinstance(e, BrokerUnavailable):
+            logger.error(f"Error publishing {name}: {str(e)}")
+
+    if fallback == FALLBACK_LOCAL and run_locally(name, args, kwargs, task_id=task_id):
+        return task_id
+    if fallback in (FALLBACK_LOCAL, FALLBACK_SPOOL) and spool_task(name, args, kwargs, task_id):
+        return task_id
+    logger.error(f"Dropped task {name}: broker unavailable and no fallback")
+    return None
+
+
+class LocalRunFailed(Exception):
+    """A task run in-process raised or reported failure"""
+
+
+def run_task_now(task, args=None, kwargs=None):
+    """
+    Run a task synchronously in this process.
+
+    Tasks in CELERY_LOCAL_FALLBACK_TASKS catch their own errors and return
+    False on failure (e.g. send_otp_email), so False counts as a failure.
+
+    Raises:
+        LocalRunFailed: The task raised or returned False
+    """
+    name = _task_name(task)
+    try:
+        # Task names are their import paths (shared_task default names)
+        result = symbol_by_name(name).apply(args=args or [], kwargs=kwargs or {}, throw=True).get()
+    except Exception as e:
+        raise LocalRunFailed(f"{name} failed: {str(e)}") from e
+    if result is False:
+        raise LocalRunFailed(f"{name} reported failure")
+    return result
+
+
+def _run_local(name, args, kwargs, task_id):
+    try:
+        run_task_now(name, args, kwargs)
+    except Exception as e:
+        # Not lost: published again once the broker is back
+        logger.error(f"Error running {name} locally, spooling it: {str(e)}")
+        spool_task(name, args, kwargs, task_id)
+    finally:
+        _local_slots.release()
+        connections.close_all()
+
+
+def run_locally(task, args=None, kwargs=None, task_id=None):
+    """
+    Run a task in the bounded in-process pool. If the run fails, the task
+    is spooled for replay_spool().
+
+    Returns:
+        bool: False if the task isn't allowed to run locally or the pool is full
+    """
+    global _executor, _local_slots
+
+    name = _task_name(task)
+    if name not in getattr(settings, 'CELERY_LOCAL_FALLBACK_TASKS', ()):
+        return False
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, 'CELERY_LOCAL_FALLBACK_WORKERS', DEFAULT_LOCAL_WORKERS)
+            queued = getattr(settings, 'CELERY_LOCAL_FALLBACK_QUEUE', DEFAULT_LOCAL_QUEUE)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task-fallback')
+            _local_slots = threading.BoundedSemaphore(workers + queued)
+    if not _local_slots.acquire(blocking=False):
+        logger.warning(f"Local task pool full, not running {name} locally")
+        return False
+    _executor.submit(_run_local, name, args, kwargs, task_id)
+    logger.warning(f"Broker unavailable, running {name} in-process")
+    return True
+
+
+def _spool_dir():
+    return str(getattr(settings, 'TASK_SPOOL_DIR', os.path.join(settings.BASE_DIR, 'logs', 'task_spool')))
+
+
+def _spool_path():
+    # One file per process: appends never interleave
+    return os.path.join(_spool_dir(), f'{os.getpid()}{SPOOL_SUFFIX}')
+
+
+def spool_task(task, args=None, kwargs=None, task_id=None):
+    """
+    Append a task to this process's spool file for replay_spool().
+
+    Returns:
+        bool: False if the spool is full or can't be written
+    """
+    name = _task_name(task)
+    line = json.dumps({
+        'task': name, 'args': list(args or []), 'kwargs': kwargs or {},
+        'task_id': task_id or str(uuid.uuid4()), 'spooled_at': time.time(),
+    }) + '\n'
+    try:
+        os.makedirs(_spool_dir(), exist_ok=True)
+        if spool_size() + len(line) > getattr(settings, 'TASK_SPOOL_MAX_BYTES', DEFAULT_SPOOL_MAX_BYTES):
+            logger.error(f"Task spool full, dropping {name}")
+            return False
+        with _lock, open(_spool_path(), 'a') as spool:
+            spool.write(line)
+        logger.warning(f"Broker unavailable, spooled {name} for later publishing")
+        return True
+    except Exception as e:
+        logger.error(f"Error spooling {name}: {str(e)}")
+        return False
+
+
+def spool_size():
+    """Bytes waiting in the spool"""
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(_spool_dir()) if entry.is_file())
+    except FileNotFoundError:
+        return 0
+
+
+def replay_spool():
+    """
+    Publish spooled tasks (with their original task ids). Each spool file
+    is claimed by renaming it, so concurrent replays don't publish a task
+    twice. Stops at the first failure and puts the rest back.
+
+    Returns:
+        int: Tasks published
+    """
+    if breaker_state() == 'open':
+        return 0
+    try:
+        names = sorted(name for name in os.listdir(_spool_dir()) if name.endswith((SPOOL_SUFFIX, REPLAY_SUFFIX)))
+    except FileNotFoundError:
+        return 0
+
+    published = 0
+    for name in names:
+        path = os.path.join(_spool_dir(), name)
+        if name.endswith(SPOOL_SUFFIX):
+            claimed = f'{path[:-len(SPOOL_SUFFIX)]}.{uuid.uuid4().hex}{REPLAY_SUFFIX}'
+            try:
+                os.rename(path, claimed)
+                os.utime(claimed)
+            except FileNotFoundError:
+                continue
+        elif time.time() - os.path.getmtime(path) > 10 * 60:
+            # Left behind by a replay that died
+            claimed = path
+        else:
+            continue
+
+        with open(claimed) as spool:
+            lines = [line for line in spool if line.strip()]
+        for index, line in enumerate(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Partial line from a process that died mid-write
+                logger.error(f"Skipping unreadable spool entry in {name}")
+                continue
+            try:
+                send_task(entry['task'], entry['args'], entry['kwargs'], task_id=entry['task_id'])
+            except Exception as e:
+                logger.error(f"Error replaying spooled task {entry['task']}: {str(e)}")
+                with _lock, open(_spool_path(), 'a') as spool:
+                    spool.writelines(lines[index:])
+                os.remove(claimed)
+                return published
+            published += 1
+        os.remove(claimed)
+
+    if published:
+        logger.info(f"Replayed {published} spooled task(s)")
+    return published
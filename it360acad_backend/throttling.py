@@ -0,0 +1,168 @@
+"""
+Token-bucket rate limiting in Redis.
+
+Views opt in with a scope, like DRF's ScopedRateThrottle:
+
+    class UserLoginView(APIView):
+        throttle_classes = [TokenBucketThrottle]
+        throttle_scope = 'auth_login'
+
+settings.RATE_LIMITS maps each scope to its buckets:
+
+    RATE_LIMITS = {
+        'auth_login': {'ip': '30/min', 'identifier': '10/min'},
+    }
+
+A rate 'N/period' is a bucket of N tokens refilled at N per period, so
+bursts of up to N are allowed. 'ip' buckets are keyed by client address
+(the X-Forwarded-For entry added by our own proxy, see NUM_PROXIES in
+settings.REST_FRAMEWORK, so clients can't pick their bucket),
+'identifier' buckets by the email in the request (body or query string).
+All of a request's buckets are checked and charged by one Lua script, in
+one round trip; a request is only charged if every bucket has a token.
+
+Denied requests get DRF's 429 response with a Retry-After header. When
+Redis is unavailable (local memory cache, outage) requests are allowed.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from it360acad_backend.redis_client import get_redis, redis_key
+
+logger = logging.getLogger('api')
+
+BUCKET_KEY = 'ratelimit:{scope}:{kind}:{value}'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+IDENTIFIER_FIELDS = ('email',)
+
+# KEYS: bucket keys
+# ARGV[1]: now (seconds); then capacity and refill rate (tokens/second) per key
+# Returns {allowed (1/0), seconds to wait (string, Lua numbers are truncated in replies)}
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+  local available = tonumber(bucket[1]) or capacity
+  local ts = tonumber(bucket[2]) or now
+  available = math.min(capacity, available + math.max(0, now - ts) * rate)
+  tokens[i] = available
+  if available < 1 then
+    wait = math.max(wait, (1 - available) / rate)
+  end
+end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local remaining = tokens[i]
+  if wait == 0 then
+    remaining = remaining - 1
+  end
+  redis.call('HSET', key, 'tokens', tostring(remaining), 'ts', tostring(now))
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+if wait == 0 then
+  return {1, '0'}
+end
+return {0, tostring(wait)}
+"""
+
+_token_bucket_script = None
+
+
+def parse_rate(rate):
+    """
+    Parse 'N/period' (period: s, sec, m, min, h, hour, d, day).
+
+    Returns:
+        tuple: (capacity, refill rate in tokens per second)
+    """
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period.strip()[0]]
+
+
+def consume(buckets):
+    """
+    Take one token from every bucket, or none if any bucket is empty.
+
+    Args:
+        buckets: List of (key, capacity, refill rate per second)
+
+    Returns:
+        tuple: (allowed, seconds until the request would be allowed)
+    """
+    global _token_bucket_script
+    r = get_redis()
+    if r is None or not buckets:
+        return True, 0.0
+    if _token_bucket_script is None:
+        _token_bucket_script = r.register_script(TOKEN_BUCKET_SCRIPT)
+
+    args = [time.time()]
+    for _, capacity, rate in buckets:
+        args.extend([capacity, rate])
+    try:
+        allowed, wait = _token_bucket_script(keys=[redis_key(key) for key, _, _ in buckets], args=args)
+    except Exception as e:
+        logger.error(f"Error checking rate limit: {str(e)}")
+        return True, 0.0
+    return bool(int(allowed)), float(wait)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Rate limit a view by its `throttle_scope` policy in settings.RATE_LIMITS"""
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, 'throttle_scope', None)
+        policy = getattr(settings, 'RATE_LIMITS', {}).get(scope)
+        if not policy:
+            return True
+
+        buckets = []
+        for kind, rate in policy.items():
+            value = self.get_bucket_value(request, kind)
+            if value is None:
+                continue
+            capacity, refill = parse_rate(rate)
+            buckets.append((BUCKET_KEY.format(scope=scope, kind=kind, value=value), capacity, refill))
+
+        allowed, wait = consume(buckets)
+        if not allowed:
+            self.wait_seconds = wait
+            logger.warning(f"Rate limit exceeded for {scope} from {self.get_ident(request)}")
+        return allowed
+
+    def get_bucket_value(self, request, kind):
+        if kind == 'ip':
+            return self.get_ident(request)
+        if kind == 'identifier':
+            identifier = self.get_identifier(request)
+            if identifier:
+                return hashlib.sha256(identifier.encode()).hexdigest()[:32]
+            return None
+        raise ValueError(f"Unknown rate limit bucket kind: {kind}")
+
+    def get_identifier(self, request):
+        """The account the request targets (e.g. the email being logged into)"""
+        for field in IDENTIFIER_FIELDS:
+            value = request.query_params.get(field)
+            if not value:
+                try:
+                    value = request.data.get(field) if hasattr(request.data, 'get') else None
+                except Exception:
+                    value = None
+            if isinstance(value, str) and value.strip():
+                return value.strip().lower()
+        return None
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,388 @@
+"""
+Two-tier cache: a bounded in-process LRU in front of the Redis cache.
+
+- Local tier: per-process LRU with a short TTL, so hot keys are served from
+  memory without a round trip to Upstash.
+- Remote tier: the Django cache (django-redis). Values are stored in an
+  envelope with their recompute time and expiry for early refresh.
+- Invalidation: delete()/publish_invalidation() broadcast the key over Redis
+  pub/sub; every process drops it from its local tier. If the subscription
+  drops, local tiers are cleared on reconnect and the short TTL bounds
+  staleness in the meantime.
+- Single flight: on a miss only the process holding a Redis lock recomputes;
+  the others wait briefly for the value instead of stampeding the database.
+  Each lock holds a random token and is released with a compare-and-delete
+  script, so a fill that outlived LOCK_TIMEOUT can't release the lock of
+  the process that took over.
+- Probabilistic early refresh (XFetch): shortly before expiry a reader may
+  volunteer to recompute while everyone else keeps getting the cached value.
+
+Values held in the local tier are shared between callers and must be
+treated as read-only.
+"""
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from it360acad_backend.redis_client import get_redis, redis_key
+
+logger = logging.getLogger('api')
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+CLEAR_ALL = '*'
+
+DEFAULT_LOCAL_TTL = 5  # seconds
+DEFAULT_LOCAL_MAX_ENTRIES = 1024
+DEFAULT_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 30  # seconds a fill may take before another process takes over
+LOCK_WAIT = 2.0  # seconds to wait for another process's fill
+LOCK_POLL_INTERVAL = 0.05
+EARLY_REFRESH_BETA = 1.0  # > 1 refreshes earlier, < 1 later
+
+# KEYS[1]: lock key; ARGV[1]: token of the fill releasing it
+# Returns 1 if the lock was released, 0 if it expired or another fill holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_release_lock_script = None
+
+
+def _get_release_lock_script(r):
+    global _release_lock_script
+    if _release_lock_script is None:
+        _release_lock_script = r.register_script(RELEASE_LOCK_SCRIPT)
+    return _release_lock_script
+
+
+def _lock_key(key):
+    return f"lock:{key}"
+
+
+class LocalLRU:
+    """Thread-safe bounded LRU with per-entry expiry"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, entry)"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return False, None
+            local_expiry, entry = item
+            if local_expiry <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    A namespace of cache keys served through the local and Redis tiers.
+
+    Usage:
+        user_cache = TieredCache('users')
+        data = user_cache.get_or_set('users:detail:1', lambda: build(), timeout=3600)
+        user_cache.delete('users:detail:1')
+    """
+
+    def __init__(self, namespace, local_ttl=DEFAULT_LOCAL_TTL, local_max_entries=DEFAULT_LOCAL_MAX_ENTRIES):
+        self.namespace = namespace
+        self.local = LocalLRU(local_max_entries, local_ttl)
+        self.counters = {'local_hits': 0, 'remote_hits': 0, 'misses': 0, 'fills': 0, 'early_refreshes': 0}
+        _listener.register(self)
+
+    # Reads
+
+    def get(self, key, default=None):
+        """Get a value from the local tier, then Redis"""
+        entry = self._get_entry(key)
+        return entry[0] if entry is not None else default
+
+    def get_or_set(self, key, producer, timeout=DEFAULT_TIMEOUT):
+        """
+        Get a value, computing and caching it with `producer` on a miss.
+
+        Only one process runs `producer` for a key at a time; the others
+        wait up to LOCK_WAIT for its result before computing themselves.
+        """
+        entry = self._get_entry(key)
+        if entry is not None:
+            value, delta, expiry = entry
+            if not self._should_refresh_early(delta, expiry):
+                return value
+            # Volunteer to refresh; if someone else already is, serve the current value
+            lock_token = self._acquire_lock(key)
+            if lock_token is None:
+                return value
+            self.counters['early_refreshes'] += 1
+            return self._fill(key, producer, timeout, lock_token)
+
+        lock_token = self._acquire_lock(key)
+        if lock_token is not None:
+            return self._fill(key, producer, timeout, lock_token)
+
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = self._get_remote_entry(key)
+            if entry is not None:
+                self.local.set(key, entry)
+                return entry[0]
+        logger.warning(f"Timed out waiting for cache fill of {key}, computing locally")
+        return self._fill(key, producer, timeout, None)
+
+    def get_counter(self, key, initial=1, timeout=None):
+        """
+        Get an integer counter (e.g. a generation number) through the local
+        tier, creating it in Redis if missing. Counters are stored raw, not
+        in an envelope, so they can be changed with incr().
+        """
+        found, value = self.local.get(key)
+        if found:
+            self.counters['local_hits'] += 1
+            return value
+        _listener.ensure_started()
+        value = cache.get(key)
+        if value is None:
+            cache.add(key, initial, timeout=timeout)
+            value = cache.get(key) or initial
+        self.local.set(key, value)
+        return value
+
+    def incr(self, key, initial=1, timeout=None):
+        """
+        Increment a counter in Redis and drop it from every local tier.
+        With a timeout, the counter expires that long after its last increment.
+        """
+        try:
+            value = cache.incr(key)
+            if timeout:
+                cache.touch(key, timeout)
+        except ValueError:
+            # Counter missing (first write or evicted) - start past the initial value
+            cache.add(key, initial + 1, timeout=timeout)
+            value = cache.get(key)
+        self.publish_invalidation(key)
+        return value
+
+    # Writes
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, delta=0.0):
+        """Write a value to both tiers"""
+        _listener.ensure_started()
+        entry = (value, delta, time.time() + timeout if timeout else None)
+        try:
+            cache.set(key, entry, timeout)
+        except Exception as e:
+            logger.error(f"Error writing cache key {key}: {str(e)}")
+        self.local.set(key, entry)
+
+    def delete(self, *keys):
+        """Delete keys from Redis and every process's local tier"""
+        try:
+            cache.delete_many(keys)
+        except Exception as e:
+            logger.error(f"Error deleting cache keys {keys}: {str(e)}")
+        self.publish_invalidation(*keys)
+
+    def publish_invalidation(self, *keys):
+        """
+        Drop keys from every process's local tier.
+        Use after changing a key in Redis without going through set()/delete()
+        (e.g. cache.incr).
+        """
+        for key in keys:
+            if key == CLEAR_ALL:
+                self.local.clear()
+            else:
+                self.local.delete(key)
+        r = get_redis()
+        if r is None:
+            return
+        try:
+            pipe = r.pipeline(transaction=False)
+            for key in keys:
+                pipe.publish(redis_key(INVALIDATION_CHANNEL), f"{self.namespace}|{key}")
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error publishing cache invalidation for {keys}: {str(e)}")
+
+    # Internals
+
+    def _get_entry(self, key):
+        _listener.ensure_started()
+        found, entry = self.local.get(key)
+        if found:
+            self.counters['local_hits'] += 1
+            return entry
+        entry = self._get_remote_entry(key)
+        if entry is None:
+            self.counters['misses'] += 1
+            return None
+        self.counters['remote_hits'] += 1
+        self.local.set(key, entry)
+        return entry
+
+    def _get_remote_entry(self, key):
+        try:
+            entry = cache.get(key)
+        except Exception as e:
+            logger.error(f"Error reading cache key {key}: {str(e)}")
+            return None
+        # Entries written before the envelope format are treated as misses
+        if not isinstance(entry, tuple) or len(entry) != 3:
+            return None
+        return entry
+
+    def _fill(self, key, producer, timeout, lock_token):
+        try:
+            start = time.perf_counter()
+            value = producer()
+            delta = time.perf_counter() - start
+            self.counters['fills'] += 1
+            self.set(key, value, timeout, delta=delta)
+            return value
+        finally:
+            if lock_token is not None:
+                self._release_lock(key, lock_token)
+
+    def _should_refresh_early(self, delta, expiry):
+        if not delta or expiry is None:
+            return False
+        # XFetch: the closer to expiry and the costlier the value, the likelier a refresh
+        return time.time() - delta * EARLY_REFRESH_BETA * math.log(random.random() or 1e-12) >= expiry
+
+    def _acquire_lock(self, key):
+        """
+        Returns:
+            str: Token to release the lock with, or None if another process holds it
+        """
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        try:
+            r = get_redis()
+            if r is None:
+                acquired = cache.add(_lock_key(key), token, LOCK_TIMEOUT)
+            else:
+                acquired = r.set(redis_key(_lock_key(key)), token, nx=True, ex=LOCK_TIMEOUT)
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Error acquiring fill lock for {key}: {str(e)}")
+            return token  # Redis is down: compute without coordination
+
+    def _release_lock(self, key, token):
+        try:
+            r = get_redis()
+            if r is None:
+                # Local memory cache (development): single process, no race to guard
+                if cache.get(_lock_key(key)) == token:
+                    cache.delete(_lock_key(key))
+            else:
+                _get_release_lock_script(r)(keys=[redis_key(_lock_key(key))], args=[token])
+        except Exception as e:
+            logger.error(f"Error releasing fill lock for {key}: {str(e)}")
+
+
+class InvalidationListener:
+    """
+    One pub/sub subscription per process that drops invalidated keys from
+    every registered TieredCache. Started lazily and restarted after fork.
+    """
+
+    def __init__(self):
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def register(self, tiered_cache):
+        self._caches[tiered_cache.namespace] = tiered_cache
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            thread = threading.Thread(target=self._run, name='cache-invalidation', daemon=True)
+            thread.start()
+
+    def _run(self):
+        while True:
+            r = get_redis()
+            if r is None:
+                return  # Not on Redis (local memory cache): nothing to listen to
+            pubsub = None
+            try:
+                pubsub = r.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(redis_key(INVALIDATION_CHANNEL))
+                # Anything published while we were disconnected is lost
+                self._clear_all()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message['type'] == 'message':
+                        self._handle(message['data'])
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error, resubscribing: {str(e)}")
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _handle(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        namespace, _, key = data.partition('|')
+        tiered_cache = self._caches.get(namespace)
+        if tiered_cache is None:
+            return
+        if key == CLEAR_ALL:
+            tiered_cache.local.clear()
+        else:
+            tiered_cache.local.delete(key)
+
+    def _clear_all(self):
+        for tiered_cache in list(self._caches.values()):
+            tiered_cache.local.clear()
+
+
+_listener = InvalidationListener()
+
+
+def start_invalidation_listener():
+    """Start this process's invalidation subscription (idempotent, fork-safe)"""
+    _listener.ensure_started()
@@ -2,8 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from rest_framework_nested import routers
-from courses.views import CategoryViewSet, CourseViewSet, LessonViewSet, QuizViewSet, CourseEnrollmentViewSet, CertificateViewSet, CourseBookmarkViewSet, CourseReviewViewSet, QuizAttemptViewSet
-from notification.views import NotificationPreferenceViewSet, NotificationViewSet
+from courses.views import CategoryViewSet, CourseViewSet, LessonViewSet, QuizViewSet, CourseEnrollmentViewSet, CertificateViewSet, CourseBookmarkViewSet, CourseReviewViewSet, QuizAttemptViewSet, ActivityViewSet
+from notification.views import NotificationPreferenceViewSet, NotificationViewSet, AnnouncementView
 from users.views import StudentViewSet
 from payments.views import PaymentViewSet, paystack_webhook
 
@@ -18,6 +18,7 @@ router.register(r'reviews', CourseReviewViewSet, basename='reviews')
 router.register(r'quiz-attempts', QuizAttemptViewSet, basename='quiz-attempts')
 router.register(r'notifications', NotificationViewSet, basename='notifications')
 router.register(r'payments', PaymentViewSet, basename='payments')
+router.register(r'activity', ActivityViewSet, basename='activity')
 
 # Nested router: courses/{course_id}/enrollments
 courses_router = routers.NestedDefaultRouter(router, r'courses', lookup='course')
@@ -55,6 +56,8 @@ urlpatterns = [
     # Apps
     path('api/auth/', include('authentication.urls')),
     path('api/users/', include('users.urls')),
+    # Before the router so 'announcements' isn't matched as a notification id
+    path('api/notifications/announcements/', AnnouncementView.as_view(), name='notification-announcements'),
 
     # Main routes
     path('api/', include(router.urls)),
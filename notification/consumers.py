@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from notification.push import user_group, MAX_NOTIFICATIONS_PER_MESSAGE
+from notification.unread import get_unread_count
+
+# Messages arriving within this window are sent to the client as one frame
+COALESCE_SECONDS = 0.25
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes the authenticated user's new notifications.
+
+    On connect the client gets {"type": "unread_count", "unread_count": n};
+    afterwards {"type": "notifications", "count": n, "truncated": bool,
+    "notifications": [...]} whenever notifications are created for them,
+    so connected clients don't need to poll.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close(code=4001)
+            return
+
+        self.group_name = user_group(self.user.id)
+        self.pending = []
+        self.pending_count = 0
+        self.pending_truncated = False
+        self.flush_task = None
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        unread_count = await database_sync_to_async(get_unread_count)(self.user.id)
+        await self.send(text_data=json.dumps({'type': 'unread_count', 'unread_count': unread_count}))
+
+    async def disconnect(self, close_code):
+        if getattr(self, 'group_name', None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if getattr(self, 'flush_task', None):
+            self.flush_task.cancel()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Push only; reads and updates go through the REST API
+        pass
+
+    async def notifications_new(self, event):
+        self.pending.extend(event['notifications'])
+        self.pending_count += event['count']
+        self.pending_truncated = self.pending_truncated or event['truncated']
+        if len(self.pending) > MAX_NOTIFICATIONS_PER_MESSAGE:
+            self.pending = self.pending[-MAX_NOTIFICATIONS_PER_MESSAGE:]
+            self.pending_truncated = True
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_pending())
+
+    async def flush_pending(self):
+        await asyncio.sleep(COALESCE_SECONDS)
+        notifications, count, truncated = self.pending, self.pending_count, self.pending_truncated
+        self.pending, self.pending_count, self.pending_truncated = [], 0, False
+        self.flush_task = None
+        await self.send(text_data=json.dumps({
+            'type': 'notifications',
+            'count': count,
+            'truncated': truncated,
+            'notifications': notifications,
+        }))
@@ -0,0 +1,149 @@
+"""
+Bulk notification fan-out (announcements).
+
+fan_out_notification() sends one notification to everyone in an audience:
+
+- 'course': students actively enrolled in a course
+- 'category': students interested in a category (Student.categories)
+- 'course_parents': parents of students actively enrolled in a course
+
+Recipient ids are streamed with a server-side cursor (QuerySet.iterator)
+and handled in chunks: each chunk of Notification rows is written with one
+bulk_create and, in the same transaction, its ids are queued for the
+batch email sender (notification.tasks.send_notification_email_batch)
+through the outbox. Only one chunk is in memory at a time, whatever the
+audience size.
+
+bulk_create skips post_save, so per-notification signal work does not run
+for fan-out rows; unread counters and WebSocket pushes (one message per
+recipient) are handled once per chunk instead.
+"""
+import logging
+import time
+
+from django.db import transaction
+
+from courses.models.category import Category
+from courses.models.course import Course
+from courses.models.enrollment import CourseEnrollment
+from users.models import Student, Parent
+from notification.models import Notification
+from notification.mailer import chunked
+from notification.unread import record_new_unread
+from notification.push import notification_payload, publish_notifications
+from it360acad_backend.commit_hooks import on_commit_batched
+from outbox.relay import enqueue_tasks
+
+logger = logging.getLogger('notification')
+
+FANOUT_CHUNK_SIZE = 1000
+
+# audience: (target model, recipient_type)
+AUDIENCES = {
+    'course': (Course, 'student'),
+    'category': (Category, 'student'),
+    'course_parents': (Course, 'parent'),
+}
+
+
+def get_audience_target(audience, target_id):
+    """Return the course/category an audience refers to, or None if it doesn't exist"""
+    model, _ = AUDIENCES[audience]
+    return model.objects.filter(pk=target_id).first()
+
+
+def recipient_user_ids(audience, target_id):
+    """
+    Queryset of recipient user ids for an audience, without duplicates.
+
+    Args:
+        audience: One of AUDIENCES
+        target_id: Course or category ID
+
+    Returns:
+        QuerySet: Flat values_list of user ids, ordered for stable streaming
+    """
+    if audience == 'course':
+        queryset = CourseEnrollment.objects.filter(course_id=target_id, status='active', user__is_active=True)
+    elif audience == 'category':
+        queryset = Student.objects.filter(categories=target_id, user__is_active=True)
+    elif audience == 'course_parents':
+        queryset = Parent.objects.filter(
+            students__user__enrollments__course_id=target_id,
+            students__user__enrollments__status='active',
+            user__is_active=True,
+        ).distinct()
+    else:
+        raise ValueError(f"Unknown audience: {audience}")
+    return queryset.order_by('user_id').values_list('user_id', flat=True)
+
+
+def fan_out_notification(audience, target_id, title, message, notification_type='course_update',
+                         action_url='', send_email=True, chunk_size=FANOUT_CHUNK_SIZE):
+    """
+    Create a notification for every recipient in an audience and queue the emails.
+
+    Args:
+        audience: 'course', 'category' or 'course_parents'
+        target_id: Course or category ID
+        title: Notification title (also the email subject)
+        message: Notification body (also the email body)
+        notification_type: Notification.NOTIFICATION_TYPES value
+        action_url: Optional deep link
+        send_email: Queue batch emails for the created notifications
+        chunk_size: Recipients per bulk_create
+
+    Returns:
+        dict: created notifications, queued email batches and elapsed seconds
+    """
+    # Imported here: notification.tasks imports this module
+    from notification.tasks import send_notification_email_batch
+
+    _, recipient_type = AUDIENCES[audience]
+    related_object_type = 'category' if audience == 'category' else 'course'
+    started = time.perf_counter()
+    results = {'created': 0, 'email_batches': 0}
+
+    def flush(user_ids):
+        with transaction.atomic():
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    user_id=user_id,
+                    recipient_type=recipient_type,
+                    notification_type=notification_type,
+                    title=title,
+                    message=message,
+                    action_url=action_url,
+                    related_object_id=target_id,
+                    related_object_type=related_object_type,
+                )
+                for user_id in user_ids
+            ])
+            # Email batches commit with the chunk's notifications
+            batches = []
+            if send_email:
+                batches = [(ids,) for ids in chunked([notification.id for notification in notifications])]
+                enqueue_tasks(send_notification_email_batch, batches)
+        results['created'] += len(notifications)
+        on_commit_batched('notification:unread', record_new_unread, *user_ids)
+        on_commit_batched(
+            'notification:push', publish_notifications,
+            *[notification_payload(notification) for notification in notifications]
+        )
+        results['email_batches'] += len(batches)
+
+    chunk = []
+    for user_id in recipient_user_ids(audience, target_id).iterator(chunk_size=chunk_size):
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    results['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    logger.info(
+        f"Fan-out to {audience} {target_id}: {results['created']} notifications, "
+        f"{results['email_batches']} email batches in {results['elapsed_seconds']}s"
+    )
+    return results
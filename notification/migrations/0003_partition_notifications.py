@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 10:12
+
+from django.db import migrations
+
+from it360acad_backend.partitions import convert_to_partitioned
+
+
+def partition_notifications(apps, schema_editor):
+    convert_to_partitioned(schema_editor, 'notification_notification', 'created_at')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0002_notification_user_created_at_index'),
+    ]
+
+    operations = [
+        # PostgreSQL only; the model state is unchanged. Not reversible in
+        # place: rolling back leaves the (compatible) partitioned table.
+        migrations.RunPython(partition_notifications, migrations.RunPython.noop),
+    ]
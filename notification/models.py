@@ -43,6 +43,7 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read', '-created_at']),
+            models.Index(fields=['user', '-created_at']),
         ]
     
     def __str__(self):
@@ -50,10 +51,17 @@ class Notification(models.Model):
     
     def mark_as_read(self):
         from django.utils import timezone
+        from it360acad_backend.commit_hooks import on_commit_batched
+        from notification.unread import record_reads
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            # Conditional update so concurrent calls only count one read
+            updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True, read_at=self.read_at
+            )
+            if updated:
+                on_commit_batched('notification:read', record_reads, self.user_id)
 
 
 class NotificationPreference(models.Model):
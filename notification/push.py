@@ -0,0 +1,82 @@
+"""
+Real-time notification delivery over Channels.
+
+Connected clients join their user's group (`notifications_{user_id}`,
+see notification.consumers.NotificationConsumer). New notifications are
+published to that group after the creating transaction commits:
+
+- single notifications from post_save, fan-out chunks from
+  notification.fanout, both through the 'notification:push' commit batch
+- a user's notifications from one batch go out as one channel layer
+  message, so a burst (or a fan-out chunk) is one send per user
+- the consumer coalesces messages arriving close together into one
+  WebSocket frame
+
+All sends of a batch run in one event loop. Users without an open socket
+cost one empty group lookup in the channel layer.
+"""
+import logging
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger('notification')
+
+GROUP_NAME = 'notifications_{user_id}'
+# Larger bursts are sent truncated; the client refetches the list
+MAX_NOTIFICATIONS_PER_MESSAGE = 50
+
+
+def user_group(user_id):
+    return GROUP_NAME.format(user_id=user_id)
+
+
+def notification_payload(notification):
+    """Compact representation sent to clients"""
+    return {
+        'id': notification.id,
+        'user_id': notification.user_id,
+        'notification_type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'action_url': notification.action_url,
+        'related_object_id': notification.related_object_id,
+        'related_object_type': notification.related_object_type,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def publish_notifications(payloads):
+    """
+    Send notification payloads to their users' groups, one message per user.
+
+    Args:
+        payloads: List of notification_payload() dicts
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not payloads:
+        return
+
+    by_user = defaultdict(list)
+    for payload in payloads:
+        by_user[payload['user_id']].append(payload)
+
+    messages = []
+    for user_id, notifications in by_user.items():
+        messages.append((user_group(user_id), {
+            'type': 'notifications.new',
+            'count': len(notifications),
+            'truncated': len(notifications) > MAX_NOTIFICATIONS_PER_MESSAGE,
+            'notifications': notifications[-MAX_NOTIFICATIONS_PER_MESSAGE:],
+        }))
+
+    async def send_all():
+        for group, message in messages:
+            try:
+                await channel_layer.group_send(group, message)
+            except Exception as e:
+                logger.error(f"Error publishing notifications to {group}: {str(e)}")
+
+    async_to_sync(send_all)()
@@ -1,4 +1,5 @@
 from notification.models import Notification, NotificationPreference
+from notification.fanout import AUDIENCES, get_audience_target
 from rest_framework import serializers
 from users.serializers import UserSerializer
 
@@ -26,10 +27,34 @@ class NotificationSerializer(serializers.ModelSerializer):
       return f"{delta.seconds} seconds ago"
     
 
+class NotificationListSerializer(serializers.ModelSerializer):
+  """Inbox rows: the requesting user's own notifications, so no user object"""
+  class Meta:
+    model = Notification
+    fields = ['id', 'notification_type', 'title', 'message', 'action_url', 'related_object_id', 'related_object_type', 'is_read', 'read_at', 'created_at']
+    read_only_fields = fields
+
+
 class NotificationPreferenceSerializer(serializers.ModelSerializer):
   """Serializer for the NotificationPreference model"""
   class Meta:
     model = NotificationPreference
     fields = ['id', 'user', 'email_enrollment', 'email_payment', 'email_course_updates', 'email_reminders', 'email_marketing', 'push_enabled', 'created_at', 'updated_at']
 
-    
\ No newline at end of file
+    
+
+
+class AnnouncementSerializer(serializers.Serializer):
+  """Notification sent to everyone in a course, category or to parents of a course's students"""
+  audience = serializers.ChoiceField(choices=list(AUDIENCES), help_text="'course' (enrolled students), 'category' (interested students) or 'course_parents'")
+  target_id = serializers.IntegerField(help_text='Course ID, or category ID for the category audience')
+  title = serializers.CharField(max_length=200)
+  message = serializers.CharField()
+  notification_type = serializers.ChoiceField(choices=Notification.NOTIFICATION_TYPES, default='course_update')
+  action_url = serializers.CharField(max_length=500, required=False, allow_blank=True, default='')
+  send_email = serializers.BooleanField(default=True)
+
+  def validate(self, attrs):
+    if get_audience_target(attrs['audience'], attrs['target_id']) is None:
+      raise serializers.ValidationError({'target_id': f"No {str(AUDIENCES[attrs['audience']][0]._meta.verbose_name).lower()} with this ID"})
+    return attrs
@@ -4,6 +4,10 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from users.models import User
 from notification.models import Notification, NotificationPreference
+from notification.unread import record_new_unread
+from notification.push import notification_payload, publish_notifications
+from it360acad_backend.commit_hooks import on_commit_batched
+from outbox.relay import enqueue_task
 import logging
 from courses.models.enrollment import CourseEnrollment
 
@@ -18,6 +22,20 @@ def create_notification_preferences(sender, instance, created, **kwargs):
     logger.info(f"Notification preferences created for user: {instance.email}")
 
 
+@receiver(post_save, sender=Notification)
+def count_new_unread_notification(sender, instance, created, **kwargs):
+  """ Bump the user's unread counter once the notification is committed"""
+  if created and not instance.is_read:
+    on_commit_batched('notification:unread', record_new_unread, instance.user_id)
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+  """ Publish the notification to the user's WebSocket group once it is committed"""
+  if created:
+    on_commit_batched('notification:push', publish_notifications, notification_payload(instance))
+
+
 # Send notification to user when they are enrolled in a course
 @receiver(post_save, sender=CourseEnrollment)
 def send_enrollment_notification(sender, instance: CourseEnrollment, created, **kwargs):
@@ -33,13 +51,10 @@ def send_enrollment_notification(sender, instance: CourseEnrollment, created, **
     )
     logger.info(f"Enrollment notification created for user: {instance.user.email}")
     
-    # Send email notification asynchronously using Celery
-    try:
-      from .tasks import send_notification_email
-      send_notification_email.delay(notification.id)
-      logger.info(f"Email notification queued for notification {notification.id}")
-    except Exception as e:
-      logger.error(f"Failed to queue email notification: {str(e)}")
+    # Email is published by the outbox relay once the enrollment commits
+    from .tasks import send_notification_email
+    enqueue_task(send_notification_email, notification.id)
+    logger.info(f"Email notification queued for notification {notification.id}")
     
     return notification
 
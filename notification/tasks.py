@@ -8,7 +8,12 @@ from celery import shared_task
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
-from .models import Notification, NotificationPreference
+from .models import Notification
+from .mailer import send_notification_emails, chunked
+from .fanout import fan_out_notification
+from .unread import reconcile_unread_counts
+from it360acad_backend.retention import delete_expired, retention_cutoff, get_policy
+from it360acad_backend.partitions import maintain_partitions
 from users.models import User
 import logging
 
@@ -27,50 +32,39 @@ def send_notification_email(self, notification_id):
         bool: True if email was sent successfully, False otherwise
     """
     try:
-        notification = Notification.objects.get(id=notification_id)
-        
-        # Check if email was already sent
-        if notification.email_sent:
-            logger.info(f"Email already sent for notification {notification_id}")
-            return True
-        
-        # Check user's email preferences
-        try:
-            preferences = notification.user.notification_preferences
-            # Check if user has email enabled for this notification type
-            if not getattr(preferences, f'email_{notification.notification_type}', True):
-                logger.info(f"User {notification.user.email} has disabled email for {notification.notification_type}")
-                notification.email_sent = True  # Mark as sent to avoid retrying
-                notification.save(update_fields=['email_sent'])
-                return False
-        except NotificationPreference.DoesNotExist:
-            # If preferences don't exist, default to sending
-            pass
-        
-        # Send email
-        send_mail(
-            subject=notification.title,
-            message=notification.message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[notification.user.email],
-            fail_silently=False,
-        )
-        
-        # Update notification
-        notification.email_sent = True
-        notification.email_sent_at = timezone.now()
-        notification.save(update_fields=['email_sent', 'email_sent_at'])
-        
-        logger.info(f"Email sent successfully for notification {notification_id} to {notification.user.email}")
-        return True
-        
-    except Notification.DoesNotExist:
-        logger.error(f"Notification {notification_id} not found")
-        return False
-    except Exception as exc:
-        logger.error(f"Error sending email for notification {notification_id}: {str(exc)}")
+        results = send_notification_emails([notification_id])
+    except Exception as e:
+        logger.error(f"Error sending email for notification {notification_id}: {str(e)}")
+        raise self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+    if results['failed_ids']:
         # Retry the task
-        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+        raise self.retry(countdown=60 * (self.request.retries + 1))
+    return results['sent'] == 1
+
+
+@shared_task(bind=True, max_retries=3)
+def send_notification_email_batch(self, notification_ids):
+    """
+    Send emails for one chunk of notifications over a single email
+    backend connection (see notification/mailer.py).
+    
+    Failed notifications are retried together in a later attempt.
+    
+    Args:
+        notification_ids: List of notification IDs (at most EMAIL_CHUNK_SIZE)
+        
+    Returns:
+        dict: sent, skipped and failed counts
+    """
+    try:
+        results = send_notification_emails(notification_ids)
+    except Exception as e:
+        logger.error(f"Error sending email batch of {len(notification_ids)} notifications: {str(e)}")
+        raise self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+    if results['failed_ids'] and self.request.retries < self.max_retries:
+        raise self.retry(args=[results['failed_ids']], countdown=60 * (self.request.retries + 1))
+    results.pop('failed_ids')
+    return results
 
 
 @shared_task
@@ -78,29 +72,59 @@ def send_bulk_notification_emails(notification_ids):
     """
     Send email notifications for multiple notifications.
     
+    The ids are split into chunks of EMAIL_CHUNK_SIZE and each chunk is
+    sent by one send_notification_email_batch task.
+    
     Args:
         notification_ids: List of notification IDs to send emails for
         
     Returns:
         dict: Summary of results
     """
-    results = {'success': 0, 'failed': 0, 'skipped': 0}
+    results = {'queued': 0, 'chunks': 0, 'failed': 0}
     
-    for notification_id in notification_ids:
+    for chunk in chunked(notification_ids):
         try:
-            result = send_notification_email.delay(notification_id)
-            if result:
-                results['success'] += 1
-            else:
-                results['skipped'] += 1
+            send_notification_email_batch.delay(chunk)
+            results['queued'] += len(chunk)
+            results['chunks'] += 1
         except Exception as e:
-            logger.error(f"Failed to queue email for notification {notification_id}: {str(e)}")
-            results['failed'] += 1
+            logger.error(f"Failed to queue email batch of {len(chunk)} notifications: {str(e)}")
+            results['failed'] += len(chunk)
     
     logger.info(f"Bulk email task completed: {results}")
     return results
 
 
+@shared_task
+def send_announcement(audience, target_id, title, message, notification_type='course_update',
+                      action_url='', send_email=True):
+    """
+    Notify everyone in an audience (see notification/fanout.py).
+    
+    Args:
+        audience: 'course', 'category' or 'course_parents'
+        target_id: Course or category ID
+        title: Notification title
+        message: Notification message
+        notification_type: Notification type (default: course_update)
+        action_url: Optional deep link
+        send_email: Also email the recipients
+        
+    Returns:
+        dict: Number of notifications created and email batches queued
+    """
+    return fan_out_notification(
+        audience,
+        target_id,
+        title,
+        message,
+        notification_type=notification_type,
+        action_url=action_url,
+        send_email=send_email,
+    )
+
+
 @shared_task
 def send_custom_email(subject, message, recipient_email, from_email=None):
     """
@@ -172,30 +196,52 @@ def send_otp_email(recipient_email, otp_code, purpose='verification'):
 
 
 @shared_task
-def cleanup_old_notifications(days_old=90):
+def cleanup_old_notifications(days_old=None):
     """
-    Clean up old read notifications.
+    Clean up old read notifications in time-boxed batches
+    (RETENTION_POLICIES['notifications']).
+    
+    When the table is partitioned, upcoming monthly partitions are created
+    and months past the policy's partition_days are dropped first.
     
     Args:
-        days_old: Delete notifications older than this many days (default: 90)
+        days_old: Delete notifications older than this many days
+                  (default: the policy's days, 90)
         
     Returns:
-        int: Number of notifications deleted
+        dict: Retention report (rows deleted, batches, seconds, complete,
+              and partitions created/dropped when partitioned)
     """
     try:
-        from datetime import timedelta
-        cutoff_date = timezone.now() - timedelta(days=days_old)
-        
-        deleted_count, _ = Notification.objects.filter(
+        partitions = maintain_partitions(
+            'notification_notification', get_policy('notifications').get('partition_days')
+        )
+        expired = Notification.objects.filter(
             is_read=True,
-            created_at__lt=cutoff_date
-        ).delete()
-        
-        logger.info(f"Cleaned up {deleted_count} old notifications")
-        return deleted_count
+            created_at__lt=retention_cutoff('notifications', days_old)
+        )
+        report = delete_expired('notifications', expired)
+        if partitions is not None:
+            report['partitions'] = partitions
+        return report
     except Exception as e:
         logger.error(f"Error cleaning up old notifications: {str(e)}")
-        return 0
+        return {'policy': 'notifications', 'deleted': 0, 'error': str(e)}
+
+
+@shared_task
+def reconcile_unread_notification_counts():
+    """
+    Recount the Redis unread counters from the database and fix drift.
+
+    Returns:
+        dict: counters checked and corrected
+    """
+    try:
+        return reconcile_unread_counts()
+    except Exception as e:
+        logger.error(f"Error reconciling unread notification counts: {str(e)}")
+        return {'checked': 0, 'corrected': 0}
 
 
 @shared_task
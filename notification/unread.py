@@ -0,0 +1,185 @@
+"""
+Per-user unread notification counters kept in Redis.
+
+The badge endpoint reads `notifications:unread:{user_id}` with one GET
+instead of a COUNT over the notification table:
+
+- new unread notifications increment the counter after commit
+  (post_save for single rows, fan-out calls record_new_unread per chunk)
+- marking one notification read decrements it, marking all read sets 0
+- counters are only adjusted when they exist; a missing counter is
+  rebuilt from Postgres on the next read (SET NX, so a concurrent
+  increment isn't overwritten by an older count)
+- reconcile_unread_counts() recounts existing counters periodically and
+  corrects drift (deleted rows, admin edits, lost updates), skipping
+  counters that changed while they were being recounted
+
+Without Redis the count comes straight from the database.
+"""
+import logging
+from collections import Counter
+
+from django.db.models import Count
+
+from it360acad_backend.redis_client import get_redis, redis_key
+from notification.models import Notification
+
+logger = logging.getLogger('notification')
+
+UNREAD_KEY = 'notifications:unread:{user_id}'
+UNREAD_TTL = 30 * 24 * 60 * 60  # Idle counters are dropped and rebuilt on demand
+RECONCILE_BATCH_SIZE = 500
+
+# Add ARGV[i] to KEYS[i] if it exists, never going below 0
+ADJUST_SCRIPT = """
+for i, key in ipairs(KEYS) do
+  if redis.call('EXISTS', key) == 1 then
+    local value = redis.call('INCRBY', key, ARGV[i])
+    if value < 0 then
+      redis.call('SET', key, 0, 'KEEPTTL')
+    end
+  end
+end
+return #KEYS
+"""
+
+# Set KEYS[i] to ARGV[n + i] only if it still holds ARGV[i] (n = #KEYS)
+COMPARE_AND_SET_SCRIPT = """
+local n = #KEYS
+local updated = 0
+for i, key in ipairs(KEYS) do
+  if redis.call('GET', key) == ARGV[i] and ARGV[i] ~= ARGV[n + i] then
+    redis.call('SET', key, ARGV[n + i], 'KEEPTTL')
+    updated = updated + 1
+  end
+end
+return updated
+"""
+
+_scripts = {}
+
+
+def _script(r, name, source):
+    if name not in _scripts:
+        _scripts[name] = r.register_script(source)
+    return _scripts[name]
+
+
+def _key(user_id):
+    return redis_key(UNREAD_KEY.format(user_id=user_id))
+
+
+def count_unread(user_id):
+    """Count a user's unread notifications in the database"""
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id):
+    """
+    Get a user's unread notification count.
+
+    One GET on a hit; on a miss the count is rebuilt from the database.
+    """
+    r = get_redis()
+    if r is None:
+        return count_unread(user_id)
+    key = _key(user_id)
+    try:
+        value = r.get(key)
+        if value is not None:
+            return int(value)
+        count = count_unread(user_id)
+        if not r.set(key, count, ex=UNREAD_TTL, nx=True):
+            # Another request rebuilt it (and increments may have landed since)
+            value = r.get(key)
+            return int(value) if value is not None else count
+        return count
+    except Exception as e:
+        logger.error(f"Error reading unread count for user {user_id}: {str(e)}")
+        return count_unread(user_id)
+
+
+def adjust_unread_counts(deltas):
+    """
+    Add to existing counters in one round trip.
+
+    Args:
+        deltas: dict of user_id -> amount (negative to decrement)
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    r = get_redis()
+    if r is None or not deltas:
+        return
+    try:
+        _script(r, 'adjust', ADJUST_SCRIPT)(
+            keys=[_key(user_id) for user_id in deltas],
+            args=list(deltas.values()),
+        )
+    except Exception as e:
+        logger.error(f"Error adjusting unread counts: {str(e)}")
+
+
+def record_new_unread(user_ids):
+    """Count new unread notifications (one entry per notification)"""
+    adjust_unread_counts(Counter(user_ids))
+
+
+def record_reads(user_ids):
+    """Count notifications marked read (one entry per notification)"""
+    adjust_unread_counts({user_id: -count for user_id, count in Counter(user_ids).items()})
+
+
+def reset_unread_count(user_id):
+    """Set a user's counter to 0 (after marking everything read)"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.set(_key(user_id), 0, ex=UNREAD_TTL)
+    except Exception as e:
+        logger.error(f"Error resetting unread count for user {user_id}: {str(e)}")
+
+
+def reconcile_unread_counts(batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recount every existing counter from the database and fix drift.
+
+    Returns:
+        dict: counters checked and corrected
+    """
+    r = get_redis()
+    results = {'checked': 0, 'corrected': 0}
+    if r is None:
+        return results
+
+    prefix = _key('')
+    compare_and_set = _script(r, 'compare_and_set', COMPARE_AND_SET_SCRIPT)
+    batch = []
+
+    def flush(keys):
+        before = r.mget(keys)
+        user_ids = [int(key[len(prefix):]) for key in keys]
+        counts = dict(
+            Notification.objects
+            .filter(user_id__in=user_ids, is_read=False)
+            .order_by()
+            .values('user_id')
+            .annotate(count=Count('id'))
+            .values_list('user_id', 'count')
+        )
+        expected = [value if value is not None else '' for value in before]
+        actual = [counts.get(user_id, 0) for user_id in user_ids]
+        results['checked'] += len(keys)
+        results['corrected'] += compare_and_set(keys=keys, args=expected + actual)
+
+    for key in r.scan_iter(match=f'{prefix}*', count=batch_size):
+        batch.append(key.decode() if isinstance(key, bytes) else key)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    if results['corrected']:
+        logger.warning(f"Corrected {results['corrected']} of {results['checked']} unread counters")
+    return results
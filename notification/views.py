@@ -1,30 +1,74 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from django.utils import timezone
 
 from notification.models import Notification, NotificationPreference
-from notification.serializers import NotificationSerializer, NotificationPreferenceSerializer
+from notification.serializers import (
+    NotificationSerializer,
+    NotificationListSerializer,
+    NotificationPreferenceSerializer,
+    AnnouncementSerializer,
+)
+from notification.tasks import send_announcement
+from notification.unread import get_unread_count, reset_unread_count
+from it360acad_backend.task_publisher import publish_task, FALLBACK_SPOOL
+from django.db import transaction
+import logging
+
+logger = logging.getLogger('notification')
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination, newest first: each page is a `created_at <` range
+    scan on the (user, is_read, -created_at) / (user, -created_at) indexes,
+    so page cost doesn't grow with the inbox size.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
+
+
+BOOLEAN_QUERY_VALUES = {'true': True, '1': True, 'false': False, '0': False}
 
 
 @extend_schema(
     parameters=[
         OpenApiParameter('id', int, OpenApiParameter.PATH, description='Notification ID'),
+        OpenApiParameter('is_read', bool, OpenApiParameter.QUERY, required=False, description='Only read (true) or unread (false) notifications'),
     ]
 )
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        queryset = Notification.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            is_read = self.request.query_params.get('is_read')
+            if is_read is not None:
+                if is_read.lower() not in BOOLEAN_QUERY_VALUES:
+                    raise ValidationError({'is_read': 'Must be true or false.'})
+                queryset = queryset.filter(is_read=BOOLEAN_QUERY_VALUES[is_read.lower()])
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return NotificationListSerializer
+        return NotificationSerializer
     
     @action(detail=False, methods=['get'])
     def unread(self, request):
-        """Get unread count"""
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
+        """Get unread count (a Redis counter, rebuilt from the database on a miss)"""
+        count = get_unread_count(request.user.id)
         return Response({'unread_count': count}, status=status.HTTP_200_OK if count > 0 else status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=['post'])
@@ -40,6 +84,8 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         updated = Notification.objects.filter(
             user=request.user, is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        user_id = request.user.id
+        transaction.on_commit(lambda: reset_unread_count(user_id))
         return Response({'status': 'success', 'updated': updated}, status=status.HTTP_200_OK)
 
 
@@ -61,4 +107,40 @@ class NotificationPreferenceViewSet(viewsets.ModelViewSet):
     def list(self, request):
         obj = self.get_object()
         serializer = self.get_serializer(obj)
-        return Response(status=status.HTTP_200_OK, data=serializer.data)
\ No newline at end of file
+        return Response(status=status.HTTP_200_OK, data=serializer.data)
+
+
+@extend_schema(
+    request=AnnouncementSerializer,
+    tags=['Notifications'],
+    summary='Send announcement',
+    description=(
+        'Notify everyone enrolled in a course, everyone interested in a category, or the parents '
+        'of a course\'s students. Notifications are created and emailed in the background.'
+    ),
+)
+class AnnouncementView(APIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = AnnouncementSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Spooled to disk and published later if the broker is down
+        task_id = publish_task(send_announcement, kwargs=serializer.validated_data, fallback=FALLBACK_SPOOL)
+        if task_id is None:
+            return Response(
+                {'error': 'Could not queue the announcement. Please try again later.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        return Response(
+            {
+                'message': 'Announcement queued',
+                'task_id': task_id,
+                'audience': serializer.validated_data['audience'],
+                'target_id': serializer.validated_data['target_id'],
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from outbox.models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['task_name', 'status', 'attempts', 'created_at', 'published_at']
+    list_filter = ['status', 'task_name']
+    readonly_fields = ['created_at', 'published_at']
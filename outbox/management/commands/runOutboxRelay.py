@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from outbox.relay import run_relay, pending_count
+
+
+class Command(BaseCommand):
+    help = 'Publish pending outbox messages to Celery (runs until stopped; several can run at once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds to wait when the outbox is empty (default: OUTBOX_POLL_INTERVAL)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Messages published per batch (default: OUTBOX_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Outbox relay started ({pending_count()} message(s) pending)")
+        try:
+            run_relay(poll_interval=options['poll_interval'], batch_size=options['batch_size'])
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox relay stopped")
@@ -0,0 +1,210 @@
+"""
+Transactional outbox for Celery tasks.
+
+Side effects that go through the broker (emails, purges, feed rebuilds)
+are not published from the request. enqueue_task() writes an
+OutboxMessage row in the caller's transaction instead:
+
+- the row commits or rolls back with the business change, so a
+  rolled-back registration never sends its OTP email
+- the request only pays for one INSERT; a slow or unavailable broker
+  never adds latency to it
+
+A relay (the runOutboxRelay command, with the relay_outbox_messages beat
+task as a fallback) publishes pending rows in id order:
+
+- each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+  relays can run side by side without publishing a row twice
+- a batch is sent over one broker connection, using the normal task routes
+- published rows are marked and their arguments cleared (OTP codes are
+  not kept in the database); they are deleted by the 'outbox' retention
+  policy
+- publishing goes through the circuit breaker in
+  it360acad_backend/task_publisher.py. On a publish error the row is
+  retried with exponential backoff and the rest of the batch is left for
+  the next pass (the broker is most likely down); after
+  OUTBOX_MAX_ATTEMPTS it is marked failed. Failed rows are kept for
+  inspection, except the arguments of OUTBOX_REDACTED_TASKS (OTP emails),
+  which are cleared along with the error message
+- while the breaker is open, only tasks in CELERY_LOCAL_FALLBACK_TASKS
+  (OTP emails) are taken, and run synchronously in the relay, so
+  registration and password reset keep working during a broker outage;
+  everything else waits in the outbox. A row is only marked published
+  once its local run succeeded; a failed run is retried like a failed
+  publish
+
+Delivery is at least once: a relay that dies between publishing and
+committing publishes that batch again.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from outbox.models import OutboxMessage
+from it360acad_backend.task_publisher import send_task, run_task_now, replay_spool, breaker_state, BrokerUnavailable
+
+logger = logging.getLogger('api')
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 10
+DEFAULT_POLL_INTERVAL = 0.5  # seconds
+SPOOL_REPLAY_INTERVAL = 5  # seconds
+MAX_RETRY_DELAY = 5 * 60  # seconds
+# Tasks whose arguments (OTP codes) are not kept on failed rows
+DEFAULT_REDACTED_TASKS = ('notification.tasks.send_otp_email',)
+
+
+def _task_name(task):
+    return task if isinstance(task, str) else task.name
+
+
+def enqueue_task(task, *args, **kwargs):
+    """
+    Queue a Celery task to be published once the current transaction commits.
+
+    Args:
+        task: Celery task or task name
+        *args, **kwargs: Task arguments (JSON serializable)
+
+    Returns:
+        OutboxMessage: The pending row
+    """
+    return OutboxMessage.objects.create(task_name=_task_name(task), args=list(args), kwargs=kwargs)
+
+
+def enqueue_tasks(task, args_list):
+    """
+    Queue one task call per argument tuple with a single INSERT.
+
+    Args:
+        task: Celery task or task name
+        args_list: Iterable of positional argument tuples
+
+    Returns:
+        list: The pending OutboxMessage rows
+    """
+    name = _task_name(task)
+    return OutboxMessage.objects.bulk_create([
+        OutboxMessage(task_name=name, args=list(args), kwargs={}) for args in args_list
+    ])
+
+
+def _retry_delay(attempts):
+    return min(2 ** attempts, MAX_RETRY_DELAY)
+
+
+def _record_error(message, error, now, max_attempts, redacted_tasks, report):
+    """Schedule a retry for a message that couldn't be published or run, or mark it failed"""
+    message.attempts += 1
+    message.last_error = str(error)
+    if message.attempts >= max_attempts:
+        message.status = 'failed'
+        report['failed'] += 1
+        logger.error(f"Giving up on outbox message {message.id} ({message.task_name}): {str(error)}")
+        if message.task_name in redacted_tasks:
+            # The error text may echo the arguments
+            message.args, message.kwargs = [], {}
+            message.last_error = type(error).__name__
+    else:
+        message.available_at = now + timedelta(seconds=_retry_delay(message.attempts))
+        logger.error(f"Error publishing outbox message {message.id} ({message.task_name}): {str(error)}")
+    message.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'args', 'kwargs'])
+
+
+def relay_batch(batch_size=None):
+    """
+    Publish one batch of pending outbox messages.
+
+    Args:
+        batch_size: Maximum rows to publish (default: OUTBOX_BATCH_SIZE)
+
+    Returns:
+        dict: published and failed counts, and the oldest published row's
+              time in the outbox in seconds (lag)
+    """
+    from it360acad_backend.celery import app
+
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    redacted_tasks = getattr(settings, 'OUTBOX_REDACTED_TASKS', DEFAULT_REDACTED_TASKS)
+    report = {'published': 0, 'failed': 0, 'lag': 0.0}
+
+    with transaction.atomic():
+        now = timezone.now()
+        pending = OutboxMessage.objects.select_for_update(skip_locked=True).filter(status='pending', available_at__lte=now)
+        broker_down = breaker_state() == 'open'
+        if broker_down:
+            pending = pending.filter(task_name__in=getattr(settings, 'CELERY_LOCAL_FALLBACK_TASKS', ()))
+        messages = list(pending.order_by('id')[:batch_size])
+        if not messages:
+            return report
+
+        published = []
+        if broker_down:
+            for message in messages:
+                try:
+                    run_task_now(message.task_name, message.args, message.kwargs)
+                except Exception as e:
+                    _record_error(message, e, now, max_attempts, redacted_tasks, report)
+                    continue
+                published.append(message.id)
+        else:
+            with app.producer_or_acquire() as producer:
+                for message in messages:
+                    try:
+                        send_task(message.task_name, message.args, message.kwargs, producer=producer)
+                    except BrokerUnavailable:
+                        # Opened by another thread; try again on the next pass
+                        break
+                    except Exception as e:
+                        _record_error(message, e, now, max_attempts, redacted_tasks, report)
+                        break
+                    published.append(message.id)
+
+        if published:
+            OutboxMessage.objects.filter(id__in=published).update(
+                status='published', published_at=timezone.now(), args=[], kwargs={}, last_error='',
+            )
+            report['published'] = len(published)
+            report['lag'] = round((timezone.now() - messages[0].created_at).total_seconds(), 3)
+
+    return report
+
+
+def run_relay(poll_interval=None, batch_size=None, stop_after=None):
+    """
+    Publish outbox messages until stopped, sleeping only while the outbox is empty.
+
+    Args:
+        poll_interval: Seconds to wait when nothing is pending (default: OUTBOX_POLL_INTERVAL)
+        batch_size: Rows per batch (default: OUTBOX_BATCH_SIZE)
+        stop_after: Return after this many seconds (None runs forever)
+    """
+    poll_interval = poll_interval if poll_interval is not None else getattr(
+        settings, 'OUTBOX_POLL_INTERVAL', DEFAULT_POLL_INTERVAL
+    )
+    deadline = time.monotonic() + stop_after if stop_after is not None else None
+    next_replay = 0
+    while deadline is None or time.monotonic() < deadline:
+        try:
+            report = relay_batch(batch_size)
+            if time.monotonic() >= next_replay:
+                # Tasks spooled to disk by web processes during a broker outage
+                replay_spool()
+                next_replay = time.monotonic() + SPOOL_REPLAY_INTERVAL
+        except Exception as e:
+            logger.error(f"Error relaying outbox messages: {str(e)}")
+            report = {'published': 0, 'failed': 0}
+        if report['published'] and report['lag'] > 60:
+            logger.warning(f"Outbox relay is behind: published {report['published']} message(s), oldest waited {report['lag']}s")
+        if not report['published']:
+            time.sleep(poll_interval)
+
+
+def pending_count():
+    """Number of messages waiting to be published"""
+    return OutboxMessage.objects.filter(status='pending').count()
@@ -0,0 +1,62 @@
+"""
+Celery tasks for outbox app
+
+Fallback relay for pending outbox messages and retention of published ones.
+"""
+from celery import shared_task
+from outbox.models import OutboxMessage
+from outbox.relay import relay_batch
+from it360acad_backend.task_publisher import replay_spool
+from it360acad_backend.retention import delete_expired, retention_cutoff
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Batches per run of the fallback relay
+MAX_RELAY_BATCHES = 50
+
+
+@shared_task
+def relay_outbox_messages():
+    """
+    Publish pending outbox messages and spooled tasks (fallback for the
+    runOutboxRelay process).
+
+    Safe to run next to the relay process: batches are claimed with
+    SKIP LOCKED and spool files by renaming them.
+
+    Returns:
+        dict: Messages published and failed, spooled tasks replayed
+    """
+    totals = {'published': 0, 'failed': 0, 'replayed': 0}
+    try:
+        totals['replayed'] = replay_spool()
+        for _ in range(MAX_RELAY_BATCHES):
+            report = relay_batch()
+            totals['published'] += report['published']
+            totals['failed'] += report['failed']
+            if not report['published']:
+                break
+        if totals['published']:
+            logger.info(f"Relayed {totals['published']} outbox message(s)")
+        return totals
+    except Exception as e:
+        logger.error(f"Error relaying outbox messages: {str(e)}")
+        return {**totals, 'error': str(e)}
+
+
+@shared_task
+def cleanup_outbox_messages():
+    """
+    Delete published outbox messages older than the retention period
+    (RETENTION_POLICIES['outbox']). Failed messages are kept for inspection.
+
+    Returns:
+        dict: Retention report (rows deleted, batches, seconds, complete)
+    """
+    try:
+        expired = OutboxMessage.objects.filter(status='published', created_at__lt=retention_cutoff('outbox'))
+        return delete_expired('outbox', expired)
+    except Exception as e:
+        logger.error(f"Error cleaning up outbox messages: {str(e)}")
+        return {'policy': 'outbox', 'deleted': 0, 'error': str(e)}
@@ -0,0 +1,35 @@
+"""
+Celery tasks for payments app
+
+Retention of abandoned checkouts.
+"""
+from celery import shared_task
+from payments.models import Payment
+from it360acad_backend.retention import delete_expired, retention_cutoff
+import logging
+
+logger = logging.getLogger('payments')
+
+
+@shared_task
+def cleanup_abandoned_payments():
+    """
+    Delete pending payments that never got a webhook, in time-boxed batches
+    (RETENTION_POLICIES['pending_payments']).
+
+    Paystack reports every completed or failed transaction by webhook, so a
+    payment still pending after the policy's days was abandoned at checkout.
+
+    Returns:
+        dict: Retention report (rows deleted, batches, seconds, complete)
+    """
+    try:
+        abandoned = Payment.objects.filter(
+            status='pending',
+            verified_via_webhook=False,
+            created_at__lt=retention_cutoff('pending_payments'),
+        )
+        return delete_expired('pending_payments', abandoned)
+    except Exception as e:
+        logger.error(f"Error cleaning up abandoned payments: {str(e)}")
+        return {'policy': 'pending_payments', 'deleted': 0, 'error': str(e)}
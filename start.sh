@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 # Startup script for Render deployment
-# Runs Django/Daphne (ASGI server) for both HTTP and WebSocket support, plus Celery worker
+# Runs Django/Daphne (ASGI server) for both HTTP and WebSocket support, plus Celery workers and beat
 # This script MUST be used as the Start Command in Render dashboard
 # Note: Daphne handles both REST API (HTTP) and Chat (WebSocket) connections
 
@@ -12,13 +12,21 @@ PORT="${PORT:-8000}"
 # Create logs directory if it doesn't exist
 mkdir -p logs
 
-# Start Celery worker in background
-echo "🚀 Starting Celery worker..."
-celery -A it360acad_backend worker \
-    --loglevel=info \
-    --detach \
-    --pidfile=/tmp/celery_worker.pid \
-    --logfile=logs/celery_worker.log
+# Start one Celery worker per priority lane in background, so bulk jobs
+# never delay OTP emails (override the list with CELERY_LANES)
+for lane in ${CELERY_LANES:-interactive bulk maintenance}; do
+    CELERY_PID_DIR=/tmp ./start_celery_lane.sh "$lane" --detach
+done
+
+# Publish outbox rows (OTP emails, purges, feed rebuilds) to the workers
+CELERY_PID_DIR=/tmp ./start_outbox_relay.sh --detach
+
+# Publish the periodic tasks (CELERY_BEAT_SCHEDULE): trending refresh,
+# popularity persistence, retention cleanup. One beat per deployment: set
+# CELERY_BEAT=0 on additional instances of this service
+if [ "${CELERY_BEAT:-1}" = "1" ]; then
+    CELERY_PID_DIR=/tmp ./start_celery_beat.sh --detach
+fi
 
 # Wait a moment for Celery to start
 sleep 2
@@ -0,0 +1,30 @@
+#!/usr/bin/env bash
+# Start Celery beat: publishes the periodic tasks in CELERY_BEAT_SCHEDULE
+# (trending refresh, popularity persistence, retention cleanup, outbox
+# fallback, ...). Without it none of them run.
+#
+# Usage: ./start_celery_beat.sh [--detach]
+# Run exactly one beat per deployment: a second one publishes every
+# periodic task twice. Set CELERY_BEAT=0 on additional web instances.
+# PID, schedule and log files go to ${CELERY_PID_DIR:-.} and logs/.
+
+set -o errexit
+
+DETACH="$1"
+PID_DIR="${CELERY_PID_DIR:-.}"
+mkdir -p logs
+
+ARGS=(
+    -A it360acad_backend beat
+    --loglevel=info
+    --pidfile="${PID_DIR}/celery_beat.pid"
+    --schedule="${PID_DIR}/celerybeat-schedule"
+    --logfile="logs/celery_beat.log"
+)
+
+echo "🚀 Starting Celery beat..."
+if [ "$DETACH" = "--detach" ]; then
+    celery "${ARGS[@]}" --detach
+else
+    exec celery "${ARGS[@]}"
+fi
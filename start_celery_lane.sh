@@ -0,0 +1,77 @@
+#!/usr/bin/env bash
+# Start a Celery worker for one priority lane (see it360acad_backend/task_lanes.py)
+#
+# Usage: ./start_celery_lane.sh <interactive|bulk|payments|maintenance|all> [--detach]
+#
+# Each lane has its own profile (queues, concurrency, prefetch, acks_late);
+# concurrency can be overridden with CELERY_<LANE>_CONCURRENCY.
+# 'all' consumes every queue with one worker (local development only:
+# bulk jobs can then delay OTP emails again).
+# PID and log files go to ${CELERY_PID_DIR:-.} and logs/.
+
+set -o errexit
+
+LANE="${1:-all}"
+DETACH="$2"
+
+case "$LANE" in
+    interactive)
+        # Short tasks a user is waiting for: never prefetch behind a running task
+        QUEUES="interactive"
+        CONCURRENCY="${CELERY_INTERACTIVE_CONCURRENCY:-4}"
+        PREFETCH=1
+        ACKS_LATE=true
+        ;;
+    bulk)
+        # Batches are idempotent (email_sent flags), so redeliver on crash
+        QUEUES="bulk"
+        CONCURRENCY="${CELERY_BULK_CONCURRENCY:-2}"
+        PREFETCH=1
+        ACKS_LATE=true
+        ;;
+    payments)
+        QUEUES="payments"
+        CONCURRENCY="${CELERY_PAYMENTS_CONCURRENCY:-2}"
+        PREFETCH=1
+        ACKS_LATE=true
+        ;;
+    maintenance)
+        # Long time-boxed jobs; acknowledge early so they aren't run twice
+        QUEUES="maintenance,default"
+        CONCURRENCY="${CELERY_MAINTENANCE_CONCURRENCY:-1}"
+        PREFETCH=1
+        ACKS_LATE=false
+        ;;
+    all)
+        QUEUES="interactive,payments,bulk,maintenance,default"
+        CONCURRENCY="${CELERY_ALL_CONCURRENCY:-4}"
+        PREFETCH=1
+        ACKS_LATE=false
+        ;;
+    *)
+        echo "❌ Unknown lane: $LANE (expected interactive, bulk, payments, maintenance or all)"
+        exit 1
+        ;;
+esac
+
+PID_DIR="${CELERY_PID_DIR:-.}"
+mkdir -p logs
+
+ARGS=(
+    -A it360acad_backend worker
+    --loglevel=info
+    -n "${LANE}@%h"
+    -Q "$QUEUES"
+    --concurrency="$CONCURRENCY"
+    --prefetch-multiplier="$PREFETCH"
+    -O fair
+    --pidfile="${PID_DIR}/celery_${LANE}.pid"
+    --logfile="logs/celery_${LANE}.log"
+)
+
+echo "🚀 Starting Celery ${LANE} worker (queues: ${QUEUES}, concurrency: ${CONCURRENCY}, acks_late: ${ACKS_LATE})..."
+if [ "$DETACH" = "--detach" ]; then
+    CELERY_TASK_ACKS_LATE="$ACKS_LATE" celery "${ARGS[@]}" --detach
+else
+    CELERY_TASK_ACKS_LATE="$ACKS_LATE" exec celery "${ARGS[@]}"
+fi
@@ -1,15 +1,12 @@
 #!/usr/bin/env bash
-# Start only Celery worker (for local development or separate worker service)
+# Start only a Celery worker (for local development or separate worker service)
 # For Render: Use start.sh which runs both Django and Celery
+#
+# Usage: ./start_celery_only.sh [interactive|bulk|payments|maintenance|all]
+# A separate worker service should run one lane each; 'all' (default)
+# consumes every queue in one worker.
 
 set -o errexit
 
-# Create logs directory if it doesn't exist
-mkdir -p logs
-
-echo "🚀 Starting Celery worker..."
-celery -A it360acad_backend worker \
-    --loglevel=info \
-    --pidfile=celery_worker.pid \
-    --logfile=logs/celery_worker.log
+exec ./start_celery_lane.sh "${1:-all}"
 
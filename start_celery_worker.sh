@@ -10,17 +10,26 @@ fi
 # Create logs directory if it doesn't exist
 mkdir -p logs
 
-# Start Celery worker
-echo "🚀 Starting Celery worker..."
-celery -A it360acad_backend worker --loglevel=info --detach --pidfile=celery_worker.pid --logfile=logs/celery_worker.log
+# Start Celery workers, one per lane (set CELERY_LANES=all for a single worker)
+for lane in ${CELERY_LANES:-interactive bulk maintenance}; do
+    ./start_celery_lane.sh "$lane" --detach
+done
 
-echo "✅ Celery worker started in background"
-echo "📋 PID file: celery_worker.pid"
-echo "📝 Log file: logs/celery_worker.log"
+# Publish outbox rows to the workers
+./start_outbox_relay.sh --detach
+
+# Periodic tasks (trending, retention cleanup, partition maintenance)
+if [ "${CELERY_BEAT:-1}" = "1" ]; then
+    ./start_celery_beat.sh --detach
+fi
+
+echo "✅ Celery workers, beat and outbox relay started in background"
+echo "📋 PID files: celery_<lane>.pid, celery_beat.pid, outbox_relay.pid"
+echo "📝 Log files: logs/celery_<lane>.log, logs/celery_beat.log, logs/outbox_relay.log"
 echo ""
-echo "To stop the worker:"
+echo "To stop the workers:"
 echo "  ./stop_celery_worker.sh"
 echo ""
 echo "To view logs:"
-echo "  tail -f logs/celery_worker.log"
+echo "  tail -f logs/celery_interactive.log"
 
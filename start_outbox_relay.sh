@@ -0,0 +1,22 @@
+#!/usr/bin/env bash
+# Start the outbox relay (see outbox/relay.py): publishes tasks written to
+# the outbox table to Celery. Without it, queued emails, purges and feed
+# rebuilds are only published by the once-a-minute beat fallback.
+#
+# Usage: ./start_outbox_relay.sh [--detach]
+# Several relays can run at once (rows are claimed with SKIP LOCKED).
+# PID and log files go to ${CELERY_PID_DIR:-.} and logs/.
+
+set -o errexit
+
+DETACH="$1"
+PID_DIR="${CELERY_PID_DIR:-.}"
+mkdir -p logs
+
+echo "🚀 Starting outbox relay..."
+if [ "$DETACH" = "--detach" ]; then
+    nohup python manage.py runOutboxRelay >> logs/outbox_relay.log 2>&1 &
+    echo $! > "${PID_DIR}/outbox_relay.pid"
+else
+    exec python manage.py runOutboxRelay
+fi
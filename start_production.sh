@@ -133,7 +133,7 @@ mkdir -p logs
 
 # Stop any existing processes
 print_info "Stopping existing processes..."
-if [ -f "celery_worker.pid" ]; then
+if ls celery_*.pid outbox_relay.pid 2>/dev/null | grep -q .; then
     ./stop_celery_worker.sh || true
 fi
 
@@ -141,9 +141,9 @@ fi
 pkill -f "gunicorn.*it360acad_backend" || true
 
 # Start Celery worker in background
-print_info "Starting Celery worker..."
+print_info "Starting Celery workers (one per lane), beat and the outbox relay..."
 ./start_celery_worker.sh
-print_status "Celery worker started"
+print_status "Celery workers, beat and outbox relay started"
 
 # Start the Django server
 print_info "Starting Django server..."
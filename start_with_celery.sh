@@ -8,9 +8,19 @@ set -o errexit
 # Get PORT from environment (Render sets this automatically)
 PORT="${PORT:-8000}"
 
-# Start Celery worker in background
-echo "🚀 Starting Celery worker..."
-celery -A it360acad_backend worker --loglevel=info --detach --pidfile=/tmp/celery_worker.pid --logfile=/tmp/celery_worker.log
+# Start one Celery worker per priority lane in background
+for lane in ${CELERY_LANES:-interactive bulk maintenance}; do
+    CELERY_PID_DIR=/tmp ./start_celery_lane.sh "$lane" --detach
+done
+
+# Publish outbox rows (OTP emails, purges, feed rebuilds) to the workers
+CELERY_PID_DIR=/tmp ./start_outbox_relay.sh --detach
+
+# Periodic tasks (trending, retention cleanup, partition maintenance);
+# one beat per deployment
+if [ "${CELERY_BEAT:-1}" = "1" ]; then
+    CELERY_PID_DIR=/tmp ./start_celery_beat.sh --detach
+fi
 
 # Wait a moment for Celery to start
 sleep 2
@@ -20,6 +20,33 @@ if [ -f "/tmp/celery_worker.pid" ]; then
     echo "✅ Celery worker stopped"
 fi
 
+# Beat (start_celery_beat.sh)
+for pidfile in celery_beat.pid /tmp/celery_beat.pid; do
+    [ -f "$pidfile" ] || continue
+    PID=$(cat "$pidfile")
+    echo "🛑 Stopping Celery beat (PID: $PID from $pidfile)..."
+    kill $PID 2>/dev/null || true
+    rm "$pidfile"
+done
+
+# Lane workers (start_celery_lane.sh)
+for pidfile in celery_*.pid /tmp/celery_*.pid; do
+    [ -f "$pidfile" ] || continue
+    PID=$(cat "$pidfile")
+    echo "🛑 Stopping Celery worker (PID: $PID from $pidfile)..."
+    kill $PID 2>/dev/null || true
+    rm "$pidfile"
+done
+
+# Outbox relay (start_outbox_relay.sh)
+for pidfile in outbox_relay.pid /tmp/outbox_relay.pid; do
+    [ -f "$pidfile" ] || continue
+    PID=$(cat "$pidfile")
+    echo "🛑 Stopping outbox relay (PID: $PID from $pidfile)..."
+    kill $PID 2>/dev/null || true
+    rm "$pidfile"
+done
+
 # Kill any remaining Celery processes
-pkill -f "celery.*it360acad_backend.*worker" 2>/dev/null && echo "✅ Killed remaining Celery processes" || echo "✅ No Celery processes found"
+pkill -f "celery.*it360acad_backend.*(worker|beat)" 2>/dev/null && echo "✅ Killed remaining Celery processes" || echo "✅ No Celery processes found"
 
@@ -0,0 +1,395 @@
+"""
+Bulk user import (school onboarding).
+
+Rows are streamed from a CSV and processed in chunks. For each chunk:
+- emails / student ids / parent ids are checked against the file and the
+  database with one query each
+- passwords are hashed in a process pool (PBKDF2 is CPU-bound and would
+  otherwise dominate the import)
+- linking codes are generated in a batch and checked for collisions with
+  one query
+- User, Profile, Student/Parent and NotificationPreference rows are written
+  with bulk_create inside one transaction
+
+bulk_create bypasses post_save, so the per-user signals (cache
+invalidation, notification preferences, the email filter) are replaced by
+the explicit inserts above, one email filter update per chunk and one
+cache invalidation at the end.
+
+CSV columns (header row required, only `email` is mandatory):
+    email, password, first_name, last_name, phone_number, role,
+    student_id, current_class, current_school,
+    parent_id, occupation, relationship_to_student
+
+Rows without a password get an unusable password; those users set one
+through the forgot-password flow.
+
+Uploads through the API are imported by a Celery task
+(users.tasks.import_users_task); its progress and result are kept in the
+cache (get_import_status).
+"""
+import csv
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from users.models import User, Profile, Student, Parent
+from users.models.student import generate_linking_code
+from users.cache import invalidate_all_user_caches
+from users.email_filter import add_emails
+from notification.models import NotificationPreference
+
+logger = logging.getLogger('users')
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+IMPORT_ROLES = ('student', 'parent')
+USER_FIELDS = ('first_name', 'last_name', 'phone_number')
+STUDENT_FIELDS = ('student_id', 'current_class', 'current_school')
+PARENT_FIELDS = ('parent_id', 'occupation', 'relationship_to_student')
+RELATIONSHIP_CHOICES = {choice for choice, _ in Parent.RELATIONSHIP_CHOICES}
+IMPORT_STATUS_KEY = 'users:import:{import_id}'
+IMPORT_STATUS_TIMEOUT = 60 * 60 * 24  # 1 day
+
+
+class ImportResult:
+    """Running totals for an import"""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+        self.hash_seconds = 0.0
+        self.insert_seconds = 0.0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    @property
+    def users_per_second(self):
+        return round(self.created / self.elapsed, 1) if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'hash_seconds': round(self.hash_seconds, 2),
+            'insert_seconds': round(self.insert_seconds, 2),
+            'users_per_second': self.users_per_second,
+        }
+
+
+class PasswordHasher:
+    """
+    Hash passwords in a process pool, falling back to in-process hashing
+    when a pool cannot be used (e.g. inside a daemonic Celery worker).
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        if self.workers > 1:
+            # spawn: forking a process with live threads (cache listener, DB) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+
+    def hash_all(self, passwords):
+        """
+        Hash a list of raw passwords (None gives an unusable password).
+
+        Returns:
+            list: Hashed passwords, in order
+        """
+        hashed = [make_password(None) if password is None else None for password in passwords]
+        pending = [(index, password) for index, password in enumerate(passwords) if password is not None]
+        if not pending:
+            return hashed
+
+        raw = [password for _, password in pending]
+        if self._executor is not None:
+            try:
+                chunksize = max(1, len(raw) // (self.workers * 4))
+                results = list(self._executor.map(make_password, raw, chunksize=chunksize))
+            except Exception as e:
+                logger.warning(f"Password hashing pool unavailable, hashing in process: {str(e)}")
+                self.close()
+                results = [make_password(password) for password in raw]
+        else:
+            results = [make_password(password) for password in raw]
+
+        for (index, _), value in zip(pending, results):
+            hashed[index] = value
+        return hashed
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def generate_linking_codes(count):
+    """
+    Generate `count` unique linking codes not used by any student, checking
+    collisions with one query per round instead of one per code.
+
+    Returns:
+        list: Linking codes
+    """
+    codes = set()
+    while len(codes) < count:
+        candidates = set()
+        while len(candidates) < count - len(codes):
+            code = generate_linking_code()
+            if code not in codes:
+                candidates.add(code)
+        taken = set(Student.objects.filter(linking_code__in=candidates).values_list('linking_code', flat=True))
+        codes |= candidates - taken
+    return list(codes)
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else ''
+
+
+def _parse_row(row, line, default_role):
+    """
+    Validate one CSV row.
+
+    Returns:
+        dict: Cleaned row
+
+    Raises:
+        ValueError: If the row is invalid
+    """
+    row = {(key or '').strip().lower(): _clean(value) for key, value in row.items()}
+
+    email = User.objects.normalize_email(row.get('email', ''))
+    if not email:
+        raise ValueError('email is required')
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValueError(f'invalid email: {email}')
+    if len(email) > User._meta.get_field('username').max_length:
+        raise ValueError('email is too long')
+
+    role = (row.get('role') or default_role).lower()
+    if role not in IMPORT_ROLES:
+        raise ValueError(f"role must be one of {', '.join(IMPORT_ROLES)}")
+
+    relationship = row.get('relationship_to_student', '').lower()
+    if role == 'parent' and relationship and relationship not in RELATIONSHIP_CHOICES:
+        raise ValueError(f"relationship_to_student must be one of {', '.join(sorted(RELATIONSHIP_CHOICES))}")
+
+    cleaned = {
+        'line': line,
+        'email': email,
+        'role': role,
+        'password': row.get('password') or None,
+        **{field: row.get(field, '') for field in USER_FIELDS},
+    }
+    if role == 'student':
+        cleaned.update({field: row.get(field) or None for field in STUDENT_FIELDS})
+    else:
+        cleaned.update({field: row.get(field) or None for field in PARENT_FIELDS})
+        cleaned['relationship_to_student'] = relationship or None
+    return cleaned
+
+
+def _drop_taken(rows, field, queryset, result):
+    """
+    Skip rows whose unique `field` value is already in the database.
+    Compared case-insensitively, like the duplicate check within the file,
+    so an existing John@x.com is not imported again as john@x.com.
+    """
+    values = {row[field].lower() for row in rows if row.get(field)}
+    if not values:
+        return rows
+    taken = set(
+        queryset.annotate(lowered=Lower(field)).filter(lowered__in=values).values_list('lowered', flat=True)
+    )
+    if not taken:
+        return rows
+    kept = []
+    for row in rows:
+        if row.get(field) and row[field].lower() in taken:
+            if field == 'email':
+                result.skipped += 1
+            else:
+                result.add_error(row['line'], f'{field} already exists: {row[field]}')
+        else:
+            kept.append(row)
+    return kept
+
+
+def _import_chunk(rows, hasher, is_verified, result):
+    rows = _drop_taken(rows, 'email', User.objects.all(), result)
+    rows = _drop_taken(rows, 'student_id', Student.objects.all(), result)
+    rows = _drop_taken(rows, 'parent_id', Parent.objects.all(), result)
+    if not rows:
+        return
+
+    start = time.perf_counter()
+    passwords = hasher.hash_all([row['password'] for row in rows])
+    result.hash_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    students = [row for row in rows if row['role'] == 'student']
+    linking_codes = generate_linking_codes(len(students))
+
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(
+                email=row['email'],
+                username=row['email'],
+                password=password,
+                role=row['role'],
+                is_verified=is_verified,
+                is_active=True,
+                **{field: row[field] for field in USER_FIELDS},
+            )
+            for row, password in zip(rows, passwords)
+        ])
+        user_by_email = {user.email: user for user in users}
+
+        Profile.objects.bulk_create([Profile(user=user) for user in users])
+        NotificationPreference.objects.bulk_create([NotificationPreference(user=user) for user in users])
+        Student.objects.bulk_create([
+            Student(
+                user=user_by_email[row['email']],
+                linking_code=code,
+                **{field: row[field] for field in STUDENT_FIELDS},
+            )
+            for row, code in zip(students, linking_codes)
+        ])
+        Parent.objects.bulk_create([
+            Parent(user=user_by_email[row['email']], **{field: row[field] for field in PARENT_FIELDS})
+            for row in rows if row['role'] == 'parent'
+        ])
+
+    add_emails([user.email for user in users])
+    result.insert_seconds += time.perf_counter() - start
+    result.created += len(users)
+
+
+def import_users(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, default_role='student',
+                 is_verified=False, max_rows=None, progress=None):
+    """
+    Import users from an iterable of dicts (e.g. csv.DictReader).
+
+    Args:
+        rows: Iterable of row dicts keyed by CSV column name
+        chunk_size: Rows per hashing/insert batch
+        workers: Password hashing processes (default: CPU count, 1 disables the pool)
+        default_role: Role for rows without a `role` column
+        is_verified: Mark imported users as email-verified
+        max_rows: Stop after this many rows (remaining rows are reported as one error)
+        progress: Optional callable receiving the ImportResult after each chunk
+
+    Returns:
+        ImportResult
+    """
+    result = ImportResult()
+    hasher = PasswordHasher(workers)
+    seen = {'email': set(), 'student_id': set(), 'parent_id': set()}
+    chunk = []
+
+    try:
+        # Line 1 is the CSV header
+        for line, raw_row in enumerate(rows, start=2):
+            if max_rows is not None and line - 1 > max_rows:
+                result.add_error(line, f'row limit of {max_rows} reached; remaining rows were not imported')
+                break
+            try:
+                row = _parse_row(raw_row, line, default_role)
+                for field, values in seen.items():
+                    value = row.get(field)
+                    if value and value.lower() in values:
+                        raise ValueError(f'duplicate {field} in file: {value}')
+                for field, values in seen.items():
+                    if row.get(field):
+                        values.add(row[field].lower())
+            except ValueError as e:
+                result.add_error(line, str(e))
+                continue
+
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                _import_chunk(chunk, hasher, is_verified, result)
+                chunk = []
+                result.elapsed = time.perf_counter() - result.started
+                if progress:
+                    progress(result)
+
+        if chunk:
+            _import_chunk(chunk, hasher, is_verified, result)
+    finally:
+        hasher.close()
+        result.elapsed = time.perf_counter() - result.started
+        if result.created:
+            invalidate_all_user_caches()
+
+    if progress:
+        progress(result)
+    logger.info(
+        f"Bulk import finished: {result.created} created, {result.skipped} skipped, "
+        f"{result.failed} failed in {result.elapsed:.1f}s ({result.users_per_second} users/s)"
+    )
+    return result
+
+
+def import_users_from_csv(stream, **kwargs):
+    """
+    Import users from a text stream containing CSV (streamed row by row).
+
+    Returns:
+        ImportResult
+    """
+    return import_users(csv.DictReader(stream), **kwargs)
+
+
+def get_import_status(import_id):
+    """
+    Return the status of a background import.
+
+    Returns:
+        dict or None: {import_id, status ('queued', 'running', 'completed'
+                      or 'failed'), result (ImportResult.as_dict(), partial
+                      while running), error}
+    """
+    try:
+        return cache.get(IMPORT_STATUS_KEY.format(import_id=import_id))
+    except Exception as e:
+        logger.error(f"Error reading import status for {import_id}: {str(e)}")
+        return None
+
+
+def set_import_status(import_id, status, result=None, error=None):
+    """Save the status of a background import"""
+    try:
+        cache.set(
+            IMPORT_STATUS_KEY.format(import_id=import_id),
+            {'import_id': import_id, 'status': status, 'result': result, 'error': error},
+            IMPORT_STATUS_TIMEOUT,
+        )
+    except Exception as e:
+        logger.error(f"Error saving import status for {import_id}: {str(e)}")
@@ -1,135 +1,504 @@
 """
 Redis caching utilities for users app
+
+Namespaces:
+- list:   paginated user list pages. Keys embed a generation number, so
+          invalidation is one INCR instead of deleting every page; stale
+          generations simply expire.
+- detail: single users by id, deleted individually.
+- email:  email -> user id index, deleted individually (old and new email).
+- parent_courses: a parent's children-with-enrollments view, deleted when a
+          child's enrollments or parent link change.
+- auth:   compact per-user snapshots used by JWT authentication, keyed by
+          user id and a version stamp. The stamp is bumped once the
+          save/delete commits, which orphans every older snapshot, even one
+          written by a request that read the row before the commit. Stamps
+          expire AUTH_VERSION_TIMEOUT after their last bump and restart
+          from the current time, never from a value an older snapshot may
+          still be stored under.
+
+All keys go through a TieredCache, so hot reads (including the generation
+numbers) are served from process memory and misses are filled by a single
+worker at a time (see get_or_build_user_list / get_or_build_user).
+List pages and users are stored as rendered JSON bytes (RenderedJSON) so
+views can serve hits without parsing or re-rendering.
+
+Every read records hit/miss/latency per namespace. Counters are kept in
+process and flushed to a Redis hash periodically (see get_cache_stats()).
 """
-from django.core.cache import cache
-from django.conf import settings
-import json
 import logging
+import threading
+import time
+
+from django.db import transaction
+
+from it360acad_backend.redis_client import get_redis, redis_key
+from it360acad_backend.tiered_cache import TieredCache
+from it360acad_backend.cached_response import RenderedJSON
 
 logger = logging.getLogger('users')
 
+# Namespaces
+NAMESPACE_LIST = 'list'
+NAMESPACE_DETAIL = 'detail'
+NAMESPACE_EMAIL = 'email'
+NAMESPACE_PARENT_COURSES = 'parent_courses'
+NAMESPACE_AUTH = 'auth'
+NAMESPACES = (NAMESPACE_LIST, NAMESPACE_DETAIL, NAMESPACE_EMAIL, NAMESPACE_PARENT_COURSES, NAMESPACE_AUTH)
+
 # Cache keys
-CACHE_KEY_USER_LIST = 'users:list'
+CACHE_KEY_GENERATION = 'users:gen:{namespace}'
+CACHE_KEY_USER_LIST_PAGE = 'users:list:g{generation}:p{page}:s{page_size}'
 CACHE_KEY_USER_DETAIL = 'users:detail:{user_id}'
 CACHE_KEY_USER_BY_EMAIL = 'users:email:{email}'
+CACHE_KEY_PARENT_CHILDREN_COURSES = 'users:parent_courses:{parent_user_id}'
+CACHE_KEY_AUTH_VERSION = 'users:auth:version:{user_id}'
+CACHE_KEY_AUTH_SNAPSHOT = 'users:auth:{user_id}:v{version}'
+CACHE_KEY_STATS = 'users:cache:stats:{namespace}'
 CACHE_TIMEOUT = 60 * 60  # 1 hour default
+LIST_CACHE_TIMEOUT = 10 * 60  # Pages of old generations age out after 10 minutes
+PARENT_COURSES_CACHE_TIMEOUT = 10 * 60  # Bounds staleness of course titles/child names shown
+AUTH_SNAPSHOT_TIMEOUT = 60 * 60  # Access token lifetime
+AUTH_VERSION_TIMEOUT = 7 * 24 * 60 * 60  # Outlives every snapshot written under a stamp
+
+# Fields rendered by UserDetailSerializer; saves touching only other fields
+# (e.g. last_login on every login) leave the cache alone
+CACHED_USER_FIELDS = frozenset([
+    'id', 'email', 'phone_number', 'first_name', 'last_name', 'role', 'username',
+    'date_joined', 'is_verified',
+])
+
+# Fields loaded into the authenticated request.user; anything else (password,
+# last_login, ...) is deferred and loaded from the database on first access
+AUTH_SNAPSHOT_FIELDS = (
+    'id', 'email', 'username', 'first_name', 'last_name', 'phone_number', 'role',
+    'is_active', 'is_staff', 'is_superuser', 'is_verified', 'date_joined',
+)
+
+STATS_FLUSH_INTERVAL = 60  # seconds
+
+user_cache = TieredCache('users')
+
+
+class CacheStats:
+    """Thread-safe per-namespace hit/miss/latency counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = self._empty()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _empty():
+        return {namespace: {'hits': 0, 'misses': 0, 'errors': 0, 'latency_ms': 0.0} for namespace in NAMESPACES}
+
+    def record(self, namespace, outcome, elapsed_ms):
+        with self._lock:
+            counters = self._pending[namespace]
+            counters[outcome] += 1
+            counters['latency_ms'] += elapsed_ms
+            due = time.monotonic() - self._last_flush >= STATS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Push pending counters to Redis so all workers' stats aggregate"""
+        with self._lock:
+            pending, self._pending = self._pending, self._empty()
+            self._last_flush = time.monotonic()
+
+        r = get_redis()
+        if r is None:
+            return
+        try:
+            pipe = r.pipeline(transaction=False)
+            for namespace, counters in pending.items():
+                key = redis_key(CACHE_KEY_STATS.format(namespace=namespace))
+                for field in ('hits', 'misses', 'errors'):
+                    if counters[field]:
+                        pipe.hincrby(key, field, counters[field])
+                if counters['latency_ms']:
+                    pipe.hincrbyfloat(key, 'latency_ms', counters['latency_ms'])
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error flushing user cache stats: {str(e)}")
 
 
-def get_cached_user_list():
+_stats = CacheStats()
+
+
+def _timed_get(namespace, key):
+    """Read a key and record the outcome for its namespace"""
+    start = time.perf_counter()
+    try:
+        value = user_cache.get(key)
+    except Exception as e:
+        _stats.record(namespace, 'errors', (time.perf_counter() - start) * 1000)
+        logger.error(f"Error reading {namespace} cache key {key}: {str(e)}")
+        return None
+    _stats.record(namespace, 'hits' if value is not None else 'misses', (time.perf_counter() - start) * 1000)
+    return value
+
+
+def _timed_get_or_build(namespace, key, producer, timeout):
+    """Read a key, building it with `producer` on a miss, and record the outcome"""
+    built = []
+
+    def build():
+        built.append(True)
+        return producer()
+
+    start = time.perf_counter()
+    value = user_cache.get_or_set(key, build, timeout)
+    _stats.record(namespace, 'misses' if built else 'hits', (time.perf_counter() - start) * 1000)
+    return value
+
+
+def get_cache_stats():
     """
-    Get cached list of users.
-    
+    Get aggregated cache stats for all workers.
+
     Returns:
-        list: List of serialized user data, or None if not cached
+        dict: namespace -> {hits, misses, errors, hit_rate, avg_latency_ms}
     """
+    _stats.flush()
+    r = get_redis()
+    stats = {}
+    for namespace in NAMESPACES:
+        raw = r.hgetall(redis_key(CACHE_KEY_STATS.format(namespace=namespace))) if r is not None else {}
+        hits = int(raw.get(b'hits', 0))
+        misses = int(raw.get(b'misses', 0))
+        errors = int(raw.get(b'errors', 0))
+        reads = hits + misses + errors
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'errors': errors,
+            'hit_rate': round(hits / reads, 4) if reads else None,
+            'avg_latency_ms': round(float(raw.get(b'latency_ms', 0)) / reads, 3) if reads else None,
+        }
+    return stats
+
+
+def get_generation(namespace):
+    """Get the current generation number for a namespace"""
     try:
-        cached_data = cache.get(CACHE_KEY_USER_LIST)
-        if cached_data:
-            logger.debug(f"Cache hit for user list")
-            return json.loads(cached_data) if isinstance(cached_data, str) else cached_data
-        logger.debug(f"Cache miss for user list")
+        return user_cache.get_counter(CACHE_KEY_GENERATION.format(namespace=namespace))
+    except Exception as e:
+        logger.error(f"Error reading {namespace} cache generation: {str(e)}")
         return None
+
+
+def bump_generation(namespace):
+    """Invalidate every entry of a namespace in O(1)"""
+    try:
+        return user_cache.incr(CACHE_KEY_GENERATION.format(namespace=namespace))
     except Exception as e:
-        logger.error(f"Error getting cached user list: {str(e)}")
+        logger.error(f"Error bumping {namespace} cache generation: {str(e)}")
         return None
 
 
-def set_cached_user_list(users_data, timeout=CACHE_TIMEOUT):
+def _list_page_key(page, page_size):
+    generation = get_generation(NAMESPACE_LIST)
+    if generation is None:
+        return None
+    return CACHE_KEY_USER_LIST_PAGE.format(generation=generation, page=page, page_size=page_size)
+
+
+def get_cached_user_list(page='all', page_size='all'):
     """
-    Cache the list of users.
-    
+    Get a cached page of the user list.
+
     Args:
-        users_data: List of serialized user data
-        timeout: Cache timeout in seconds (default: 1 hour)
+        page: Page number, or 'all' for the unpaginated list
+        page_size: Page size, or 'all' for the unpaginated list
+
+    Returns:
+        Serialized page data, or None if not cached
     """
+    key = _list_page_key(page, page_size)
+    if key is None:
+        return None
+    cached_data = _timed_get(NAMESPACE_LIST, key)
+    if cached_data is not None:
+        logger.debug(f"Cache hit for user list page {page} (size {page_size})")
+        return cached_data.data() if isinstance(cached_data, RenderedJSON) else cached_data
+    return None
+
+
+def set_cached_user_list(users_data, page='all', page_size='all', timeout=LIST_CACHE_TIMEOUT):
+    """
+    Cache a page of the user list under the current generation.
+
+    Args:
+        users_data: Serialized page data
+        page: Page number, or 'all' for the unpaginated list
+        page_size: Page size, or 'all' for the unpaginated list
+        timeout: Cache timeout in seconds (default: 10 minutes)
+    """
+    key = _list_page_key(page, page_size)
+    if key is None:
+        return
     try:
-        # Serialize to JSON string for storage
-        if isinstance(users_data, list):
-            serialized = json.dumps(users_data)
-        else:
-            serialized = json.dumps(users_data) if not isinstance(users_data, str) else users_data
-        
-        cache.set(CACHE_KEY_USER_LIST, serialized, timeout)
-        logger.info(f"Cached user list ({len(users_data) if isinstance(users_data, list) else 'N/A'} users)")
+        user_cache.set(key, RenderedJSON.from_data(users_data), timeout)
+        logger.debug(f"Cached user list page {page} (size {page_size})")
     except Exception as e:
         logger.error(f"Error caching user list: {str(e)}")
 
 
+def get_or_build_user_list(page, page_size, producer, timeout=LIST_CACHE_TIMEOUT):
+    """
+    Get a page of the user list, building it with `producer` on a miss.
+    Concurrent misses across workers run `producer` once.
+
+    Returns:
+        RenderedJSON: Whatever `producer` returns (normally RenderedJSON)
+    """
+    key = _list_page_key(page, page_size)
+    if key is None:
+        return producer()
+    return _timed_get_or_build(NAMESPACE_LIST, key, producer, timeout)
+
+
 def get_cached_user(user_id):
     """
     Get cached user by ID.
-    
+
     Args:
         user_id: User ID
-        
+
     Returns:
         dict: Serialized user data, or None if not cached
     """
-    try:
-        cached_data = cache.get(CACHE_KEY_USER_DETAIL.format(user_id=user_id))
-        if cached_data:
-            logger.debug(f"Cache hit for user {user_id}")
-            return json.loads(cached_data) if isinstance(cached_data, str) else cached_data
-        return None
-    except Exception as e:
-        logger.error(f"Error getting cached user {user_id}: {str(e)}")
-        return None
+    cached_data = _timed_get(NAMESPACE_DETAIL, CACHE_KEY_USER_DETAIL.format(user_id=user_id))
+    if cached_data is not None:
+        logger.debug(f"Cache hit for user {user_id}")
+        return cached_data.data() if isinstance(cached_data, RenderedJSON) else cached_data
+    return None
 
 
 def set_cached_user(user_id, user_data, timeout=CACHE_TIMEOUT):
     """
     Cache a single user.
-    
+
     Args:
         user_id: User ID
         user_data: Serialized user data
         timeout: Cache timeout in seconds (default: 1 hour)
     """
     try:
-        serialized = json.dumps(user_data) if not isinstance(user_data, str) else user_data
-        cache.set(CACHE_KEY_USER_DETAIL.format(user_id=user_id), serialized, timeout)
+        user_cache.set(CACHE_KEY_USER_DETAIL.format(user_id=user_id), RenderedJSON.from_data(user_data), timeout)
         logger.debug(f"Cached user {user_id}")
     except Exception as e:
         logger.error(f"Error caching user {user_id}: {str(e)}")
 
 
-def invalidate_user_list_cache():
+def get_or_build_user(user_id, producer, timeout=CACHE_TIMEOUT):
     """
-    Invalidate the user list cache.
-    Call this when users are created, updated, or deleted.
+    Get a single user, building it with `producer` on a miss.
+    Concurrent misses across workers run `producer` once.
+
+    Returns:
+        RenderedJSON: Whatever `producer` returns (normally RenderedJSON)
     """
+    return _timed_get_or_build(NAMESPACE_DETAIL, CACHE_KEY_USER_DETAIL.format(user_id=user_id), producer, timeout)
+
+
+def _email_key(email):
+    return CACHE_KEY_USER_BY_EMAIL.format(email=email.strip().lower())
+
+
+def get_cached_user_id_by_email(email):
+    """
+    Get a user id from the email index.
+
+    Returns:
+        int: User ID, or None if not cached
+    """
+    return _timed_get(NAMESPACE_EMAIL, _email_key(email))
+
+
+def set_cached_user_email(email, user_id, timeout=CACHE_TIMEOUT):
+    """Add an email -> user id entry to the index"""
+    try:
+        user_cache.set(_email_key(email), user_id, timeout)
+    except Exception as e:
+        logger.error(f"Error caching email index for user {user_id}: {str(e)}")
+
+
+def lookup_user_id_by_email(email):
+    """
+    Resolve an email to a user id through the index, filling it from the
+    database on a miss.
+
+    Returns:
+        int: User ID, or None if no user has this email
+    """
+    user_id = get_cached_user_id_by_email(email)
+    if user_id is not None:
+        return user_id
+
+    from users.models import User
+    user_id = User.objects.filter(email__iexact=email).values_list('id', flat=True).first()
+    if user_id is not None:
+        set_cached_user_email(email, user_id)
+    return user_id
+
+
+def get_or_build_parent_children_courses(parent_user_id, producer, timeout=PARENT_COURSES_CACHE_TIMEOUT):
+    """
+    Get a parent's children-with-enrollments response, building it with
+    `producer` on a miss.
+
+    Returns:
+        RenderedJSON: Whatever `producer` returns (normally RenderedJSON)
+    """
+    key = CACHE_KEY_PARENT_CHILDREN_COURSES.format(parent_user_id=parent_user_id)
+    return _timed_get_or_build(NAMESPACE_PARENT_COURSES, key, producer, timeout)
+
+
+def invalidate_parent_children_courses_cache(*parent_user_ids):
+    """
+    Invalidate the children's courses view for parents.
+
+    Args:
+        *parent_user_ids: User IDs of the parents (None values are ignored)
+    """
+    keys = [
+        CACHE_KEY_PARENT_CHILDREN_COURSES.format(parent_user_id=parent_user_id)
+        for parent_user_id in set(parent_user_ids) if parent_user_id
+    ]
+    if not keys:
+        return
     try:
-        cache.delete(CACHE_KEY_USER_LIST)
-        logger.info("Invalidated user list cache")
+        user_cache.delete(*keys)
+        logger.debug(f"Invalidated children's courses cache for parents {parent_user_ids}")
     except Exception as e:
-        logger.error(f"Error invalidating user list cache: {str(e)}")
+        logger.error(f"Error invalidating children's courses cache: {str(e)}")
+
 
+def get_user_snapshot(user_id):
+    """
+    Get a User for authentication from its cached snapshot, loading the
+    snapshot from the database on a miss.
+
+    The returned instance has only AUTH_SNAPSHOT_FIELDS loaded; other fields
+    are deferred, so reading them costs a query and save() only writes the
+    loaded fields.
 
-def invalidate_user_cache(user_id):
+    Returns:
+        User: Instance with snapshot fields loaded, or None if the user doesn't exist
+    """
+    from users.models import User
+
+    try:
+        version = user_cache.get_counter(
+            CACHE_KEY_AUTH_VERSION.format(user_id=user_id),
+            initial=_initial_auth_version(),
+            timeout=AUTH_VERSION_TIMEOUT,
+        )
+    except Exception as e:
+        logger.error(f"Error reading auth snapshot version for user {user_id}: {str(e)}")
+        version = None
+
+    # from_db() expects values in model field order
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in AUTH_SNAPSHOT_FIELDS]
+
+    key = CACHE_KEY_AUTH_SNAPSHOT.format(user_id=user_id, version=version) if version is not None else None
+    values = _timed_get(NAMESPACE_AUTH, key) if key else None
+    if values is None:
+        values = User.objects.filter(pk=user_id).values_list(*field_names).first()
+        if values is None:
+            return None
+        if key:
+            user_cache.set(key, values, AUTH_SNAPSHOT_TIMEOUT)
+    return User.from_db('default', field_names, values)
+
+
+def _initial_auth_version():
+    # Milliseconds: a stamp recreated after expiry or eviction starts above
+    # every stamp used before it
+    return int(time.time() * 1000)
+
+
+def _bump_user_snapshot(user_id):
+    try:
+        user_cache.incr(
+            CACHE_KEY_AUTH_VERSION.format(user_id=user_id),
+            initial=_initial_auth_version(),
+            timeout=AUTH_VERSION_TIMEOUT,
+        )
+    except Exception as e:
+        logger.error(f"Error bumping auth snapshot version for user {user_id}: {str(e)}")
+
+
+def invalidate_user_snapshot(user_id):
+    """
+    Bump a user's auth snapshot version so every worker reloads it, once
+    the current transaction commits. Bumping earlier would let a request
+    that reads the old row before the commit cache it under the new version.
+    Call after changes that bypass signals (e.g. queryset.update()).
+    """
+    transaction.on_commit(lambda: _bump_user_snapshot(user_id))
+
+
+def invalidate_user_list_cache():
+    """
+    Invalidate all user list pages by moving to a new generation.
+    Call this when users are created, updated, or deleted.
+    """
+    generation = bump_generation(NAMESPACE_LIST)
+    if generation is not None:
+        logger.debug(f"User list cache moved to generation {generation}")
+
+
+def invalidate_user_cache(user_id, *emails):
     """
     Invalidate cache for a specific user.
-    
+
     Args:
         user_id: User ID
+        *emails: Email addresses to drop from the email index
+                 (pass both old and new when the email changed)
     """
     try:
-        cache.delete(CACHE_KEY_USER_DETAIL.format(user_id=user_id))
-        cache.delete(CACHE_KEY_USER_BY_EMAIL.format(email='*'))  # Pattern matching not supported, but we invalidate list
+        keys = [CACHE_KEY_USER_DETAIL.format(user_id=user_id)]
+        keys.extend(_email_key(email) for email in set(emails) if email)
+        user_cache.delete(*keys)
         logger.debug(f"Invalidated cache for user {user_id}")
     except Exception as e:
         logger.error(f"Error invalidating user cache {user_id}: {str(e)}")
 
 
-def invalidate_all_user_caches():
+def invalidate_users(entries):
     """
-    Invalidate all user-related caches.
-    Useful for bulk operations or when you want to clear everything.
+    Invalidate detail, email index and auth snapshot entries for many users
+    with one delete.
+
+    Args:
+        entries: Iterable of (user_id, *emails) tuples
     """
+    keys, user_ids = set(), set()
+    for user_id, *emails in entries:
+        user_ids.add(user_id)
+        keys.add(CACHE_KEY_USER_DETAIL.format(user_id=user_id))
+        keys.update(_email_key(email) for email in emails if email)
+    if not keys:
+        return
     try:
-        invalidate_user_list_cache()
-        # Note: Individual user caches will expire naturally
-        # For a complete clear, you'd need to track all user IDs or use cache.clear()
-        logger.info("Invalidated all user caches")
+        user_cache.delete(*keys)
     except Exception as e:
-        logger.error(f"Error invalidating all user caches: {str(e)}")
+        logger.error(f"Error invalidating user caches: {str(e)}")
+    for user_id in user_ids:
+        invalidate_user_snapshot(user_id)
+    logger.debug(f"Invalidated cache for {len(user_ids)} user(s)")
+
 
+def invalidate_all_user_caches():
+    """
+    Invalidate all user-related caches.
+    Useful for bulk operations. List pages are dropped via the generation
+    counter; detail and email entries expire naturally.
+    """
+    invalidate_user_list_cache()
+    logger.info("Invalidated all user caches")
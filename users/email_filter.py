@@ -0,0 +1,201 @@
+"""
+Bloom filter of registered emails.
+
+The signup form checks email availability on every keystroke pause. A
+Bloom filter answers "definitely not registered" without touching
+Postgres; only possible positives fall through to the email index and the
+database (users.cache.lookup_user_id_by_email).
+
+- The filter is a Redis bitmap (`users:email_bloom`) sized for
+  EMAIL_FILTER_CAPACITY emails at a ~1% false-positive rate (about 1.2 MB
+  for a million emails). Adding emails is one BITFIELD command.
+- Checks read the k bits of an email from Redis with one BITFIELD GET,
+  pipelined with the filter's size in a MULTI, so one round trip. An email
+  added by any process is seen by the next check everywhere: a "no" is
+  never stale. The size is remembered per process and verified on every
+  check, so a rebuild with a new size is picked up immediately.
+- Bloom filters can't remove entries. Deleted emails stay as false
+  positives (answered correctly by the database) and are counted; the
+  filter is rebuilt once they pass REBUILD_DELETED_RATIO of the entries.
+- Until the filter has been built (rebuildEmailFilter), or when Redis is
+  unavailable, every email is a possible positive.
+"""
+import hashlib
+import logging
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from it360acad_backend.redis_client import get_redis, redis_key
+from it360acad_backend.task_publisher import publish_task, FALLBACK_SPOOL
+from users.models import User
+
+logger = logging.getLogger('users')
+
+FILTER_KEY = 'users:email_bloom'
+FILTER_META_KEY = 'users:email_bloom:meta'
+DEFAULT_CAPACITY = 1_000_000
+FALSE_POSITIVE_RATE = 0.01
+REBUILD_DELETED_RATIO = 0.05
+REBUILD_BATCH_SIZE = 5000
+# Registrations committed while a rebuild scans the table are re-added afterwards
+REBUILD_OVERLAP = timedelta(minutes=5)
+
+
+def _size(capacity):
+    """Bits and hash count for `capacity` entries at FALSE_POSITIVE_RATE"""
+    bits = math.ceil(-capacity * math.log(FALSE_POSITIVE_RATE) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _normalize(email):
+    return email.strip().lower()
+
+
+def _offsets(email, bits, hashes):
+    """Bit offsets for an email (double hashing over one blake2b digest)"""
+    digest = hashlib.blake2b(_normalize(email).encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'big')
+    h2 = int.from_bytes(digest[8:], 'big') | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def _set_bit(data, offset):
+    data[offset >> 3] |= 1 << (7 - (offset & 7))
+
+
+# Filter size (bits, hashes) last read from Redis, verified on every check
+_filter_size = (None, None)
+
+
+def _read_filter_size(r):
+    bits, hashes = r.hmget(redis_key(FILTER_META_KEY), 'bits', 'hashes')
+    return (int(bits), int(hashes)) if bits is not None else (None, None)
+
+
+def might_have_email(email):
+    """
+    Check the filter for an email.
+
+    Returns:
+        bool: False if the email is definitely not registered, True if it
+              may be (check the database to be sure)
+    """
+    global _filter_size
+
+    r = get_redis()
+    if r is None:
+        return True
+    try:
+        if _filter_size[0] is None:
+            _filter_size = _read_filter_size(r)
+        for _ in range(2):
+            bits, hashes = _filter_size
+            if bits is None:
+                # Not built yet
+                return True
+            command = ['BITFIELD', redis_key(FILTER_KEY)]
+            for offset in _offsets(email, bits, hashes):
+                command.extend(['GET', 'u1', offset])
+            pipe = r.pipeline(transaction=True)
+            pipe.hmget(redis_key(FILTER_META_KEY), 'bits', 'hashes')
+            pipe.execute_command(*command)
+            (current_bits, current_hashes), values = pipe.execute()
+            current = (int(current_bits), int(current_hashes)) if current_bits is not None else (None, None)
+            if current == _filter_size:
+                return all(values)
+            # Rebuilt with a different size since we last looked: retry with it
+            _filter_size = current
+    except Exception as e:
+        logger.error(f"Error checking email filter: {str(e)}")
+    return True
+
+
+def add_emails(emails):
+    """Add emails to the filter (one BITFIELD command)"""
+    emails = [email for email in emails if email]
+    r = get_redis()
+    if r is None or not emails:
+        return
+    try:
+        bits, hashes = r.hmget(redis_key(FILTER_META_KEY), 'bits', 'hashes')
+        if bits is None:
+            return
+        bits, hashes = int(bits), int(hashes)
+        offsets = [offset for email in emails for offset in _offsets(email, bits, hashes)]
+        command = ['BITFIELD', redis_key(FILTER_KEY)]
+        for offset in offsets:
+            command.extend(['SET', 'u1', offset, 1])
+        pipe = r.pipeline(transaction=True)
+        pipe.execute_command(*command)
+        pipe.hincrby(redis_key(FILTER_META_KEY), 'count', len(emails))
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error adding emails to filter: {str(e)}")
+
+
+def record_deleted_emails(count):
+    """
+    Count emails removed from the user table (they stay in the filter as
+    false positives) and queue a rebuild once too many have piled up.
+    """
+    r = get_redis()
+    if r is None or not count:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.hincrby(redis_key(FILTER_META_KEY), 'deleted', count)
+        pipe.hget(redis_key(FILTER_META_KEY), 'count')
+        deleted, entries = pipe.execute()
+        entries = int(entries or 0)
+        if entries and deleted / entries >= REBUILD_DELETED_RATIO:
+            # Imported here: users.tasks imports this module
+            from users.tasks import rebuild_email_filter_task
+            publish_task(rebuild_email_filter_task, fallback=FALLBACK_SPOOL)
+    except Exception as e:
+        logger.error(f"Error recording deleted emails in filter: {str(e)}")
+
+
+def rebuild_email_filter(capacity=None):
+    """
+    Rebuild the filter from the user table and swap it in atomically.
+
+    Args:
+        capacity: Expected number of emails (default: EMAIL_FILTER_CAPACITY
+                  setting, grown to twice the current user count if needed)
+
+    Returns:
+        dict: bits, hashes and number of emails added
+    """
+    r = get_redis()
+    if r is None:
+        raise RuntimeError('The email filter needs the Redis cache backend')
+
+    started = timezone.now() - REBUILD_OVERLAP
+    total = User.objects.count()
+    capacity = max(capacity or getattr(settings, 'EMAIL_FILTER_CAPACITY', DEFAULT_CAPACITY), total * 2, 1)
+    bits, hashes = _size(capacity)
+    data = bytearray(math.ceil(bits / 8))
+
+    count = 0
+    for email in User.objects.values_list('email', flat=True).iterator(chunk_size=REBUILD_BATCH_SIZE):
+        for offset in _offsets(email, bits, hashes):
+            _set_bit(data, offset)
+        count += 1
+
+    staging_key = redis_key(f'{FILTER_KEY}:building')
+    pipe = r.pipeline(transaction=True)
+    pipe.set(staging_key, bytes(data))
+    pipe.rename(staging_key, redis_key(FILTER_KEY))
+    pipe.delete(redis_key(FILTER_META_KEY))
+    pipe.hset(redis_key(FILTER_META_KEY), mapping={'bits': bits, 'hashes': hashes, 'count': count, 'deleted': 0})
+    pipe.execute()
+
+    # Users registered while the table was scanned may have set bits in the old bitmap
+    add_emails(User.objects.filter(date_joined__gte=started).values_list('email', flat=True))
+
+    logger.info(f"Rebuilt email filter: {count} emails, {bits} bits, {hashes} hashes")
+    return {'bits': bits, 'hashes': hashes, 'emails': count}
@@ -1,5 +1,6 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from users.models import User, Profile
+from users.purge import purge_all_users, PURGE_BATCH_SIZE
 
 
 class Command(BaseCommand):
@@ -12,6 +13,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Do not prompt for confirmation',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help=f'Rows deleted per transaction (default: {PURGE_BATCH_SIZE})',
+        )
 
     def handle(self, *args, **options):
         user_count = User.objects.count()
@@ -29,16 +36,23 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.WARNING('Operation cancelled.'))
                 return
 
-        # Delete all profiles first (due to foreign key relationship)
         profile_count = Profile.objects.count()
-        Profile.objects.all().delete()
-        
-        # Delete all users
-        User.objects.all().delete()
-        
+
+        # Delete users and everything that depends on them in batches, one
+        # short transaction per batch instead of one transaction for all rows
+        try:
+            purge_all_users(batch_size=options['batch_size'], callback=self._report_progress)
+        except Exception as e:
+            raise CommandError(f'Deletion stopped: {str(e)}. Batches already deleted stay deleted; rerun to continue.')
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully deleted {user_count} user(s) and {profile_count} profile(s).'
             )
         )
 
+    def _report_progress(self, progress):
+        if progress['status'] != 'running' or not progress['deleted']:
+            return
+        label, count = list(progress['deleted'].items())[-1]
+        self.stdout.write(f'  {label}: {count} deleted ...')
@@ -0,0 +1,106 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from users.bulk_import import import_users, import_users_from_csv, DEFAULT_CHUNK_SIZE, IMPORT_ROLES
+from users.models import User
+
+BENCHMARK_EMAIL_DOMAIN = 'bulk-import-benchmark.invalid'
+
+
+class Command(BaseCommand):
+    help = 'Bulk import students/parents from a CSV file (or benchmark the import with synthetic users)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', nargs='?', help='Path to the CSV file')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows per batch (default: {DEFAULT_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Password hashing processes (default: CPU count, 1 hashes in process)',
+        )
+        parser.add_argument(
+            '--role',
+            choices=IMPORT_ROLES,
+            default='student',
+            help='Role for rows without a role column (default: student)',
+        )
+        parser.add_argument(
+            '--verified',
+            action='store_true',
+            help='Mark imported users as email-verified',
+        )
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='N',
+            help='Import N synthetic students, report users/second, then delete them',
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'chunk_size': options['chunk_size'],
+            'workers': options['workers'],
+            'default_role': options['role'],
+            'is_verified': options['verified'],
+            'progress': self._report_progress,
+        }
+
+        if options['benchmark']:
+            self._benchmark(options['benchmark'], kwargs)
+            return
+
+        if not options['csv_path']:
+            raise CommandError('Provide a CSV path or --benchmark N.')
+
+        try:
+            with open(options['csv_path'], newline='', encoding='utf-8-sig') as stream:
+                result = import_users_from_csv(stream, **kwargs)
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['csv_path']}")
+
+        for error in result.errors:
+            self.stdout.write(self.style.WARNING(f"Line {error['line']}: {error['error']}"))
+        if result.failed > len(result.errors):
+            self.stdout.write(self.style.WARNING(f'... and {result.failed - len(result.errors)} more errors'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {result.created} user(s), skipped {result.skipped} existing, '
+                f'{result.failed} failed in {result.elapsed:.1f}s ({result.users_per_second} users/s).'
+            )
+        )
+
+    def _report_progress(self, result):
+        self.stdout.write(f'  {result.created} created, {result.skipped} skipped, {result.failed} failed ...')
+
+    def _benchmark(self, count, kwargs):
+        run_id = uuid.uuid4().hex[:8]
+        rows = (
+            {
+                'email': f'bench-{run_id}-{index}@{BENCHMARK_EMAIL_DOMAIN}',
+                'password': f'Bench-{run_id}-{index}!',
+                'first_name': 'Bench',
+                'last_name': str(index),
+                'current_class': 'JSS1',
+            }
+            for index in range(count)
+        )
+
+        result = import_users(rows, **kwargs)
+        summary = result.as_dict()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {summary['created']} users in {summary['elapsed_seconds']}s: "
+                f"{summary['users_per_second']} users/s "
+                f"(hashing {summary['hash_seconds']}s, inserts {summary['insert_seconds']}s)"
+            )
+        )
+
+        deleted, _ = User.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}', email__startswith=f'bench-{run_id}-').delete()
+        self.stdout.write(f'Cleaned up benchmark data ({deleted} rows).')
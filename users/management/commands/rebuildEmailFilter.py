@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from users.email_filter import rebuild_email_filter
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the Bloom filter of registered emails used by check-email-exists'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=None,
+            help='Expected number of emails (default: EMAIL_FILTER_CAPACITY setting)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = rebuild_email_filter(capacity=options['capacity'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt email filter with {result['emails']} email(s) "
+                f"({result['bits']} bits, {result['hashes']} hashes)."
+            )
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from users.cache import get_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss/latency stats for the user caches, aggregated across all workers'
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+
+        self.stdout.write(f"{'namespace':<15} {'hits':>10} {'misses':>10} {'errors':>8} {'hit rate':>9} {'avg ms':>8}")
+        for namespace, counters in stats.items():
+            hit_rate = f"{counters['hit_rate']:.1%}" if counters['hit_rate'] is not None else '-'
+            latency = f"{counters['avg_latency_ms']:.3f}" if counters['avg_latency_ms'] is not None else '-'
+            self.stdout.write(
+                f"{namespace:<15} {counters['hits']:>10} {counters['misses']:>10} "
+                f"{counters['errors']:>8} {hit_rate:>9} {latency:>8}"
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_move_phone_number_to_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, help_text='Set when the account is deactivated for deletion; the data is purged in the background', null=True, verbose_name='deleted at'),
+        ),
+    ]
@@ -34,6 +34,7 @@ class User(AbstractUser):
   phone_number = models.CharField(max_length=20, blank=False, default='', verbose_name='phone number', help_text='Required for registration')
   role = models.CharField(max_length=20, blank=False, verbose_name='role', choices=[ ('student', 'Student'), ('parent', 'Parent'), ('admin', 'Admin')], default='student')
   is_verified = models.BooleanField(default=False, verbose_name='email verified')
+  deleted_at = models.DateTimeField(null=True, blank=True, verbose_name='deleted at', help_text='Set when the account is deactivated for deletion; the data is purged in the background')
   
   # Use email as the username field
   USERNAME_FIELD = 'email'
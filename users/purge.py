@@ -0,0 +1,215 @@
+"""
+Batched account purging.
+
+Deleting a user in one `user.delete()` call makes Django collect every
+dependent row (notifications, messages, enrollments, payments, ...) into
+memory and delete them in one long transaction. For active accounts that
+holds locks on the busiest tables for the whole delete.
+
+Instead, accounts are first deactivated (`is_active=False`, `deleted_at`
+set), which blocks logins and token authentication immediately, and the
+rows are then removed in the background:
+
+- every table with a CASCADE foreign key to User is emptied in batches of
+  primary keys, one short transaction per batch
+- each batch is deleted with `QuerySet.delete()`, which Django runs as a
+  single `DELETE ... WHERE id IN (...)` for tables without signal
+  receivers or dependents of their own; tables with receivers (e.g.
+  enrollments) still fire them so dependent caches stay correct
+- the user row goes last, once nothing large is left to cascade
+- rows that PROTECT the users (or their cascaded rows) are checked up
+  front, so a purge never stops halfway on a ProtectedError
+
+Progress is logged and kept in the cache under `users:purge:{key}`.
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
+
+from users.models import User
+
+logger = logging.getLogger('users')
+
+PURGE_BATCH_SIZE = 1000
+PURGE_PROGRESS_TIMEOUT = 60 * 60 * 24  # 1 day
+PURGE_PROGRESS_KEY = 'users:purge:{key}'
+
+
+def get_dependent_relations():
+    """
+    Reverse relations that CASCADE from User, as (model, field name) pairs.
+
+    Many-to-one tables (usually the large ones) come first; one-to-one
+    profile tables go last so a half-purged account keeps its shape.
+    """
+    relations = [
+        relation for relation in User._meta.related_objects
+        if not relation.many_to_many and relation.on_delete is models.CASCADE
+    ]
+    relations.sort(key=lambda relation: relation.one_to_one)
+    return [(relation.related_model, relation.field.name) for relation in relations]
+
+
+def get_protected_relations(users, model=User, path='', seen=None):
+    """
+    Labels of rows protected from deletion (PROTECT foreign keys) that would
+    block purging `users`, following CASCADE relations down the tree. These
+    must be reassigned before the accounts can be deleted.
+
+    Args:
+        users: Queryset of users to check
+
+    Returns:
+        list: Sorted verbose names of the protecting models
+    """
+    seen = seen if seen is not None else {model}
+    protected = set()
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            continue
+        lookup = f'{relation.field.name}__{path}' if path else relation.field.name
+        related_model = relation.related_model
+        if relation.on_delete is models.PROTECT:
+            if related_model._default_manager.filter(**{f'{lookup}__in': users.values('pk')}).exists():
+                protected.add(str(related_model._meta.verbose_name_plural))
+        elif relation.on_delete is models.CASCADE and related_model not in seen:
+            protected.update(get_protected_relations(users, related_model, lookup, seen | {related_model}))
+    return sorted(protected)
+
+
+def get_purge_progress(key):
+    """
+    Return the last reported progress for a purge.
+
+    Args:
+        key: User ID (account purge) or 'all' (dropAllUser)
+
+    Returns:
+        dict or None
+    """
+    try:
+        return cache.get(PURGE_PROGRESS_KEY.format(key=key))
+    except Exception as e:
+        logger.error(f"Error reading purge progress for {key}: {str(e)}")
+        return None
+
+
+def _report(key, progress, callback=None):
+    try:
+        cache.set(PURGE_PROGRESS_KEY.format(key=key), progress, PURGE_PROGRESS_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Error saving purge progress for {key}: {str(e)}")
+    if callback:
+        callback(progress)
+
+
+def delete_in_batches(queryset, batch_size=PURGE_BATCH_SIZE, on_batch=None):
+    """
+    Delete the rows of `queryset` in primary-key batches, one transaction each.
+
+    Args:
+        queryset: Rows to delete
+        batch_size: Rows per DELETE
+        on_batch: Optional callable receiving the number of rows deleted so far
+
+    Returns:
+        int: Rows deleted from the queryset's table (cascaded rows not counted)
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        batch = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        with transaction.atomic():
+            _, per_model = model._default_manager.filter(pk__in=batch).delete()
+        deleted += per_model.get(model._meta.label, 0)
+        if on_batch:
+            on_batch(deleted)
+        if len(batch) < batch_size:
+            return deleted
+
+
+def _purge(key, users, batch_size, callback):
+    progress = {
+        'status': 'running',
+        'started_at': timezone.now().isoformat(),
+        'finished_at': None,
+        'deleted': {},
+        'error': None,
+    }
+    _report(key, progress, callback)
+    started = time.perf_counter()
+
+    protected = get_protected_relations(users)
+    if protected:
+        message = f"rows in {', '.join(protected)} reference these users and are protected; reassign them first"
+        progress.update(status='failed', error=message, finished_at=timezone.now().isoformat())
+        _report(key, progress, callback)
+        logger.error(f"Error purging users ({key}): {message}")
+        raise ValueError(message)
+
+    def track(label):
+        def on_batch(count):
+            progress['deleted'][label] = count
+            _report(key, progress, callback)
+        return on_batch
+
+    try:
+        for model, field in get_dependent_relations():
+            label = model._meta.label
+            queryset = model._default_manager.filter(**{f'{field}__in': users.values('pk')})
+            delete_in_batches(queryset, batch_size, track(label))
+        delete_in_batches(users, batch_size, track(User._meta.label))
+    except Exception as e:
+        progress.update(status='failed', error=str(e), finished_at=timezone.now().isoformat())
+        _report(key, progress, callback)
+        logger.error(f"Error purging users ({key}): {str(e)}")
+        raise
+
+    progress.update(status='done', finished_at=timezone.now().isoformat())
+    _report(key, progress, callback)
+    logger.info(
+        f"Purged users ({key}) in {time.perf_counter() - started:.1f}s: "
+        f"{sum(progress['deleted'].values())} rows"
+    )
+    return progress
+
+
+def deactivate_user(user):
+    """
+    Soft-delete a user: block logins and token use right away and mark the
+    account for purging.
+    """
+    user.is_active = False
+    user.deleted_at = timezone.now()
+    user.save(update_fields=['is_active', 'deleted_at'])
+
+
+def purge_user(user_id, batch_size=PURGE_BATCH_SIZE, callback=None):
+    """
+    Delete a deactivated user and all their data in batches.
+
+    Args:
+        user_id: ID of the user to purge
+        batch_size: Rows per DELETE
+        callback: Optional callable receiving the progress dict after each batch
+
+    Returns:
+        dict: Final progress
+    """
+    users = User.objects.filter(pk=user_id)
+    return _purge(user_id, users, batch_size, callback)
+
+
+def purge_all_users(batch_size=PURGE_BATCH_SIZE, callback=None):
+    """
+    Delete every user and their data in batches (dropAllUser).
+
+    Returns:
+        dict: Final progress
+    """
+    return _purge('all', User.objects.all(), batch_size, callback)
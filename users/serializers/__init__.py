@@ -7,6 +7,7 @@ from .user import (
 )
 from .student import StudentSerializer
 from .parent import ParentSerializer
+from .bulk_import import UserImportSerializer, UserImportResultSerializer, UserImportStatusSerializer
 
 __all__ = [
     'UserSerializer', 
@@ -16,5 +17,8 @@ __all__ = [
     'StudentSerializer',
     'LinkChildSerializer',
     'ParentSerializer',
+    'UserImportSerializer',
+    'UserImportResultSerializer',
+    'UserImportStatusSerializer',
 ]
 
@@ -0,0 +1,38 @@
+"""
+Serializers for bulk user import
+"""
+from rest_framework import serializers
+from users.bulk_import import IMPORT_ROLES
+
+
+class UserImportSerializer(serializers.Serializer):
+    """CSV upload for bulk user import"""
+    file = serializers.FileField(help_text='CSV with a header row; only the email column is required')
+    role = serializers.ChoiceField(choices=IMPORT_ROLES, default='student', help_text='Role for rows without a role column')
+    is_verified = serializers.BooleanField(default=False, help_text='Mark imported users as email-verified')
+
+
+class ImportErrorSerializer(serializers.Serializer):
+    line = serializers.IntegerField()
+    error = serializers.CharField()
+
+
+class UserImportResultSerializer(serializers.Serializer):
+    """Outcome of a bulk import"""
+    created = serializers.IntegerField()
+    skipped = serializers.IntegerField(help_text='Rows whose email already exists')
+    failed = serializers.IntegerField()
+    errors = ImportErrorSerializer(many=True, help_text='First 100 row errors')
+    elapsed_seconds = serializers.FloatField()
+    hash_seconds = serializers.FloatField()
+    insert_seconds = serializers.FloatField()
+    users_per_second = serializers.FloatField()
+
+
+class UserImportStatusSerializer(serializers.Serializer):
+    """Status of a background bulk import"""
+    import_id = serializers.CharField()
+    status = serializers.ChoiceField(choices=['queued', 'running', 'completed', 'failed'])
+    result = UserImportResultSerializer(allow_null=True, help_text='Totals so far while running; final totals once completed')
+    error = serializers.CharField(allow_null=True)
+    status_url = serializers.CharField(required=False, help_text='Returned when the import is queued')
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from users.models import User, Profile, Student, Parent
 from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from users.bulk_import import generate_linking_codes
 
 # User Serializer
 class UserSerializer(serializers.ModelSerializer):
@@ -72,27 +74,32 @@ class UserSerializer(serializers.ModelSerializer):
     validated_data['is_verified'] = False
     validated_data['is_active'] = True
     
-    user = super().create(validated_data)
-    
-    # Create Profile
-    Profile.objects.create(user=user)
-    
-    # Create role-specific profile
-    if role == 'student':
-      Student.objects.create(user=user, **{k: v for k, v in student_data.items() if v is not None})
-    elif role == 'parent':
-      parent_profile = Parent.objects.create(user=user, **{k: v for k, v in parent_data.items() if v is not None})
-      # Link child if code provided
-      if linking_code:
-        try:
-          student = Student.objects.get(linking_code=linking_code)
-          if not student.parent:
+    # User and profile rows are created together or not at all; signal side
+    # effects (cache invalidation) are deferred until commit
+    with transaction.atomic():
+      user = super().create(validated_data)
+      
+      # Profile and role rows are inserted with bulk_create, one INSERT per
+      # table and no per-row save() queries. They can't share a statement
+      # with the user insert: they need its primary key. Their post_save
+      # receivers only invalidate a previous parent's cache, which a new
+      # user doesn't have.
+      Profile.objects.bulk_create([Profile(user=user)])
+      
+      # Create role-specific profile
+      if role == 'student':
+        # Pre-generated instead of Student.save()'s collision check
+        student_data['linking_code'] = generate_linking_codes(1)[0]
+        Student.objects.bulk_create([Student(user=user, **{k: v for k, v in student_data.items() if v is not None})])
+      elif role == 'parent':
+        parent_profile, = Parent.objects.bulk_create([Parent(user=user, **{k: v for k, v in parent_data.items() if v is not None})])
+        # Link child if code provided
+        if linking_code:
+          student = Student.objects.filter(linking_code=linking_code, parent__isnull=True).first()
+          # An unknown or already-linked code is ignored during registration
+          if student:
             student.parent = parent_profile
-            student.save()
-        except Student.DoesNotExist:
-          # We might want to raise an error here, but for registration, 
-          # maybe just ignore or handle it gracefully
-          pass
+            student.save(update_fields=['parent'])
       
     return user
 
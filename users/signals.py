@@ -1,29 +1,69 @@
 """
 Signals for user model to handle cache invalidation
+
+Invalidations run after the transaction commits (so a concurrent request
+can't re-cache the old rows before the commit) and are coalesced: saving
+or deleting many users in one transaction bumps the list generation once
+and deletes all affected keys in one call.
 """
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
-from users.models import User
-from users.cache import invalidate_user_list_cache, invalidate_user_cache
+from users.models import User, Student, Parent
+from courses.models.enrollment import CourseEnrollment
+from users.cache import (
+    invalidate_user_list_cache,
+    invalidate_users,
+    invalidate_parent_children_courses_cache,
+    CACHED_USER_FIELDS,
+    AUTH_SNAPSHOT_FIELDS,
+)
+from users.email_filter import add_emails, record_deleted_emails
+from it360acad_backend.commit_hooks import on_commit_batched
 import logging
 
 logger = logging.getLogger('users')
 
 
+def _invalidate_user_list_on_commit():
+    on_commit_batched('users:list', lambda items: invalidate_user_list_cache(), None)
+
+
+def _invalidate_users_on_commit(user_id, *emails):
+    on_commit_batched('users:detail', invalidate_users, (user_id, *emails))
+
+
+@receiver(post_init, sender=User)
+def remember_original_email(sender, instance, **kwargs):
+    """
+    Remember the email the user was loaded with so an email change can drop
+    the old entry from the email index.
+    """
+    instance._original_email = instance.__dict__.get('email')
+
+
 @receiver(post_save, sender=User)
-def invalidate_user_cache_on_save(sender, instance, created, **kwargs):
+def invalidate_user_cache_on_save(sender, instance, created, update_fields=None, **kwargs):
     """
     Invalidate cache when a user is created or updated.
+    Saves that only touch fields the cache does not render (e.g. last_login
+    on every login) are skipped.
     """
+    if update_fields and not CACHED_USER_FIELDS.union(AUTH_SNAPSHOT_FIELDS).intersection(update_fields):
+        return
+
+    if created or instance.email != getattr(instance, '_original_email', None):
+        on_commit_batched('users:email_filter', add_emails, instance.email)
+
     if created:
         # New user created - invalidate list cache
-        invalidate_user_list_cache()
-        logger.info(f"Invalidated user list cache after creating user {instance.id}")
+        _invalidate_user_list_on_commit()
+        logger.info(f"Invalidating user list cache after creating user {instance.id}")
     else:
-        # User updated - invalidate both user and list cache
-        invalidate_user_cache(instance.id)
-        invalidate_user_list_cache()
-        logger.info(f"Invalidated cache for updated user {instance.id}")
+        # User updated - invalidate user, auth snapshot and list cache
+        _invalidate_users_on_commit(instance.id, instance.email, getattr(instance, '_original_email', None))
+        _invalidate_user_list_on_commit()
+        logger.info(f"Invalidating cache for updated user {instance.id}")
+    instance._original_email = instance.email
 
 
 @receiver(post_delete, sender=User)
@@ -31,7 +71,55 @@ def invalidate_user_cache_on_delete(sender, instance, **kwargs):
     """
     Invalidate cache when a user is deleted.
     """
-    invalidate_user_cache(instance.id)
-    invalidate_user_list_cache()
-    logger.info(f"Invalidated cache for deleted user {instance.id}")
+    _invalidate_users_on_commit(instance.id, instance.email)
+    _invalidate_user_list_on_commit()
+    on_commit_batched('users:email_filter_deleted', lambda items: record_deleted_emails(len(items)), instance.id)
+    logger.info(f"Invalidating cache for deleted user {instance.id}")
+
+
+def _flush_parent_invalidations(items):
+    """Resolve parent user ids for (kind, id) items and invalidate their caches"""
+    student_user_ids = {value for kind, value in items if kind == 'student_user'}
+    parent_ids = {value for kind, value in items if kind == 'parent'}
+    parent_user_ids = set()
+    if student_user_ids:
+        parent_user_ids.update(
+            Student.objects.filter(user_id__in=student_user_ids, parent__isnull=False)
+            .values_list('parent__user_id', flat=True)
+        )
+    if parent_ids:
+        parent_user_ids.update(Parent.objects.filter(pk__in=parent_ids).values_list('user_id', flat=True))
+    invalidate_parent_children_courses_cache(*parent_user_ids)
+
+
+def _invalidate_parents_on_commit(*items):
+    on_commit_batched('users:parent_courses', _flush_parent_invalidations, *items)
+
+
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def invalidate_parent_courses_on_enrollment_change(sender, instance, **kwargs):
+    """
+    Invalidate the parent's children's courses view when a child's
+    enrollment is created, updated or removed.
+    """
+    _invalidate_parents_on_commit(('student_user', instance.user_id))
+
+
+@receiver(post_init, sender=Student)
+def remember_original_parent(sender, instance, **kwargs):
+    """Remember the parent the student was loaded with to detect relinking"""
+    instance._original_parent_id = instance.__dict__.get('parent_id')
 
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_parent_courses_on_student_change(sender, instance, **kwargs):
+    """
+    Invalidate the children's courses view for the student's current and
+    previous parent when the student is linked, unlinked or edited.
+    """
+    parent_ids = {instance.parent_id, getattr(instance, '_original_parent_id', None)} - {None}
+    instance._original_parent_id = instance.parent_id
+    if parent_ids:
+        _invalidate_parents_on_commit(*[('parent', parent_id) for parent_id in parent_ids])
@@ -0,0 +1,143 @@
+"""
+Celery tasks for users app
+
+Background purging of deleted accounts (see users/purge.py), bulk user
+imports (see users/bulk_import.py) and upkeep of the registered-email
+filter (see users/email_filter.py).
+"""
+import io
+from datetime import timedelta
+
+from celery import shared_task
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from users.models import User
+from users.purge import purge_user
+from users.bulk_import import import_users_from_csv, set_import_status
+from users.email_filter import rebuild_email_filter
+from outbox.relay import enqueue_task
+import logging
+
+logger = logging.getLogger('users')
+
+# Accounts still present this long after deactivation are picked up by the sweep
+PURGE_SWEEP_DELAY = timedelta(minutes=15)
+
+# Password hashing dominates an import (PBKDF2, one hash per row)
+IMPORT_SOFT_TIME_LIMIT = 3 * 60 * 60
+IMPORT_TIME_LIMIT = IMPORT_SOFT_TIME_LIMIT + 5 * 60
+
+
+@shared_task(bind=True)
+def purge_deleted_user(self, user_id):
+    """
+    Delete a deactivated account and its data in batches.
+
+    Progress is published as task state (PROGRESS) and in the cache
+    (users.purge.get_purge_progress).
+
+    Args:
+        user_id: ID of the deactivated user
+
+    Returns:
+        dict: Rows deleted per table, or None if there was nothing to purge
+    """
+    if not User.objects.filter(pk=user_id, deleted_at__isnull=False).exists():
+        logger.warning(f"Purge skipped: user {user_id} does not exist or was not deleted")
+        return None
+
+    def report(progress):
+        if self.request.id:
+            self.update_state(state='PROGRESS', meta=progress)
+
+    progress = purge_user(user_id, callback=report)
+    return progress['deleted']
+
+
+@shared_task(soft_time_limit=IMPORT_SOFT_TIME_LIMIT, time_limit=IMPORT_TIME_LIMIT)
+def import_users_task(import_id, path, default_role='student', is_verified=False, max_rows=None):
+    """
+    Import users from an uploaded CSV (saved to default_storage by
+    UserImportView), then delete the file.
+
+    Progress (after each chunk) and the final result are saved with
+    users.bulk_import.set_import_status. Re-running after a crash is safe:
+    rows whose email already exists are skipped.
+
+    Args:
+        import_id: Key for the import status
+        path: Storage path of the CSV
+
+    Returns:
+        dict: ImportResult.as_dict()
+    """
+    set_import_status(import_id, 'running')
+    try:
+        with default_storage.open(path, 'rb') as upload:
+            stream = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+            result = import_users_from_csv(
+                stream,
+                default_role=default_role,
+                is_verified=is_verified,
+                max_rows=max_rows,
+                # Daemonic worker processes can't start a process pool
+                workers=1,
+                progress=lambda progress: set_import_status(import_id, 'running', progress.as_dict()),
+            )
+    except Exception as e:
+        logger.error(f"Error importing users ({import_id}): {str(e)}")
+        set_import_status(import_id, 'failed', error=str(e))
+        raise
+    finally:
+        try:
+            default_storage.delete(path)
+        except Exception as e:
+            logger.error(f"Error deleting import upload {path}: {str(e)}")
+
+    set_import_status(import_id, 'completed', result.as_dict())
+    logger.info(f"Import {import_id}: {result.created} users created ({result.failed} failed)")
+    return result.as_dict()
+
+
+@shared_task
+def purge_deactivated_users():
+    """
+    Purge accounts whose purge task never ran or failed (e.g. the broker was
+    down when the account was deleted).
+
+    Returns:
+        int: Number of accounts purged
+    """
+    cutoff = timezone.now() - PURGE_SWEEP_DELAY
+    user_ids = list(User.objects.filter(deleted_at__lte=cutoff).values_list('id', flat=True))
+    purged = 0
+    for user_id in user_ids:
+        try:
+            purge_user(user_id)
+            purged += 1
+        except Exception as e:
+            logger.error(f"Error purging deactivated user {user_id}: {str(e)}")
+    if purged:
+        logger.info(f"Purged {purged} deactivated account(s)")
+    return purged
+
+
+def queue_user_purge(user_id):
+    """
+    Queue the purge of a deactivated account through the outbox, in the
+    caller's transaction (the hourly purge_deactivated_users sweep remains
+    the safety net).
+    """
+    enqueue_task(purge_deleted_user, user_id)
+
+
+@shared_task
+def rebuild_email_filter_task():
+    """
+    Rebuild the registered-email Bloom filter (queued once enough users
+    have been deleted, see users/email_filter.py).
+
+    Returns:
+        dict: Filter size and number of emails
+    """
+    return rebuild_email_filter()
@@ -4,11 +4,15 @@ from users.views import (
     UserRetrieveView, 
     UserUpdateView, 
     LinkChildView,
-    ParentChildrenCoursesView
+    ParentChildrenCoursesView,
+    UserImportView,
+    UserImportStatusView
 )
 
 urlpatterns = [
   path('', UserListView.as_view(), name='user-list'),
+  path('import/', UserImportView.as_view(), name='user-import'),
+  path('import/<str:import_id>/', UserImportStatusView.as_view(), name='user-import-status'),
   path('link-child/', LinkChildView.as_view(), name='link-child'),
   path('parent/children-courses/', ParentChildrenCoursesView.as_view(), name='parent-children-courses'),
   path('<int:pk>/', UserRetrieveView.as_view(), name='user-retrieve'),
@@ -2,7 +2,9 @@ from .user import (
     UserListView,
     UserRetrieveView,
     UserUpdateView,
-    LinkChildView
+    LinkChildView,
+    UserImportView,
+    UserImportStatusView
 )
 from .student import StudentViewSet
 from .parent import ParentViewSet, ParentChildrenCoursesView
@@ -12,6 +14,8 @@ __all__ = [
     'UserRetrieveView',
     'UserUpdateView',
     'LinkChildView',
+    'UserImportView',
+    'UserImportStatusView',
     'StudentViewSet',
     'ParentViewSet',
     'ParentChildrenCoursesView',
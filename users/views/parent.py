@@ -3,11 +3,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.db.models import Count, Prefetch, Q
 from drf_spectacular.utils import extend_schema
 from users.models import Parent, Student
 from users.serializers import ParentSerializer
 from users.serializers.parent_courses import ParentChildrenCoursesSerializer
 from courses.models.enrollment import CourseEnrollment
+from users.cache import get_or_build_parent_children_courses
+from it360acad_backend.cached_response import CachedResponseMixin
 import logging
 
 logger = logging.getLogger('users')
@@ -20,10 +23,11 @@ class ParentViewSet(viewsets.ReadOnlyModelViewSet):
     lookup_field = 'id'
 
 
-class ParentChildrenCoursesView(APIView):
+class ParentChildrenCoursesView(CachedResponseMixin, APIView):
     """
     View for parents to see all courses their children are enrolled in.
     Returns data grouped by child, showing each child's enrollments.
+    Cached per parent; enrollment and child-link changes invalidate it.
     """
     permission_classes = [IsAuthenticated]
 
@@ -43,81 +47,11 @@ class ParentChildrenCoursesView(APIView):
             )
 
         try:
-            # Get parent profile
-            parent_profile = request.user.parent_profile
-            
-            # Get all children (students) linked to this parent
-            children = Student.objects.filter(parent=parent_profile).select_related('user').prefetch_related(
-                'user__enrollments__course',
-                'user__enrollments__course__category'
+            return self.cached_json_response(
+                request,
+                lambda build: get_or_build_parent_children_courses(request.user.id, build),
+                lambda: self.build_children_courses(request.user),
             )
-            
-            if not children.exists():
-                return Response(
-                    {
-                        'parent_name': request.user.get_full_name(),
-                        'parent_email': request.user.email,
-                        'total_children': 0,
-                        'children': [],
-                        'total_enrollments': 0,
-                        'total_active_enrollments': 0,
-                        'total_completed_enrollments': 0,
-                        'message': 'No children linked to this parent account.'
-                    },
-                    status=status.HTTP_200_OK
-                )
-            
-            # Build response data
-            children_data = []
-            total_enrollments = 0
-            total_active = 0
-            total_completed = 0
-            
-            for child in children:
-                # Get all enrollments for this child
-                enrollments = CourseEnrollment.objects.filter(
-                    user=child.user
-                ).select_related('course', 'course__category').order_by('-enrolled_at')
-                
-                active_count = enrollments.filter(status='active').count()
-                completed_count = enrollments.filter(status='completed').count()
-                
-                total_enrollments += enrollments.count()
-                total_active += active_count
-                total_completed += completed_count
-                
-                children_data.append({
-                    'child': child.user,
-                    'student_id': child.student_id or '',
-                    'current_class': child.current_class or '',
-                    'current_school': child.current_school or '',
-                    'enrollments': enrollments,
-                    'total_enrollments': enrollments.count(),
-                    'active_enrollments': active_count,
-                    'completed_enrollments': completed_count,
-                })
-            
-            # Prepare response data
-            response_data = {
-                'parent_name': request.user.get_full_name(),
-                'parent_email': request.user.email,
-                'total_children': children.count(),
-                'children': children_data,
-                'total_enrollments': total_enrollments,
-                'total_active_enrollments': total_active,
-                'total_completed_enrollments': total_completed,
-            }
-            
-            # Serialize the response
-            serializer = ParentChildrenCoursesSerializer(response_data)
-            
-            logger.info(
-                f"Parent {request.user.email} retrieved children's courses. "
-                f"Children: {children.count()}, Total enrollments: {total_enrollments}"
-            )
-            
-            return Response(serializer.data, status=status.HTTP_200_OK)
-            
         except Parent.DoesNotExist:
             return Response(
                 {'error': 'Parent profile not found.'},
@@ -130,3 +64,71 @@ class ParentChildrenCoursesView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def build_children_courses(self, user):
+        """
+        Build the serialized response in three queries: parent profile,
+        children with per-status enrollment counts, and their enrollments.
+        """
+        # Get parent profile
+        parent_profile = user.parent_profile
+
+        # Children with enrollment counts aggregated by the database and
+        # enrollments (with course) prefetched in one query
+        children = list(
+            Student.objects.filter(parent=parent_profile)
+            .select_related('user')
+            .annotate(
+                total_enrollments=Count('user__enrollments'),
+                active_enrollments=Count('user__enrollments', filter=Q(user__enrollments__status='active')),
+                completed_enrollments=Count('user__enrollments', filter=Q(user__enrollments__status='completed')),
+            )
+            .prefetch_related(Prefetch(
+                'user__enrollments',
+                queryset=CourseEnrollment.objects.select_related('course').order_by('-enrolled_at'),
+                to_attr='prefetched_enrollments',
+            ))
+            .order_by('pk')
+        )
+
+        if not children:
+            return {
+                'parent_name': user.get_full_name(),
+                'parent_email': user.email,
+                'total_children': 0,
+                'children': [],
+                'total_enrollments': 0,
+                'total_active_enrollments': 0,
+                'total_completed_enrollments': 0,
+                'message': 'No children linked to this parent account.'
+            }
+
+        children_data = [
+            {
+                'child': child.user,
+                'student_id': child.student_id or '',
+                'current_class': child.current_class or '',
+                'current_school': child.current_school or '',
+                'enrollments': child.user.prefetched_enrollments,
+                'total_enrollments': child.total_enrollments,
+                'active_enrollments': child.active_enrollments,
+                'completed_enrollments': child.completed_enrollments,
+            }
+            for child in children
+        ]
+
+        response_data = {
+            'parent_name': user.get_full_name(),
+            'parent_email': user.email,
+            'total_children': len(children),
+            'children': children_data,
+            'total_enrollments': sum(child.total_enrollments for child in children),
+            'total_active_enrollments': sum(child.active_enrollments for child in children),
+            'total_completed_enrollments': sum(child.completed_enrollments for child in children),
+        }
+
+        logger.info(
+            f"Parent {user.email} retrieved children's courses. "
+            f"Children: {len(children)}, Total enrollments: {response_data['total_enrollments']}"
+        )
+
+        return ParentChildrenCoursesSerializer(response_data).data
@@ -1,18 +1,26 @@
+import csv
 import logging
+import uuid
+from django.core.files.storage import default_storage
+from django.urls import reverse
 from rest_framework.generics import ListAPIView, RetrieveAPIView, UpdateAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.parsers import MultiPartParser
+from rest_framework.pagination import PageNumberPagination
 from drf_spectacular.utils import extend_schema
 from users.models import User
+from it360acad_backend.cached_response import CachedResponseMixin
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from users.serializers import UserDetailSerializer, UserUpdateSerializer, LinkChildSerializer
+from users.serializers import UserDetailSerializer, UserUpdateSerializer, LinkChildSerializer, UserImportSerializer, UserImportStatusSerializer
+from users.bulk_import import get_import_status, set_import_status
+from users.tasks import import_users_task
+from it360acad_backend.task_publisher import publish_task, FALLBACK_SPOOL
 from users.cache import (
-    get_cached_user_list,
-    set_cached_user_list,
+    get_or_build_user_list,
     invalidate_user_list_cache,
-    get_cached_user,
-    set_cached_user,
+    get_or_build_user,
     invalidate_user_cache
 )
 
@@ -20,16 +28,51 @@ from users.cache import (
 logger = logging.getLogger('users')
 
 
+class UserListPagination(PageNumberPagination):
+  """
+  Opt-in pagination: requests without `page` keep getting the full list,
+  so existing clients are unaffected.
+  """
+  page_size = 50
+  page_size_query_param = 'page_size'
+  max_page_size = 200
+
+  def paginate_queryset(self, queryset, request, view=None):
+    if self.page_query_param not in request.query_params:
+      return None
+    return super().paginate_queryset(queryset, request, view)
+
+  def get_cache_page(self, request):
+    """
+    Normalize the requested page into a cache key part.
+
+    Returns:
+      tuple: (page, page_size), ('all', 'all') when unpaginated, or None
+             when the params are invalid (not cached, DRF reports the error)
+    """
+    if self.page_query_param not in request.query_params:
+      return 'all', 'all'
+    try:
+      page = int(request.query_params[self.page_query_param])
+      page_size = min(int(request.query_params.get(self.page_size_query_param, self.page_size)), self.max_page_size)
+    except ValueError:
+      return None
+    if page < 1 or page_size < 1:
+      return None
+    return page, page_size
+
+
 # User List View
 @extend_schema(
   tags=['Users'],
   summary="List Users",
-  description="Get a list of all users in the database (cached in Redis).",
+  description="Get a list of all users in the database (cached in Redis). Pass `page` (and optionally `page_size`) for paginated results.",
 )
-class UserListView(ListAPIView):
-  queryset = User.objects.all()
+class UserListView(CachedResponseMixin, ListAPIView):
+  queryset = User.objects.order_by('id')
   serializer_class = UserDetailSerializer
   permission_classes = [IsAuthenticated]
+  pagination_class = UserListPagination
 
   def get(self, request, *args, **kwargs):
     logger.info(
@@ -40,21 +83,17 @@ class UserListView(ListAPIView):
       }
     )
     
-    # Try to get from cache first
-    cached_data = get_cached_user_list()
-    if cached_data is not None:
-      logger.debug("Returning cached user list")
-      return Response(cached_data, status=status.HTTP_200_OK)
-    
-    # Cache miss - get from database
-    response = super().get(request, *args, **kwargs)
-    
-    # Cache the response data
-    if response.status_code == 200 and hasattr(response, 'data'):
-      set_cached_user_list(response.data)
-      logger.debug("Cached user list")
-    
-    return response
+    # Each page is cached separately under the current list generation
+    cache_page = self.paginator.get_cache_page(request)
+    if not cache_page:
+      return super().get(request, *args, **kwargs)
+
+    # Rendered bytes served from process memory or Redis; on a miss one worker queries the database
+    return self.cached_json_response(
+      request,
+      lambda build: get_or_build_user_list(*cache_page, build),
+      lambda: self.list(request, *args, **kwargs).data,
+    )
 
 
 # User Retrieve View
@@ -63,29 +102,22 @@ class UserListView(ListAPIView):
   summary="Retrieve User",
   description="Get a specific user by their primary key (pk) (cached in Redis).",
 )
-class UserRetrieveView(RetrieveAPIView):
+class UserRetrieveView(CachedResponseMixin, RetrieveAPIView):
   queryset = User.objects.all()
   serializer_class = UserDetailSerializer
   permission_classes = [IsAuthenticated]
 
   def get(self, request, *args, **kwargs):
-    # Try to get from cache first
     user_id = kwargs.get('pk')
-    if user_id:
-      cached_data = get_cached_user(user_id)
-      if cached_data is not None:
-        logger.debug(f"Returning cached user {user_id}")
-        return Response(cached_data, status=status.HTTP_200_OK)
-    
-    # Cache miss - get from database
-    response = super().get(request, *args, **kwargs)
-    
-    # Cache the response data
-    if response.status_code == 200 and hasattr(response, 'data') and user_id:
-      set_cached_user(user_id, response.data)
-      logger.debug(f"Cached user {user_id}")
-    
-    return response
+    if not user_id:
+      return super().get(request, *args, **kwargs)
+
+    # Rendered bytes served from process memory or Redis; on a miss one worker queries the database
+    return self.cached_json_response(
+      request,
+      lambda build: get_or_build_user(user_id, build),
+      lambda: self.retrieve(request, *args, **kwargs).data,
+    )
 
 
 # User Update View
@@ -151,3 +183,91 @@ class LinkChildView(APIView):
       status=status.HTTP_200_OK
     )
 
+
+
+# Rows accepted per upload; larger imports should use `manage.py importUsers`
+MAX_IMPORT_UPLOAD_ROWS = 5000
+
+
+class UserImportView(APIView):
+  permission_classes = [IsAdminUser]
+  parser_classes = [MultiPartParser]
+
+  @extend_schema(
+    request={'multipart/form-data': UserImportSerializer},
+    responses={202: UserImportStatusSerializer},
+    tags=['Users'],
+    summary="Bulk Import Users",
+    description=f"Create students/parents from a CSV upload (admin only). Up to {MAX_IMPORT_UPLOAD_ROWS} rows per upload. "
+                "The import runs in the background; poll the returned status_url for progress and the result. "
+                "Existing emails are skipped and row errors are reported without aborting the import.",
+  )
+  def post(self, request):
+    serializer = UserImportSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    upload = serializer.validated_data['file']
+
+    # Reject unreadable files now rather than in the background task
+    try:
+      header = next(csv.reader([upload.file.readline(64 * 1024).decode('utf-8-sig')]), [])
+    except (UnicodeDecodeError, csv.Error) as e:
+      return Response(
+        {'error': f'Could not read CSV file: {str(e)}'},
+        status=status.HTTP_400_BAD_REQUEST
+      )
+    if 'email' not in [column.strip().lower() for column in header]:
+      return Response(
+        {'error': 'CSV header must include an email column'},
+        status=status.HTTP_400_BAD_REQUEST
+      )
+    upload.file.seek(0)
+
+    # Hashing thousands of passwords takes far longer than a request may,
+    # so the upload is handed to a worker on the bulk lane
+    import_id = uuid.uuid4().hex
+    path = default_storage.save(f'imports/{import_id}.csv', upload)
+    set_import_status(import_id, 'queued')
+    task_id = publish_task(
+      import_users_task,
+      args=[import_id, path],
+      kwargs={
+        'default_role': serializer.validated_data['role'],
+        'is_verified': serializer.validated_data['is_verified'],
+        'max_rows': MAX_IMPORT_UPLOAD_ROWS,
+      },
+      fallback=FALLBACK_SPOOL,
+    )
+    if task_id is None:
+      default_storage.delete(path)
+      return Response(
+        {'error': 'Could not queue the import. Please try again later.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+      )
+
+    logger.info(f"Admin {request.user.email} queued user import {import_id}")
+    return Response(
+      {
+        'import_id': import_id,
+        'status': 'queued',
+        'result': None,
+        'error': None,
+        'status_url': reverse('user-import-status', kwargs={'import_id': import_id}),
+      },
+      status=status.HTTP_202_ACCEPTED
+    )
+
+
+class UserImportStatusView(APIView):
+  permission_classes = [IsAdminUser]
+
+  @extend_schema(
+    responses={200: UserImportStatusSerializer},
+    tags=['Users'],
+    summary="Bulk Import Status",
+    description="Progress and result of a bulk user import (admin only). Kept for a day after the import finishes.",
+  )
+  def get(self, request, import_id):
+    import_status = get_import_status(import_id)
+    if import_status is None:
+      return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(import_status, status=status.HTTP_200_OK)